@@ -2,7 +2,8 @@
 import logging
 import time
 
-from hex.flows.predict import predict
+from hex.flows.predict import predict_selected
+from hex.models.providers.openai_model import completion_cache_stats
 
 logger = logging.getLogger(__name__)
 
@@ -21,20 +22,22 @@ def execute(flow):
         "errors": []
     }
 
-    for idx, article in enumerate(flow.articles):
-        logger.info(f"✅ Article {idx+1}/{len(flow.articles)} ")
-        is_ai = flow.metrics["models_io"]["article_is_ai_classifier_spec"]["outputs"][idx]
-        if is_ai is not None and is_ai["output"]:
-            inputs, outputs, errors = predict(model_spec_name, [article])
-            if outputs[0] is not None:
-                outputs[0]["doc_id"] = flow.articles[idx]["doc_id"]
-            flow.metrics["models_io"][model_spec_name]["inputs"] += inputs
-            flow.metrics["models_io"][model_spec_name]["outputs"] += outputs
-            flow.metrics["models_io"][model_spec_name]["errors"] += errors
-        else:
-            flow.metrics["models_io"][model_spec_name]["inputs"].append(None)
-            flow.metrics["models_io"][model_spec_name]["outputs"].append(None)
+    is_ai_outputs = flow.metrics["models_io"]["article_is_ai_classifier_spec"]["outputs"]
+    selected = [
+        idx for idx in range(len(flow.articles))
+        if is_ai_outputs[idx] is not None and is_ai_outputs[idx]["output"]
+    ]
+    logger.info(f"✅ {len(selected)}/{len(flow.articles)} AI-related articles")
+    inputs, outputs, errors = predict_selected(model_spec_name, flow.articles, selected)
+    for idx in selected:
+        if outputs[idx] is not None:
+            outputs[idx]["doc_id"] = flow.articles[idx]["doc_id"]
+    flow.metrics["models_io"][model_spec_name]["inputs"] = inputs
+    flow.metrics["models_io"][model_spec_name]["outputs"] = outputs
+    flow.metrics["models_io"][model_spec_name]["errors"] = errors
 
+    flow.metrics.setdefault("completion_cache", {})[step_name] = \
+        completion_cache_stats(model_spec_name)
     total_time = time.time() - start_time
     flow.metrics.setdefault("step_duration", {})[step_name] = total_time
     logger.info(f"✅ Step {step_name} done in {total_time:.2f}s")
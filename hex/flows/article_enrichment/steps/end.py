@@ -1,9 +1,17 @@
 """ End step. """
 import logging
 
+from hex.storage.hex_storage import get_storage
+
 logger = logging.getLogger(__name__)
 
 
 def execute(flow):
-    """ Finalize the pipeline. """
+    """ Finalize the pipeline and commit the articles cursor. """
+    storage = get_storage(flow.config)
+    storage.commit_cursor(
+        flow.articles_table, flow.articles_consumer, flow.articles_cursor
+    )
+    logger.info(f"✅ Committed '{flow.articles_consumer}' cursor "
+                f"at change {flow.articles_cursor['position']}")
     logger.info("Finishing the pipeline")
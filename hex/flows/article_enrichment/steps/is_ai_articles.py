@@ -3,9 +3,10 @@ import logging
 import time
 
 from hex.utils.print import safe_pretty_print
-from hex.storage.hex_storage import HexStorage
+from hex.storage.hex_storage import get_storage
 from hex.models.loader import load_model_spec
 from hex.flows.predict import predict
+from hex.models.providers.openai_model import completion_cache_stats
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +26,7 @@ def execute(flow):
     }
 
     # Reload storage and lazy load articles
-    storage = HexStorage(flow.config.get("db_path"))
+    storage = get_storage(flow.config)
     articles = storage.lazy_load(flow.articles)
 
     (flow.metrics["models_io"][model_spec_name]["inputs"],
@@ -34,6 +35,9 @@ def execute(flow):
          predict(model_spec_name, articles)
 
     flow.articles = [dict(article) for article in articles]
+    flow.metrics.setdefault("completion_cache", {})[step_name] = \
+        completion_cache_stats(model_spec_name)
     total_time = time.time() - start_time
     flow.metrics.setdefault("step_duration", {})[step_name] = total_time
+    flow.metrics.setdefault("storage_cache", {})[step_name] = storage.cache_stats()
     logger.info(f"✅ Step {step_name} done in {total_time:.2f}s")
@@ -2,9 +2,10 @@
 import logging
 import time
 from tinydb import Query
-from hex.utils.date import to_aware_utc
 
-from hex.storage.hex_storage import HexStorage
+from hex.utils.date import to_epoch
+
+from hex.storage.hex_storage import get_storage
 
 # Initialize logger at module level
 logger = logging.getLogger(__name__)
@@ -17,31 +18,33 @@ def get_articles_with_no_error(articles):
 
     return articles_with_no_error
 
-def _load_query(storage, articles_table, date_threshold, articles_limit):
-    """Load articles from the database."""
-    Article = Query()
-    articles = storage.search(
-        articles_table,
-        Article.published_date.test(lambda d: to_aware_utc(d) >= date_threshold)
+def _load_query(storage, articles_table, date_threshold, articles_limit, consumer):
+    """Load articles added or updated since the consumer's last run."""
+    lower = to_epoch(date_threshold)
+
+    def is_candidate(article):
+        published_ts = article.get("published_ts")
+        return (
+            (lower is None or (published_ts is not None and published_ts >= lower))
+            and not article.get("metadata", {}).get("error")
+        )
+
+    storage.backfill_published_ts(articles_table)
+    articles, cursor = storage.changes_since(
+        articles_table, consumer=consumer, where=is_candidate, limit=articles_limit
     )
-    articles = get_articles_with_no_error(articles)
-    if articles_limit is not None:
-        articles = articles[:articles_limit]
     logger.info(f"✅ Loaded {len(articles)} articles from '{articles_table}': "
                 f"len(articles)={len(articles)}, date_threshold='{date_threshold}'")
-    return articles
+    return articles, cursor
 
 def _filter_already_replicated_articles(storage, articles, replicates_table):
     """Filter out already replicated articles."""
-    replicated_articles = storage.get_all(replicates_table)
+    Replicate = Query()
     filtered_out = []
     kept_articles = []
-    ids = set()
-    for rep in replicated_articles:
-        ids.add(rep["original_doc_id"])
-    logger.info(f"✅ There are {len(ids)} already replicated articles")
     for article in articles:
-        if article["doc_id"] in ids:
+        if storage.search(replicates_table,
+                          Replicate.original_doc_id == article["doc_id"]):
             filtered_out.append(article)
         else:
             kept_articles.append(article)
@@ -56,10 +59,13 @@ def execute(flow):
     start_time = time.time()
     flow.metrics.setdefault("step_start_times", {})[step_name] = start_time
 
-    storage = HexStorage(flow.config.get("db_path"))
+    storage = get_storage(flow.config)
 
-    articles = _load_query(storage, flow.articles_table, flow.parsed_date_threshold,
-                           flow.articles_limit)
+    flow.articles_consumer = f"enrichment:{flow.replicates_table}"
+    articles, flow.articles_cursor = _load_query(
+        storage, flow.articles_table, flow.parsed_date_threshold,
+        flow.articles_limit, flow.articles_consumer
+    )
 
     logger.info("✅ Filtering out already replicated articles...")
     articles = _filter_already_replicated_articles(storage, articles,
@@ -68,4 +74,5 @@ def execute(flow):
     logger.info(f"✅ Loaded {len(flow.articles)} articles...")
     total_time = time.time() - start_time
     flow.metrics.setdefault("step_duration", {})[step_name] = total_time
+    flow.metrics.setdefault("storage_cache", {})[step_name] = storage.cache_stats()
     logger.info(f"✅ Step {step_name} done in {total_time:.2f}s")
@@ -52,6 +52,8 @@ def compute_step_metrics(flow):
     step_durations = metrics.get("step_duration", {})
     models_io = metrics.get("models_io", {})
     models_spec_names = metrics.get("models_spec_names", {})
+    storage_cache = metrics.get("storage_cache", {})
+    completion_cache = metrics.get("completion_cache", {})
 
     all_steps = set(step_start_times) | set(step_durations)
     overview_table_data = []
@@ -116,6 +118,10 @@ def compute_step_metrics(flow):
             safe_print(safe_avg(completion_tokens)),
             safe_print(safe_avg(total_tokens)),
             num_errors,
+            f"{storage_cache.get(step_name, {}).get('saved_parse_time', 0):.2f}s",
+            "{} / {}".format(
+                completion_cache[step_name]["hits"], completion_cache[step_name]["misses"]
+            ) if step_name in completion_cache else "N/A",
         ]
         overview_table_data.append(row)
 
@@ -150,7 +156,8 @@ def render_step_overview(flow):
     current.card.append(Table(
         headers=[
             "Step", "Items", "Completion", "Start Time", "Duration", "Avg Time/item",
-            "Avg Prompt Tokens", "Avg Completion Tokens", "Avg Total Tokens", "Errors"
+            "Avg Prompt Tokens", "Avg Completion Tokens", "Avg Total Tokens", "Errors",
+            "Saved Parse Time", "LLM Cache Hits / Misses"
         ],
         data=overview_table_data
     ))
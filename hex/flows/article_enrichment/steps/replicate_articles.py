@@ -4,7 +4,7 @@ import time
 from tinydb import Query
 from evaluate import load as load_metric
 
-from hex.storage.hex_storage import HexStorage
+from hex.storage.hex_storage import get_storage
 from hex.models.providers.openai_embedding import compute_tag_list_similarity
 from hex.models.loader import load_model_spec
 
@@ -25,15 +25,26 @@ def execute(flow):
         "errors": []
     }
 
-    storage = HexStorage(flow.config.get("db_path"))
+    storage = get_storage(flow.config)
     flow.tag_embedding_spec_name = "tag_embedding_spec"
     tag_embedding_spec = load_model_spec(flow.tag_embedding_spec_name)
     TagWord = Query()
     cluster_table = storage.get_table("tag_clusters")
 
     replicated_articles = []
+    records_to_save = []
 
     data = flow.articles
+    # Embed the tags of every evaluated article in bulk, before the loop
+    tags_outputs = flow.metrics["models_io"]["tagger_spec"]["outputs"]
+    tag_names = []
+    for idx, article in enumerate(data):
+        if article.get("tags") and tags_outputs[idx]:
+            tag_names.extend(article["tags"])
+            tag_names.extend(tags_outputs[idx]["output"])
+    if tag_names:
+        tag_embedding_spec._loaded_model.predict_many(list(dict.fromkeys(tag_names)))
+
     for idx, article in enumerate(data):
         pred_start_time = time.time()
         record = {
@@ -110,7 +121,7 @@ def execute(flow):
             record["tag_similarity_eval"] = avg_sim
         # TODO Fix ArtifactManager_lazy_load SHOUlD OFFLOAD LARGE FIELDS
         del record["text_content"]
-        storage.save(flow.replicates_table, storage.lazy_load(record))
+        records_to_save.extend(storage.lazy_load(record))
         replicated_articles.append(record)
         logger.info(f"✅ Replicate {idx+1}/{len(data)} ")
         pred_duration = time.time() - pred_start_time
@@ -118,8 +129,11 @@ def execute(flow):
             "metadata": {"duration": pred_duration}
         })
 
+    storage.save_many(flow.replicates_table, records_to_save)
+
     # Save results in flow object
     flow.replicated_articles = replicated_articles
     total_time = time.time() - start_time
     flow.metrics.setdefault("step_duration", {})[step_name] = total_time
+    flow.metrics.setdefault("storage_cache", {})[step_name] = storage.cache_stats()
     logger.info(f"✅ Step {step_name} done in {total_time:.2f}s")
@@ -2,7 +2,7 @@
 import logging
 import math
 from collections import Counter, defaultdict
-from hex.storage.hex_storage import HexStorage
+from hex.storage.hex_storage import get_storage
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +14,7 @@ def execute(flow):
 
     articles = flow.replicated_articles
     cluster_counter = Counter()
-    storage = HexStorage(flow.config.get("db_path"))
+    storage = get_storage(flow.config)
 
     # First pass: count how many times each cluster appears
     for article in articles:
@@ -1,7 +1,7 @@
 import logging
 from hex.utils.date import to_aware_utc
 
-from hex.storage.hex_storage import HexStorage
+from hex.storage.hex_storage import get_storage
 from hex.utils.config import load_config
 from hex.utils.git import get_git_metadata
 
@@ -11,10 +11,13 @@ logger = logging.getLogger(__name__)
 def _clean_up_tables(storage, flow):
     """ Clean up tables for a fresh run. """
     if flow.clean_tables:
-        storage.db.drop_table("tags")
-        storage.db.drop_table("tag_clusters")
-        storage.db.drop_table("tagged_articles")
-        storage.db.drop_table(flow.replicates_table)
+        storage.drop_table("tags")
+        storage.drop_table("tag_clusters")
+        storage.drop_table("tagged_articles")
+        storage.drop_table(flow.replicates_table)
+        storage.reset_cursor(
+            flow.articles_table, f"enrichment:{flow.replicates_table}"
+        )
         logger.info("✅ Database cleaned.")
     else:
         logger.info("✅ Database not cleaned.")
@@ -25,7 +28,7 @@ def execute(flow):
     flow.config = load_config()
     flow.git_metadata = get_git_metadata()
     flow.parsed_date_threshold = to_aware_utc(flow.date_threshold)
-    storage = HexStorage(flow.config.get("db_path"))
+    storage = get_storage(flow.config)
     logger.info("✅ Database first connection established.")
     _clean_up_tables(storage, flow)
     
@@ -2,7 +2,8 @@
 import logging
 import time
 
-from hex.flows.predict import predict
+from hex.flows.predict import predict_selected
+from hex.models.providers.openai_model import completion_cache_stats
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -23,17 +24,15 @@ def execute(flow):
     }
 
     dense_summaries = flow.metrics["models_io"]["dense_summarizer_spec"]["outputs"]
-    for idx, dense_summary in enumerate(dense_summaries):
-        logger.info(f"✅ Article {idx+1}/{len(dense_summaries)} ")
-        if dense_summary: 
-            inputs, outputs, errors = predict(model_spec_name, [dense_summary])
-            flow.metrics["models_io"][model_spec_name]["inputs"] += inputs
-            flow.metrics["models_io"][model_spec_name]["outputs"] += outputs
-            flow.metrics["models_io"][model_spec_name]["errors"] += errors
-        else:
-            flow.metrics["models_io"][model_spec_name]["inputs"].append(None)
-            flow.metrics["models_io"][model_spec_name]["outputs"].append(None)
+    selected = [idx for idx, dense_summary in enumerate(dense_summaries) if dense_summary]
+    logger.info(f"✅ {len(selected)}/{len(dense_summaries)} dense summaries")
+    inputs, outputs, errors = predict_selected(model_spec_name, dense_summaries, selected)
+    flow.metrics["models_io"][model_spec_name]["inputs"] = inputs
+    flow.metrics["models_io"][model_spec_name]["outputs"] = outputs
+    flow.metrics["models_io"][model_spec_name]["errors"] = errors
 
+    flow.metrics.setdefault("completion_cache", {})[step_name] = \
+        completion_cache_stats(model_spec_name)
     total_time = time.time() - start_time
     flow.metrics.setdefault("step_duration", {})[step_name] = total_time
     logger.info(f"✅ Step {step_name} done in {total_time:.2f}s")
@@ -4,10 +4,9 @@ import time
 from datetime import datetime, timezone
 from hex.utils.date import to_aware_utc
 from dateutil.relativedelta import relativedelta
-from numpy import array
-from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
 
-from hex.storage.hex_storage import HexStorage
+from hex.storage.hex_storage import get_storage
 from hex.models.loader import load_model_spec
 import re
 
@@ -40,33 +39,103 @@ def _clean_tag_name(tag_name):
     tag_name = re.sub(r"( ai ?)|( ?ai )", "", tag_name, flags=re.I)
     tag_name = re.sub(r" ?artifical intelligence ?", " ", tag_name, flags=re.I)
     return tag_name.strip()
-    
-def _tag_is_similar_to(tag, cluster, embedding_model):
-    tag_name = _clean_tag_name(tag["name"])
-    tag_embedding = embedding_model.predict(tag_name)["output"]
-
-    for _, synonym_name in cluster["tag_synonyms"].items():
-        synonym_name = _clean_tag_name(synonym_name)
-        synonym_embedding = embedding_model.predict(synonym_name)["output"]
-        sim_matrix = cosine_similarity(
-            array([tag_embedding]),
-            array([synonym_embedding])
-        )
-        THRESHOLD = 0.69
-        if max(sim_matrix[0] > THRESHOLD):
-            return True
-    return False
 
 
-def _assign_cluster_to(tag, storage, embedding_model, tag_table_name="tag_clusters"):
+class ClusterIndex:
+    """
+    Unit-normalized embeddings of every cluster synonym (one row each),
+    with the cluster id of each row. A tag joins the cluster of its most
+    similar synonym, found with one matrix-vector product, when the
+    cosine similarity exceeds THRESHOLD. Rows are appended as synonyms
+    are added, in a matrix whose capacity doubles when full.
+    """
+    THRESHOLD = 0.69
+
+    def __init__(self, cluster_table, embedding_model):
+        self.cluster_table = cluster_table
+        self.embedding_model = embedding_model
+        self.cluster_ids = []
+        self._matrix = None
+        self._built = False
+
+    def _embed(self, names):
+        """ Unit-normalized float32 embeddings of cleaned names. """
+        if not names:
+            return np.empty((0, 0), dtype=np.float32)
+        results = self.embedding_model.predict_many(
+            [_clean_tag_name(name) for name in names]
+        )
+        embeddings = np.asarray([r["output"] for r in results], dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.where(norms > 0, norms, 1)
+
+    def build(self, tag_names=()):
+        """
+        Embed every synonym of the cluster table, and `tag_names` to be
+        assigned next, in one bulk call.
+        """
+        cluster_ids, names = [], []
+        for cluster in self.cluster_table:
+            for synonym_name in cluster["tag_synonyms"].values():
+                cluster_ids.append(str(cluster.doc_id))
+                names.append(synonym_name)
+        tag_names = list(tag_names)
+        embeddings = self._embed(names + tag_names)
+        self.cluster_ids = []
+        self._matrix = None
+        self._built = True
+        self._append(cluster_ids, embeddings[:len(names)])
+
+    def _append(self, cluster_ids, embeddings):
+        if not len(embeddings):
+            return
+        size = len(self.cluster_ids)
+        if self._matrix is None:
+            self._matrix = np.empty(
+                (max(len(embeddings), 64), embeddings.shape[1]), dtype=np.float32
+            )
+        if size + len(embeddings) > len(self._matrix):
+            matrix = np.empty(
+                (max(2 * len(self._matrix), size + len(embeddings)),
+                 self._matrix.shape[1]),
+                dtype=np.float32
+            )
+            matrix[:size] = self._matrix[:size]
+            self._matrix = matrix
+        self._matrix[size:size + len(embeddings)] = embeddings
+        self.cluster_ids.extend(cluster_ids)
+
+    def add(self, cluster_id, synonym_names):
+        """ Index synonyms added to a cluster (new or existing). """
+        if not self._built:
+            self.build()
+        synonym_names = list(synonym_names)
+        self._append([str(cluster_id)] * len(synonym_names), self._embed(synonym_names))
+
+    def nearest(self, tag_name):
+        """ Id of the cluster the tag belongs to, or None. """
+        if not self._built:
+            self.build()
+        if not self.cluster_ids:
+            return None
+        similarities = self._matrix[:len(self.cluster_ids)] @ self._embed([tag_name])[0]
+        best = int(np.argmax(similarities))
+        if similarities[best] > self.THRESHOLD:
+            return self.cluster_ids[best]
+        return None
+
+
+def _assign_cluster_to(tag, storage, cluster_index, tag_table_name="tag_clusters"):
     tag_cluster_table = storage.get_table(tag_table_name)
 
-    for cluster in tag_cluster_table:
-        if _tag_is_similar_to(tag, cluster, embedding_model):
-            tag["tag_cluster_id"] = str(cluster.doc_id)
-            cluster["doc_id"] = str(cluster.doc_id)
-            cluster["tag_synonyms"][tag["doc_id"]] = tag["name"]
-            return {"tag": tag, "cluster": _update_cluster(cluster, storage)}
+    cluster_id = cluster_index.nearest(tag["name"])
+    if cluster_id is not None:
+        cluster = tag_cluster_table.get(doc_id=int(cluster_id))
+        tag["tag_cluster_id"] = str(cluster.doc_id)
+        cluster["doc_id"] = str(cluster.doc_id)
+        cluster["tag_synonyms"][tag["doc_id"]] = tag["name"]
+        cluster_index.add(cluster["doc_id"], [tag["name"]])
+        return {"tag": tag, "cluster": _update_cluster(cluster, storage)}
 
     # No cluster found -> create new
     new_cluster = {
@@ -79,10 +148,11 @@ def _assign_cluster_to(tag, storage, embedding_model, tag_table_name="tag_cluste
     tag_cluster_id = storage.save(tag_table_name, new_cluster)[0]
     new_cluster["doc_id"] = tag_cluster_id
     tag["tag_cluster_id"] = tag_cluster_id
+    cluster_index.add(tag_cluster_id, [tag["name"]])
     return {"tag": tag, "cluster": new_cluster}
 
 
-def _transform_cluster(tag, storage, embedding_model, tag_table_name="tag_clusters"):
+def _transform_cluster(tag, storage, cluster_index, tag_table_name="tag_clusters"):
     if "tag_cluster_id" in tag:
         tag_cluster_table = storage.get_table(tag_table_name)
         cluster = tag_cluster_table.get(doc_id=int(tag["tag_cluster_id"]))
@@ -90,7 +160,7 @@ def _transform_cluster(tag, storage, embedding_model, tag_table_name="tag_cluste
         cluster = storage.lazy_load(cluster)[0]
         output = {"cluster": _update_cluster(cluster, storage)}
     else:
-        output = _assign_cluster_to(tag, storage, embedding_model, tag_table_name)
+        output = _assign_cluster_to(tag, storage, cluster_index, tag_table_name)
 
     for _, v in output.items():
         if isinstance(v, dict) and "doc_id" in v:
@@ -111,43 +181,55 @@ def execute(flow):
         "outputs": [],
         "errors": []
     }
-    storage = HexStorage(flow.config.get("db_path"))
+    storage = get_storage(flow.config)
     tag_embedding_spec = load_model_spec("tag_embedding_spec")
 
     clusters = {}
     data = flow.tags
-    for idx, tag in enumerate(data):
-        pred_start_time = time.time()
-        logger.info(f"✅ Update {idx+1}/{len(data)} ")
-        flow.metrics["models_io"][model_spec_name]["inputs"].append(tag)
-        output = None
-        try:
-            output = _transform_cluster(tag, storage, tag_embedding_spec._loaded_model)
-        except Exception as e:
-            logger.error(f"❌ Error on tag {idx+1}: {str(e)}")
-            flow.metrics["models_io"][model_spec_name]["errors"].append({
-                "index": idx,
-                "error_message": str(e),
-                "tag_id": tag["doc_id"]
-            })
-            if 'Wrong OpenAI API key' in str(e):
-                raise ValueError(
-                    f"Wrong OpenAI API key!\n"
-                    f"You need to set the OPENAI_API_KEY in the .env file!\n"
-                    f">>> See README.md for more details <<<"
-                )
-        else:
-            pred_duration = time.time() - pred_start_time
-            flow.metrics["models_io"][model_spec_name]["outputs"].append({
-                "output": tag,
-                "metadata": {"duration": pred_duration}
-            })
-
-        if output and "cluster" in output:
-            cluster = storage.artifacts.resolve_lazy_record(output["cluster"])
-            clusters[cluster["doc_id"]] = cluster
+    cluster_index = ClusterIndex(
+        storage.get_table("tag_clusters"), tag_embedding_spec._loaded_model
+    )
+    try:
+        cluster_index.build(tag["name"] for tag in data if "tag_cluster_id" not in tag)
+    except Exception as e:
+        if 'Wrong OpenAI API key' in str(e):
+            raise
+        # The first tag to assign builds it again, and records its own error
+        logger.warning(f"❌ Cluster index build failed: {str(e)}")
+    with storage.transaction():
+        for idx, tag in enumerate(data):
+            pred_start_time = time.time()
+            logger.info(f"✅ Update {idx+1}/{len(data)} ")
+            flow.metrics["models_io"][model_spec_name]["inputs"].append(tag)
+            output = None
+            try:
+                output = _transform_cluster(tag, storage, cluster_index)
+            except Exception as e:
+                logger.error(f"❌ Error on tag {idx+1}: {str(e)}")
+                flow.metrics["models_io"][model_spec_name]["errors"].append({
+                    "index": idx,
+                    "error_message": str(e),
+                    "tag_id": tag["doc_id"]
+                })
+                if 'Wrong OpenAI API key' in str(e):
+                    raise ValueError(
+                        f"Wrong OpenAI API key!\n"
+                        f"You need to set the OPENAI_API_KEY in the .env file!\n"
+                        f">>> See README.md for more details <<<"
+                    )
+            else:
+                pred_duration = time.time() - pred_start_time
+                flow.metrics["models_io"][model_spec_name]["outputs"].append({
+                    "output": tag,
+                    "metadata": {"duration": pred_duration}
+                })
+
+            if output and "cluster" in output:
+                cluster = storage.artifacts.resolve_lazy_record(output["cluster"])
+                clusters[cluster["doc_id"]] = cluster
 
     flow.clusters = clusters
     total_time = time.time() - start_time
     flow.metrics.setdefault("step_duration", {})[step_name] = total_time
+    flow.metrics.setdefault("storage_cache", {})[step_name] = storage.cache_stats()
     logger.info(f"✅ Step {step_name} done in {total_time:.2f}s")
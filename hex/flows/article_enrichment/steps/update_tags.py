@@ -2,7 +2,7 @@
 import logging
 import time
 from tinydb import Query
-from hex.storage.hex_storage import HexStorage
+from hex.storage.hex_storage import get_storage
 from hex.utils.print import safe_pretty_print
 
 logger = logging.getLogger(__name__)
@@ -35,7 +35,7 @@ def execute(flow):
         "errors": []
     }
 
-    storage = HexStorage(flow.config.get("db_path"))
+    storage = get_storage(flow.config)
     TaggedArticle = Query()
     tagged_articles = storage.search("tagged_articles",
                                      TaggedArticle.original_table_name == flow.articles_table)
@@ -46,53 +46,55 @@ def execute(flow):
     tags = []
     TagWord = Query()
     data = flow.merged_tags.values()
-    for idx, pred in enumerate(data):
-        pred = _filter_already_tagged_articles(pred, ALREADY_TAGGED_IDS)
-        try:
-            pred_start_time = time.time()
-            tag_records = storage.search("tags", TagWord.name == pred["output"])
-            logger.info(f"✅ Update {idx+1}/{len(data)} ")
-            flow.metrics["models_io"][model_spec_name]["inputs"].append(pred)
-            logger.info(f"✅ Inputs:")
-            logger.info(safe_pretty_print(pred))
-            if tag_records:
-                tag = tag_records[0]
-                tag["history"] += pred["history"]
-                ids = storage.update("tags", tag)
-                tags.append(tag)
-                logger.info(f"✅ Updating existing tag: {tag['name']}")
-            elif len(pred["history"]) > 0:
-                tag = {
-                    "table_name": "tags",
-                    "name": pred["output"],
-                    "history": pred["history"]
-                }
-                ids = storage.save("tags", tag)
-                tag["doc_id"] = ids[0]
-                tags.append(tag)
-                logger.info(f"✅ Creating new tag: {tag['name']}")
+    with storage.transaction():
+        for idx, pred in enumerate(data):
+            pred = _filter_already_tagged_articles(pred, ALREADY_TAGGED_IDS)
+            try:
+                pred_start_time = time.time()
+                tag_records = storage.search("tags", TagWord.name == pred["output"])
+                logger.info(f"✅ Update {idx+1}/{len(data)} ")
+                flow.metrics["models_io"][model_spec_name]["inputs"].append(pred)
+                logger.info(f"✅ Inputs:")
+                logger.info(safe_pretty_print(pred))
+                if tag_records:
+                    tag = tag_records[0]
+                    tag["history"] += pred["history"]
+                    ids = storage.update("tags", tag)
+                    tags.append(tag)
+                    logger.info(f"✅ Updating existing tag: {tag['name']}")
+                elif len(pred["history"]) > 0:
+                    tag = {
+                        "table_name": "tags",
+                        "name": pred["output"],
+                        "history": pred["history"]
+                    }
+                    ids = storage.save("tags", tag)
+                    tag["doc_id"] = ids[0]
+                    tags.append(tag)
+                    logger.info(f"✅ Creating new tag: {tag['name']}")
 
-            pred_duration = time.time() - pred_start_time
-            flow.metrics["models_io"][model_spec_name]["outputs"].append({
-                "output": tag,
-                "metadata": {"duration": pred_duration}
-            })
-        except Exception as e:
-            logger.error(f"❌ Error in {step_name} at article {idx}: {str(e)}")
-            flow.metrics["models_io"][model_spec_name]["errors"].append(
-                flow.errors[step_name].append({
-                    "index": idx,
-                    "error_message": str(e),
-                    "article_id": flow.articles[idx].get("doc_id", None)
+                pred_duration = time.time() - pred_start_time
+                flow.metrics["models_io"][model_spec_name]["outputs"].append({
+                    "output": tag,
+                    "metadata": {"duration": pred_duration}
                 })
-            )
-        else:
-            for doc in pred["doc_ids"]:
-                if doc["original_doc_id"] not in NEW_TAGGED_IDS:
-                    storage.save("tagged_articles", doc)
-                    NEW_TAGGED_IDS.add(doc["original_doc_id"])
+            except Exception as e:
+                logger.error(f"❌ Error in {step_name} at article {idx}: {str(e)}")
+                flow.metrics["models_io"][model_spec_name]["errors"].append(
+                    flow.errors[step_name].append({
+                        "index": idx,
+                        "error_message": str(e),
+                        "article_id": flow.articles[idx].get("doc_id", None)
+                    })
+                )
+            else:
+                for doc in pred["doc_ids"]:
+                    if doc["original_doc_id"] not in NEW_TAGGED_IDS:
+                        storage.save("tagged_articles", doc)
+                        NEW_TAGGED_IDS.add(doc["original_doc_id"])
 
     flow.tags = tags
     total_time = time.time() - start_time
     flow.metrics.setdefault("step_duration", {})[step_name] = total_time
+    flow.metrics.setdefault("storage_cache", {})[step_name] = storage.cache_stats()
     logger.info(f"✅ Step {step_name} done in {total_time:.2f}s")
@@ -13,7 +13,13 @@ from hex.ingestion.meta_scraper import MetaScraper
 from hex.ingestion.microsoft_scraper import MicrosoftScraper
 from hex.ingestion.hbr_scraper import HBRScraper
 from hex.ingestion.hai_scraper import HAIScraper
-from hex.storage.hex_storage import HexStorage
+from hex.ingestion.extraction_pool import ExtractionPool
+from hex.ingestion.feed_poller import get_feed_poller
+from hex.ingestion.fetch_strategy import get_fetch_strategy
+from hex.ingestion.http_cache import get_response_cache, http_cache_settings
+from hex.ingestion.rendering import render_summary
+from hex.ingestion.seen_index import get_seen_index
+from hex.storage.hex_storage import get_storage
 
 
 logger = logging.getLogger(__name__)
@@ -27,7 +33,15 @@ def execute(flow):
     flow.metrics.setdefault("step_start_times", {})[step_name] = start_time
     flow.metrics.setdefault("stored_count", {})[step_name] = {}
 
-    storage = HexStorage(flow.config.get("db_path"))
+    storage = get_storage(flow.config)
+    extraction_pool = ExtractionPool(
+        flow.config.get("extraction_workers"),
+        flow.config.get("extraction_queue_size")
+    )
+    # Record or replay every page, feed and stealth fetch (off by default)
+    response_cache = get_response_cache(flow.config)
+    if response_cache is not None:
+        get_feed_poller(storage, parse=response_cache.parse_feed)
 
     class CustomRSSArticleScraper(RSSArticleScraper):
         def __init__(self, *args, **kwargs):
@@ -37,6 +51,7 @@ def execute(flow):
                 articles_table=flow.articles_table,
                 articles_limit=flow.articles_limit,
                 date_threshold=flow.date_threshold,
+                extraction_pool=extraction_pool,
                 *args,
                 **kwargs
             )
@@ -44,6 +59,8 @@ def execute(flow):
         def closed(self, reason):
             flow.metrics["stored_count"][step_name]["rss_article_scraper"] = \
                 self.stored_count
+            skipped_count["rss_article_scraper"] = self.skipped_count
+            rendering["rss_article_scraper"] = render_summary(self.crawler.stats)
 
     class CustomStealthRSSArticleScraper(StealthRSSArticleScraper):
         def __init__(self, *args, **kwargs):
@@ -53,6 +70,8 @@ def execute(flow):
                 articles_table=flow.articles_table,
                 articles_limit=flow.articles_limit,
                 date_threshold=flow.date_threshold,
+                extraction_pool=extraction_pool,
+                response_cache=response_cache,
                 *args,
                 **kwargs
             )
@@ -60,7 +79,12 @@ def execute(flow):
         def closed(self, reason):
             flow.metrics["stored_count"][step_name]["stealth_rss_article_scraper"] = \
                 self.stored_count
+            skipped_count["stealth_rss_article_scraper"] = self.skipped_count
+            browser_pool_stats.update(self.browser_pool_stats)
 
+    skipped_count = {}
+    browser_pool_stats = {}
+    rendering = {}
     website_count = {
         "quantumblack": 0,
         "syncedreview": 0,
@@ -79,12 +103,15 @@ def execute(flow):
                 articles_table=flow.articles_table,
                 articles_limit=flow.articles_limit,
                 date_threshold=flow.date_threshold,
+                extraction_pool=extraction_pool,
                 *args,
                 **kwargs
             )
         
         def closed(self, reason):
             website_count["quantumblack"] = self.stored_count
+            skipped_count["quantumblack"] = self.skipped_count
+            rendering["quantumblack"] = render_summary(self.crawler.stats)
 
     class CustomSyncedReviewScraper(SyncedReviewScraper):
         def __init__(self, *args, **kwargs):
@@ -94,12 +121,15 @@ def execute(flow):
                 articles_table=flow.articles_table,
                 articles_limit=flow.articles_limit,
                 date_threshold=flow.date_threshold,
+                extraction_pool=extraction_pool,
                 *args,
                 **kwargs
             )
         
         def closed(self, reason):
             website_count["syncedreview"] = self.stored_count
+            skipped_count["syncedreview"] = self.skipped_count
+            rendering["syncedreview"] = render_summary(self.crawler.stats)
 
     class CustomSloanReviewScraper(SloanReviewScraper):
         def __init__(self, *args, **kwargs):
@@ -109,12 +139,15 @@ def execute(flow):
                 articles_table=flow.articles_table,
                 articles_limit=flow.articles_limit,
                 date_threshold=flow.date_threshold,
+                extraction_pool=extraction_pool,
                 *args,
                 **kwargs
             )
         
         def closed(self, reason):
             website_count["sloanreview"] = self.stored_count
+            skipped_count["sloanreview"] = self.skipped_count
+            rendering["sloanreview"] = render_summary(self.crawler.stats)
 
     class CustomResearchGoogleScraper(ResearchGoogleScraper):
         def __init__(self, *args, **kwargs):
@@ -124,12 +157,15 @@ def execute(flow):
                 articles_table=flow.articles_table,
                 articles_limit=flow.articles_limit,
                 date_threshold=flow.date_threshold,
+                extraction_pool=extraction_pool,
                 *args,
                 **kwargs
             )
         
         def closed(self, reason):
             website_count["researchgoogle"] = self.stored_count
+            skipped_count["researchgoogle"] = self.skipped_count
+            rendering["researchgoogle"] = render_summary(self.crawler.stats)
 
     class CustomMetaScraper(MetaScraper):
 
@@ -140,12 +176,15 @@ def execute(flow):
                 articles_table=flow.articles_table,
                 articles_limit=flow.articles_limit,
                 date_threshold=flow.date_threshold,
+                extraction_pool=extraction_pool,
                 *args,
                 **kwargs
             )
         
         def closed(self, reason):
             website_count["meta"] = self.stored_count
+            skipped_count["meta"] = self.skipped_count
+            rendering["meta"] = render_summary(self.crawler.stats)
     
     class CustomMicrosoftScraper(MicrosoftScraper):
         def __init__(self, *args, **kwargs):
@@ -155,12 +194,15 @@ def execute(flow):
                 articles_table=flow.articles_table,
                 articles_limit=flow.articles_limit,
                 date_threshold=flow.date_threshold,
+                extraction_pool=extraction_pool,
                 *args,
                 **kwargs
             )
         
         def closed(self, reason):
             website_count["microsoft"] = self.stored_count
+            skipped_count["microsoft"] = self.skipped_count
+            rendering["microsoft"] = render_summary(self.crawler.stats)
 
     class CustomHBRScraper(HBRScraper):
 
@@ -171,12 +213,15 @@ def execute(flow):
                 articles_table=flow.articles_table,
                 articles_limit=flow.articles_limit,
                 date_threshold=flow.date_threshold,
+                extraction_pool=extraction_pool,
                 *args,
                 **kwargs
             )
         
         def closed(self, reason):
             website_count["hbr"] = self.stored_count
+            skipped_count["hbr"] = self.skipped_count
+            rendering["hbr"] = render_summary(self.crawler.stats)
 
     class CustomHAIScraper(HAIScraper):
 
@@ -187,14 +232,19 @@ def execute(flow):
                 articles_table=flow.articles_table,
                 articles_limit=flow.articles_limit,
                 date_threshold=flow.date_threshold,
+                extraction_pool=extraction_pool,
                 *args,
                 **kwargs
             )
         
         def closed(self, reason):
             website_count["hai"] = self.stored_count
+            skipped_count["hai"] = self.skipped_count
+            rendering["hai"] = render_summary(self.crawler.stats)
 
-    process = CrawlerProcess(get_project_settings())
+    settings = get_project_settings()
+    settings.setdict(http_cache_settings(flow.config))
+    process = CrawlerProcess(settings)
     flow.metrics["stored_count"][step_name]["rss_article_scraper"] = 0
     process.crawl(CustomRSSArticleScraper)
     flow.metrics["stored_count"][step_name]["stealth_rss_article_scraper"] = 0
@@ -207,16 +257,29 @@ def execute(flow):
     process.crawl(CustomMicrosoftScraper)
     process.crawl(CustomHBRScraper)
     process.crawl(CustomHAIScraper)
-    process.start()
+    try:
+        process.start()
+    finally:
+        extraction_pool.shutdown()
     flow.metrics["stored_count"][step_name]["website_scraper"] = \
         sum(website_count.values())
-    articles = storage.get_all(flow.articles_table)
-    if len(articles) == 0:
-        flow.last_id = 0
-    else:
-        flow.last_id = max([int(doc.get("doc_id")) for doc in articles])
+    flow.metrics.setdefault("skipped_count", {})[step_name] = skipped_count
+    flow.metrics.setdefault("browser_pool", {})[step_name] = browser_pool_stats
+    flow.metrics.setdefault("rendering", {})[step_name] = rendering
+    flow.metrics.setdefault("extraction", {})[step_name] = extraction_pool.stats()
+    flow.metrics.setdefault("http_cache", {})[step_name] = \
+        response_cache.stats() if response_cache else {"mode": "off"}
+    get_seen_index(storage, flow.articles_table).persist()
+    fetch_strategy = get_fetch_strategy(storage)
+    fetch_strategy.persist()
+    flow.metrics.setdefault("fetch_strategy", {})[step_name] = fetch_strategy.stats()
+    feed_poller = get_feed_poller(storage)
+    feed_poller.persist()
+    flow.metrics.setdefault("feed_polling", {})[step_name] = feed_poller.stats()
+    flow.last_id = storage.last_doc_id(flow.articles_table)
     total_time = time.time() - start_time
     flow.metrics.setdefault("step_duration", {})[step_name] = total_time
+    flow.metrics.setdefault("storage_cache", {})[step_name] = storage.cache_stats()
     logger.info(f"✅ Step {step_name} done in {total_time:.2f}s")
     storage.save("ingestions",
                  {
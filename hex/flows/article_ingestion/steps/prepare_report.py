@@ -16,7 +16,7 @@ from hex.flows.analysis import get_reference_domains, format_duration, \
                                prepare_domain_counts, generate_domain_match_markdown, \
                                prepare_field_coverage, generate_field_coverage_markdown
 from hex.flows.analysis import get_articles_with_no_error
-from hex.storage.hex_storage import HexStorage
+from hex.storage.hex_storage import get_storage
 
 logger = logging.getLogger(__name__)
 
@@ -85,6 +85,17 @@ def execute(flow):
     # --- Key-value pairs for reporting ---
     timestamp = flow.metrics["step_start_times"]["ingest_rss_articles"]
     dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+    skipped_count = flow.metrics.get("skipped_count", {}).get("ingest_rss_articles", {})
+    browser_pool = flow.metrics.get("browser_pool", {}).get("ingest_rss_articles", {})
+    fetch_strategy = flow.metrics.get("fetch_strategy", {}).get("ingest_rss_articles", {})
+    feed_polling = flow.metrics.get("feed_polling", {}).get("ingest_rss_articles", {})
+    extraction = flow.metrics.get("extraction", {}).get("ingest_rss_articles", {})
+    http_cache = flow.metrics.get("http_cache", {}).get("ingest_rss_articles", {})
+    rendering = flow.metrics.get("rendering", {}).get("ingest_rss_articles", {})
+    rendered = {
+        key: sum(site.get(key, 0) for site in rendering.values())
+        for key in ("pages", "bytes", "aborted_requests", "render_time")
+    }
     rows = [
         ["Articles Table", flow.articles_table],
         ["Articles Limit", flow.articles_limit],
@@ -101,9 +112,61 @@ def execute(flow):
                 (flow.metrics["stored_count"]["ingest_rss_articles"]["rss_article_scraper"]
                  + flow.metrics["stored_count"]["ingest_rss_articles"]["stealth_rss_article_scraper"]
                  + flow.metrics["stored_count"]["ingest_rss_articles"]["website_scraper"])],
+        ["Skipped Known Articles (before fetching)", sum(skipped_count.values())],
+        ["Skipped by Scraper", ", ".join(
+            f"{name}: {count}" for name, count in sorted(skipped_count.items())
+        ) or "N/A"],
+        ["Polled Feeds", "{} ({} not modified, {} failed)".format(
+            feed_polling.get("polled", 0), feed_polling.get("not_modified", 0),
+            feed_polling.get("failed", 0)
+        )],
+        ["New Feed Entries", "{} of {}".format(
+            feed_polling.get("new_entries", 0), feed_polling.get("entries", 0)
+        )],
+        ["HTTP / Browser Fetches", "{} / {} ({} escalated to the browser)".format(
+            fetch_strategy.get("http", 0), fetch_strategy.get("browser", 0),
+            fetch_strategy.get("escalated", 0)
+        )],
+        ["Browser-only Domains", ", ".join(
+            fetch_strategy.get("browser_domains", [])
+        ) or "N/A"],
+        ["Stealth Browser Pool", "{} browsers, {:.0%} utilization".format(
+            browser_pool.get("size", 0), browser_pool.get("utilization", 0)
+        )],
+        ["Stealth Fetch Latency (p50 / p95)", "{:.2f}s / {:.2f}s ({} fetches)".format(
+            browser_pool.get("p50_latency", 0), browser_pool.get("p95_latency", 0),
+            browser_pool.get("fetches", 0)
+        )],
+        ["Stealth Render", "{:.2f}s mean, {:.1f} MB ({} requests blocked)".format(
+            browser_pool.get("mean_render_time", 0),
+            browser_pool.get("render_bytes", 0) / 1e6,
+            browser_pool.get("aborted_requests", 0)
+        )],
+        ["Rendered Site Pages", "{} pages, {:.2f}s mean, {:.1f} MB ({} requests blocked)".format(
+            rendered["pages"],
+            rendered["render_time"] / rendered["pages"] if rendered["pages"] else 0,
+            rendered["bytes"] / 1e6, rendered["aborted_requests"]
+        )],
+        ["Extraction Pool", "{} workers, queue depth {:.1f} mean / {} max".format(
+            extraction.get("workers", 0), extraction.get("mean_queue_depth", 0),
+            extraction.get("max_queue_depth", 0)
+        )],
+        ["Extraction Time", "{:.2f}s ({} pages, {:.3f}s each, {} failed)".format(
+            extraction.get("extraction_time", 0), extraction.get("extractions", 0),
+            extraction.get("mean_extraction_time", 0), extraction.get("failed", 0)
+        )],
+        ["HTTP Cache", "{}: {} hits, {} misses, {} stale, {} stored".format(
+            http_cache.get("mode", "off"), http_cache.get("hits", 0),
+            http_cache.get("misses", 0), http_cache.get("stale", 0),
+            http_cache.get("stored", 0)
+        )],
         ["Start Time", dt.isoformat()],
         ["Duration", format_duration(
             flow.metrics["step_duration"]["ingest_rss_articles"]
+        )],
+        ["Saved Parse Time", "{:.2f}s".format(
+            flow.metrics.get("storage_cache", {})
+            .get("ingest_rss_articles", {}).get("saved_parse_time", 0)
         )]
     ]
 
@@ -112,7 +175,7 @@ def execute(flow):
         data=rows
     ))
 
-    storage = HexStorage(flow.config.get("db_path"))
+    storage = get_storage(flow.config)
     articles = storage.get_obj_in_range(
         flow.articles_table,
         flow.first_id,
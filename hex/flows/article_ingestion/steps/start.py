@@ -1,7 +1,7 @@
 import logging
 from hex.utils.date import to_aware_utc
 
-from hex.storage.hex_storage import HexStorage
+from hex.storage.hex_storage import get_storage
 from hex.utils.config import load_config
 from hex.utils.git import get_git_metadata
 
@@ -11,7 +11,7 @@ logger = logging.getLogger(__name__)
 def _clean_up_tables(storage, flow):
     """ Clean up tables for a fresh run. """
     if flow.clean_tables:
-        storage.db.drop_table(flow.articles_table)
+        storage.drop_table(flow.articles_table)
         logger.info("✅ Database cleaned.")
     else:
         logger.info("✅ Database not cleaned.")
@@ -26,15 +26,11 @@ def execute(flow):
         flow.rss_stealth_feeds = [line.strip() for line in f if line.strip()]
     flow.git_metadata = get_git_metadata()
     flow.parsed_date_threshold = to_aware_utc(flow.date_threshold)
-    storage = HexStorage(flow.config.get("db_path"))
+    storage = get_storage(flow.config)
     logger.info("✅ Database first connection established.")
     _clean_up_tables(storage, flow)
     
     # Initialize metrics dictionary
     flow.metrics = {}
     flow.errors = {}
-    articles = storage.get_all(flow.articles_table)
-    if len(articles) == 0:
-        flow.first_id = 0
-    else:
-        flow.first_id = max([int(doc.get("doc_id")) for doc in articles])
\ No newline at end of file
+    flow.first_id = storage.last_doc_id(flow.articles_table)
\ No newline at end of file
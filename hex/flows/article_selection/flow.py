@@ -56,7 +56,7 @@ class ArticleSelectionFlow(FlowSpec):
     def load_articles(self):
         """Load articles published after a date threshold."""
         load_articles_step(self)
-        if len(self.articles) == 0:
+        if len(self.candidates) == 0:
             self.log.warning("No articles to process.")
             self.log.warning("Exiting flow.")
             self.next(self.end)
@@ -1,9 +1,28 @@
 """ End step. """
 import logging
 
+from hex.storage.hex_storage import get_storage
+
 logger = logging.getLogger(__name__)
 
 
 def execute(flow):
-    """ Finalize the pipeline. """
+    """
+    Finalize the pipeline and commit the articles cursor. Candidates that
+    were not selected but can be on a later run stay pending; the others
+    are consumed and come back only if they are updated.
+    """
+    storage = get_storage(flow.config)
+    selected = set(flow.selected_article_ids)
+    unhandled = [
+        doc_id for doc_id in flow.selectable_article_ids
+        if doc_id not in selected
+    ]
+    storage.commit_cursor(
+        flow.articles_table, flow.articles_consumer, flow.articles_cursor,
+        unhandled=unhandled
+    )
+    logger.info(f"✅ Committed '{flow.articles_consumer}' cursor "
+                f"at change {flow.articles_cursor['position']}, "
+                f"{len(unhandled)} candidates left pending")
     logger.info("Finishing the pipeline")
@@ -3,8 +3,8 @@ import logging
 import time
 from tinydb import Query
 
-from hex.utils.date import to_aware_utc
-from hex.storage.hex_storage import HexStorage
+from hex.utils.date import to_epoch
+from hex.storage.hex_storage import get_storage
 
 # Initialize logger at module level
 logger = logging.getLogger(__name__)
@@ -13,11 +13,12 @@ logger = logging.getLogger(__name__)
 def _load_query(storage, articles_table, date_threshold):
     """Load articles from the database."""
     Article = Query()
-    articles = storage.search(
+    storage.backfill_published_ts(articles_table)
+    articles = storage.search_range(
         articles_table,
-        (Article.published_date.test(
-            lambda d: to_aware_utc(d) >= date_threshold
-        ) & Article.clusters_names_in_order_added.exists()),
+        "published_ts",
+        lower=to_epoch(date_threshold),
+        query=Article.clusters_names_in_order_added.exists(),
     )
     logger.info(
         f"✅ Loaded {len(articles)} articles from '{articles_table}': "
@@ -26,23 +27,40 @@ def _load_query(storage, articles_table, date_threshold):
     return articles
 
 
+def _load_candidates(storage, articles_table, date_threshold, consumer):
+    """
+    Enriched articles added or updated since the last run, and those not
+    selected by earlier runs, published after the date threshold.
+    """
+    lower = to_epoch(date_threshold)
+
+    def is_candidate(article):
+        published_ts = article.get("published_ts")
+        return (
+            "clusters_names_in_order_added" in article
+            and (lower is None or (published_ts is not None and published_ts >= lower))
+        )
+
+    candidates, cursor = storage.changes_since(
+        articles_table, consumer=consumer, where=is_candidate
+    )
+    logger.info(f"✅ {len(candidates)} candidate articles for selection")
+    return candidates, cursor
+
+
 def _filter_already_selected_articles(
     storage, articles, articles_table, selected_articles_table
 ):
     """Filter out already selected articles."""
-    Article = Query()
-    selected_articles = storage.search(
-        selected_articles_table,
-        Article.original_table_name == articles_table,
-    )
+    Selected = Query()
     filtered_out = []
     kept_articles = []
-    ids = set()
-    for rep in selected_articles:
-        ids.add(rep["original_doc_id"])
-    logger.info(f"✅ There are {len(ids)} already selected articles")
     for article in articles:
-        if article["doc_id"] in ids:
+        if storage.search(
+            selected_articles_table,
+            (Selected.original_doc_id == article["doc_id"])
+            & (Selected.original_table_name == articles_table),
+        ):
             filtered_out.append(article)
         else:
             kept_articles.append(article)
@@ -60,18 +78,29 @@ def execute(flow):
     start_time = time.time()
     flow.metrics.setdefault("step_start_times", {})[step_name] = start_time
 
-    storage = HexStorage(flow.config.get("db_path"))
+    storage = get_storage(flow.config)
 
     articles = _load_query(
         storage, flow.articles_table, flow.min_parsed_date_threshold
     )
+    flow.articles_consumer = f"selection:{flow.selected_articles_table}"
+    candidates, flow.articles_cursor = _load_candidates(
+        storage, flow.articles_table, flow.parsed_date_threshold,
+        flow.articles_consumer
+    )
+    flow.selected_article_ids = []
+    flow.selectable_article_ids = []
 
     logger.info("✅ Filtering out already replicated articles...")
     articles = _filter_already_selected_articles(
         storage, articles, flow.articles_table, flow.selected_articles_table
     )
+    flow.candidates = _filter_already_selected_articles(
+        storage, candidates, flow.articles_table, flow.selected_articles_table
+    )
     flow.articles = articles
     logger.info(f"✅ Loaded {len(flow.articles)} articles...")
     total_time = time.time() - start_time
     flow.metrics.setdefault("step_duration", {})[step_name] = total_time
+    flow.metrics.setdefault("storage_cache", {})[step_name] = storage.cache_stats()
     logger.info(f"✅ Step {step_name} done in {total_time:.2f}s")
@@ -3,7 +3,7 @@ from metaflow import step, card, current
 from metaflow.cards import Markdown, Table
 
 from hex.flows.article_selection.steps.generate_newsletter import generate_newsletter_markdown
-from hex.storage.hex_storage import HexStorage
+from hex.storage.hex_storage import get_storage
 
 logger = logging.getLogger(__name__)
 
@@ -71,9 +71,14 @@ def execute(flow):
     """Prepare a comprehensive report of the article selection process."""
     current.card.append(Markdown("# 📋 Prepared Report Overview"))
 
-    storage = HexStorage(flow.config.get("db_path"))
+    storage = get_storage(flow.config)
     selection_time = flow.selection.get("selection_time")
     current.card.append(Markdown(f"**Selection Time**: `{selection_time}`"))
+    saved_parse_time = sum(
+        stats.get("saved_parse_time", 0)
+        for stats in flow.metrics.get("storage_cache", {}).values()
+    )
+    current.card.append(Markdown(f"**Saved Parse Time**: `{saved_parse_time:.2f}s`"))
 
     render_articles("Top {flow.articles_limit} Linearly Scored Articles selected with diversity", flow.selection.get("linearly_selected_articles_with_diversity", []))
 
@@ -9,7 +9,7 @@ from hex.utils.date import to_aware_utc
 from hex.flows.analysis import filter_articles_by_clusters
 from copy import deepcopy
 
-from hex.storage.hex_storage import HexStorage
+from hex.storage.hex_storage import get_storage
 
 
 # Initialize logger at module level
@@ -97,6 +97,14 @@ def get_top_n_articles(scored_articles, n=5):
     return sorted_articles[:n]
 
 
+def is_excluded(article) -> bool:
+    """True if the article is never selected, whatever the scores."""
+    return (
+        re.search(r"newsletter", article["title"], re.IGNORECASE) is not None
+        or re.search(r"therundown.ai", article["url_domain"], re.IGNORECASE) is not None
+    )
+
+
 def select_top_articles_with_diversity(
     articles_for_cluster_scores: list,
     articles_for_selection: list,
@@ -133,8 +141,7 @@ def select_top_articles_with_diversity(
             articles.remove(max_item)
             if(max_item["title"] not in title_already_selected
                and max_item["url_domain"] not in url_domain_already_selected
-               and re.search(r"newsletter", max_item["title"], re.IGNORECASE) is None
-               and re.search(r"therundown.ai", max_item["url_domain"], re.IGNORECASE) is None):
+               and not is_excluded(max_item)):
                 selected = True
                 title_already_selected.add(max_item["title"])
                 url_domain_already_selected.add(max_item["url_domain"])
@@ -188,20 +195,17 @@ def execute(flow):
     start_time = time.time()
     flow.metrics.setdefault("step_start_times", {})[step_name] = start_time
 
-    flow.articles = filter_articles_by_clusters(
-        flow.articles,
-        ["artificial intelligence", "large language models", "India"]
-    )
+    ignored_clusters = ["artificial intelligence", "large language models", "India"]
+    flow.articles = filter_articles_by_clusters(flow.articles, ignored_clusters)
     articles_for_cluster_scores = [
         article for article in flow.articles
         if to_aware_utc(article["published_date"]) >= flow.parsed_cluster_date_threshold
         and "clusters_names_in_order_added" in article
     ]
-    articles_for_selection = [
-        article for article in flow.articles
-        if to_aware_utc(article["published_date"]) >= flow.parsed_date_threshold
-        and "clusters_names_in_order_added" in article
-    ]
+    # Candidates loaded from the change feed, already in the date window
+    articles_for_selection = filter_articles_by_clusters(
+        flow.candidates, ignored_clusters
+    )
     logger.info(f"✅ {len(articles_for_cluster_scores)} articles for cluster scores")
     logger.info(f"✅ {len(articles_for_selection)} articles for selection")
     logger.info("✅ Scoring clusters...")
@@ -212,7 +216,7 @@ def execute(flow):
             articles_for_cluster_scores, articles_for_selection,
             order_metric=linear_order_metric, n=limit
         )
-    storage = HexStorage(flow.config.get("db_path"))
+    storage = get_storage(flow.config)
     selection = {
         "selection_time": str(datetime.now(timezone.utc)),
         "clusters_scores": cluster_scores,
@@ -222,17 +226,28 @@ def execute(flow):
         "ingestion_summary": generate_ingestion_summary(flow.articles)
     }
 
-    for article in top_n_linearly_scored_articles_with_diversity:
-        storage.save(
-            flow.selected_articles_table,
+    storage.save_many(
+        flow.selected_articles_table,
+        [
             {
                 "original_table_name": flow.articles_table,
                 "original_doc_id": article["doc_id"]
             }
-        )
+            for article in top_n_linearly_scored_articles_with_diversity
+        ]
+    )
+    flow.selected_article_ids = [
+        article["doc_id"] for article in top_n_linearly_scored_articles_with_diversity
+    ]
+    # Excluded candidates can never be selected: they are not re-queued
+    flow.selectable_article_ids = [
+        article["doc_id"] for article in articles_for_selection
+        if not is_excluded(article)
+    ]
     doc_id = storage.save("selections", selection)[0]
     selection["doc_id"] = doc_id
     flow.selection = selection
     total_time = time.time() - start_time
     flow.metrics.setdefault("step_duration", {})[step_name] = total_time
+    flow.metrics.setdefault("storage_cache", {})[step_name] = storage.cache_stats()
     logger.info(f"✅ Step {step_name} done in {total_time:.2f}s")
@@ -1,7 +1,7 @@
 import logging
 from hex.utils.date import to_aware_utc
 
-from hex.storage.hex_storage import HexStorage
+from hex.storage.hex_storage import get_storage
 from hex.utils.config import load_config
 from hex.utils.git import get_git_metadata
 
@@ -11,7 +11,10 @@ logger = logging.getLogger(__name__)
 def _clean_up_tables(storage, flow):
     """ Clean up tables for a fresh run. """
     if flow.clean_tables:
-        storage.db.drop_table(flow.selected_articles_table)
+        storage.drop_table(flow.selected_articles_table)
+        storage.reset_cursor(
+            flow.articles_table, f"selection:{flow.selected_articles_table}"
+        )
         logger.info("✅ Database cleaned.")
     else:
         logger.info("✅ Database not cleaned.")
@@ -33,7 +36,7 @@ def execute(flow):
         f"✅ parsed_cluster_date_threshold: {flow.parsed_cluster_date_threshold}"
     )
     logger.info(f"✅ min_parsed_date_threshold: {flow.min_parsed_date_threshold}")
-    storage = HexStorage(flow.config.get("db_path"))
+    storage = get_storage(flow.config)
     logger.info("✅ Database first connection established.")
     _clean_up_tables(storage, flow)
 
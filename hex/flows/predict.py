@@ -1,21 +1,83 @@
 """ Predict functions for the Hex pipeline. """
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 
 from hex.utils.print import safe_pretty_print
 from hex.models.loader import load_model_spec
+from hex.models.rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
-def predict(model_spec_name, data):
-    """Predict using the model specified by model_spec_name."""
+
+def estimate_tokens(model, validated_input: dict) -> int:
+    """ Prompt tokens reserved before a request (about 4 characters each). """
+    prompt = getattr(model, "prompt", None)
+    if prompt is not None:
+        text = prompt(**validated_input)
+    else:
+        text = " ".join(str(value) for value in validated_input.values())
+    return len(text) // 4 + 1
+
+
+def model_rate_limiter(model_spec):
+    """ The rate limiter shared by the specs calling the same provider endpoint. """
+    config = model_spec.config
+    return get_rate_limiter(
+        f"{model_spec.provider}:{getattr(config, 'base_url', '')}",
+        getattr(config, "requests_per_minute", None),
+        getattr(config, "tokens_per_minute", None),
+    )
+
+
+def _predict_one(model_spec, limiter, validated_input: dict) -> dict:
+    """
+    One prediction, served from the model's cache when it has one, else
+    rate limited and timed without the rate limit wait.
+    """
+    model = model_spec._loaded_model
+    pred_start_time = time.time()
+    cached_prediction = getattr(model, "cached_prediction", None)
+    pred = cached_prediction(validated_input) if cached_prediction else None
+    if pred is not None:
+        pred["metadata"]["duration"] = time.time() - pred_start_time
+        return pred
+    estimated_tokens = estimate_tokens(model, validated_input)
+    limiter.acquire(estimated_tokens)
+    pred_start_time = time.time()
+    try:
+        if cached_prediction:
+            # Already looked up above
+            pred = model.predict(validated_input, check_cache=False)
+        else:
+            pred = model.predict(validated_input)
+    except Exception:
+        limiter.settle(estimated_tokens, None)
+        raise
+    pred["metadata"]["duration"] = time.time() - pred_start_time
+    limiter.settle(estimated_tokens, pred["metadata"].get("total_tokens"))
+    return pred
+
+
+def predict(model_spec_name, data, concurrency: Optional[int] = None):
+    """
+    Predict using the model specified by model_spec_name.
+
+    Up to `concurrency` (default: the spec's) predictions run at once,
+    within the requests and tokens per minute of the model's provider.
+    Inputs and outputs keep the order of `data`, with a None output for
+    each failed item, and errors give the index of their item.
+    """
     model_spec = load_model_spec(model_spec_name)
+    concurrency = concurrency or model_spec.concurrency
     model_inputs = []
     model_outputs = []
     errors = []
     logger.info(f"✅ Loading model spec: {model_spec_name}")
     logger.info(safe_pretty_print(model_spec))
 
+    validated_inputs = []
     for idx, input in enumerate(data):
         validated_input = model_spec.extract_and_validate_input(input)
         logger.info(f"✅ Provider '{model_spec.provider}'"
@@ -26,31 +88,62 @@ def predict(model_spec_name, data):
         # TODO CHANGE THIS LINE BUT WORKS FOR NOW
         # model_inputs.append(validated_input)
         model_inputs.append({"article_id": input["doc_id"]})
-        pred_start_time = time.time()
-        try:
-            pred_success = True
-            pred = model_spec._loaded_model.predict(validated_input)
-        except Exception as e:
-            if 'No auth credentials found' in str(e):
-                raise ValueError(
-                    f"Wrong OpenRouter API key!\n"
-                    f"You need to set the OPENROUTER_API_KEY in the .env file!\n"
-                    f">>> See README.md for more details <<<"
-                )
-            logger.error(f"❌ Error on article {idx}: {str(e)}")
-            errors.append({
-                "index": idx,
-                "error_message": str(e),
-                "article_id": input["doc_id"]
-            })
-            pred_success = False
-        if pred_success:
-            pred_duration = time.time() - pred_start_time
-            pred["metadata"]["duration"] = pred_duration
+        validated_inputs.append(validated_input)
+
+    limiter = model_rate_limiter(model_spec)
+    start_time = time.time()
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(concurrency, len(data))),
+        thread_name_prefix=f"predict-{model_spec_name}"
+    ) as executor:
+        futures = [
+            executor.submit(_predict_one, model_spec, limiter, validated_input)
+            for validated_input in validated_inputs
+        ]
+        for idx, (input, future) in enumerate(zip(data, futures)):
+            try:
+                pred = future.result()
+            except Exception as e:
+                if 'No auth credentials found' in str(e):
+                    executor.shutdown(cancel_futures=True)
+                    raise ValueError(
+                        f"Wrong OpenRouter API key!\n"
+                        f"You need to set the OPENROUTER_API_KEY in the .env file!\n"
+                        f">>> See README.md for more details <<<"
+                    )
+                logger.error(f"❌ Error on article {idx}: {str(e)}")
+                errors.append({
+                    "index": idx,
+                    "error_message": str(e),
+                    "article_id": input["doc_id"]
+                })
+                model_outputs.append(None)
+                continue
             validated_output = model_spec.validate_output(pred)
-            logger.info(f"✅ Outputs:")
+            logger.info(f"✅ Outputs {idx+1}/{len(data)}:")
             logger.info(safe_pretty_print(validated_output))
             model_outputs.append(validated_output)
-        else:
-            model_outputs.append(None)
+
+    logger.info(f"✅ {len(data)} predictions in {time.time() - start_time:.2f}s "
+                f"({concurrency} at once, {len(errors)} failed), "
+                f"rate limiter: {limiter.stats()}")
+    return model_inputs, model_outputs, errors
+
+
+def predict_selected(model_spec_name, data, selected: List[int]):
+    """
+    Predict the items of `data` at the `selected` indices in one concurrent
+    batch. Inputs and outputs are aligned with `data` (None for the items
+    not selected) and errors give indices in `data`.
+    """
+    model_inputs = [None] * len(data)
+    model_outputs = [None] * len(data)
+    if not selected:
+        return model_inputs, model_outputs, []
+    inputs, outputs, errors = predict(model_spec_name, [data[idx] for idx in selected])
+    for idx, model_input, model_output in zip(selected, inputs, outputs):
+        model_inputs[idx] = model_input
+        model_outputs[idx] = model_output
+    for error in errors:
+        error["index"] = selected[error["index"]]
     return model_inputs, model_outputs, errors
@@ -1,8 +1,11 @@
 import scrapy
 import logging
 from hex.utils.date import to_aware_utc
+from hex.ingestion.fetch_strategy import get_fetch_strategy
+from hex.ingestion.rendering import browser_meta
+from hex.ingestion.seen_index import get_seen_index
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 
 
 logger = logging.getLogger(__name__)
@@ -14,6 +17,9 @@ class BaseArticleScraper(scrapy.Spider, ABC):
     Inherits from scrapy.Spider and enforces a standard scraping interface.
     """
 
+    # Domains whose pages are only readable once rendered in the browser
+    js_only_domains = ()
+
     def __init__(
         self,
         start_urls: List[str],
@@ -21,6 +27,8 @@ class BaseArticleScraper(scrapy.Spider, ABC):
         articles_table="articles",
         articles_limit=None,
         date_threshold=None,
+        seen_index=None,
+        fetch_strategy=None,
         *args,
         **kwargs
     ):
@@ -28,37 +36,26 @@ class BaseArticleScraper(scrapy.Spider, ABC):
         self.start_urls = start_urls
         self.storage = storage
         self.stored_count = 0
+        self.skipped_count = 0
         self.articles_table = articles_table
         self.articles_limit = articles_limit
         self.date_threshold = date_threshold
         self.parsed_date_threshold = (
             to_aware_utc(date_threshold) if date_threshold else None
         )
-        # Cache existing articles for duplicate checking
-        self._existing_article_combinations = self._load_existing_combinations()
+        # Index of stored articles shared by every spider of the crawl
+        self.seen_index = seen_index or get_seen_index(storage, articles_table)
+        # HTTP or browser per domain, learned across runs
+        self.fetch_strategy = fetch_strategy or get_fetch_strategy(storage)
+        self.fetch_strategy.js_only_domains.update(self.js_only_domains)
 
-    def _load_existing_combinations(self) -> set:
+    async def start(self):
         """
-        Load existing article (title, url_domain) combinations from database.
-        Called once during initialization.
-
-        Returns:
-            Set of (title, url_domain) tuples for fast duplicate checking
+        Entry point of Scrapy >= 2.13, which no longer calls
+        start_requests on its own.
         """
-        existing_articles = self.storage.get_all(self.articles_table)
-        existing_combinations = set()
-
-        for article in existing_articles:
-            title = article.get("title", "").strip()
-            url_domain = article.get("url_domain", "").strip()
-            if title and url_domain:
-                existing_combinations.add((title, url_domain))
-
-        logger.info(
-            f"Loaded {len(existing_combinations)} existing article combinations "
-            f"for duplicate checking"
-        )
-        return existing_combinations
+        for request in self.start_requests():
+            yield request
 
     def should_skip_entry(self, entry: dict) -> bool:
         """ Return True if the entry should be skipped. """
@@ -68,8 +65,10 @@ class BaseArticleScraper(scrapy.Spider, ABC):
             self.too_old_entry(entry)
         )
 
-    def limit_is_reached(self) -> bool:
-        if self.articles_limit is not None and self.stored_count >= self.articles_limit:
+    def limit_is_reached(self, pending: int = 0) -> bool:
+        """ True once stored (plus `pending` in-flight) articles hit the limit. """
+        if (self.articles_limit is not None
+                and self.stored_count + pending >= self.articles_limit):
             return True
         else:
             return False
@@ -91,6 +90,34 @@ class BaseArticleScraper(scrapy.Spider, ABC):
             )
             return False
 
+    def skip_known_article(self, url: str, title: str = None,
+                           url_domain: str = None) -> bool:
+        """
+        Return True if the article is already stored (same canonical URL or
+        same title and url_domain), so it can be skipped before any request,
+        or if another request of this run already claimed the URL.
+        """
+        if (self.seen_index.is_known(url, title, url_domain)
+                or not self.seen_index.claim(url)):
+            self.skipped_count += 1
+            logger.info(f"Skipping known article before fetching: {url}")
+            return True
+        return False
+
+    def blocked_over_http(self, response) -> bool:
+        """ True (and recorded) if a plain HTTP download was refused. """
+        if response.meta.get("playwright") or response.status != 403:
+            return False
+        self.fetch_strategy.record(response.url, from_browser=False, ok=False)
+        return True
+
+    def browser_retry(self, response,
+                      ready_selector: Optional[str] = None) -> scrapy.Request:
+        """ Request a page downloaded over HTTP again through the browser. """
+        return response.request.replace(
+            meta={**response.meta, **browser_meta(ready_selector)}, dont_filter=True
+        )
+
     def _filter_duplicate_articles(self, articles: List[dict]) -> List[dict]:
         """
         Filter out articles that already exist in the database based on
@@ -105,7 +132,6 @@ class BaseArticleScraper(scrapy.Spider, ABC):
         if not articles:
             return []
 
-        # Filter out duplicates using cached combinations
         unique_articles = []
         for article in articles:
             title = article.get("title", "").strip()
@@ -118,10 +144,9 @@ class BaseArticleScraper(scrapy.Spider, ABC):
                 )
                 continue
 
-            if (title, url_domain) not in self._existing_article_combinations:
+            # Also records the article, preventing duplicates in the session
+            if self.seen_index.add(article):
                 unique_articles.append(article)
-                # Add to cache to prevent duplicates within the same session
-                self._existing_article_combinations.add((title, url_domain))
             else:
                 logger.info(
                     f"Skipping duplicate article: '{title}' from {url_domain}"
@@ -0,0 +1,324 @@
+""" Pool of warm stealth Chromium browsers shared by the article fetches. """
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import sync_playwright
+from playwright_stealth import stealth_sync
+
+from .parser import extract_domain
+from .rendering import rendering_settings, should_abort_request, transferred_bytes
+
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_OPTIONS = {
+    "user_agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "locale": "en-US",
+    "timezone_id": "Europe/Paris",
+    "viewport": {"width": 1280, "height": 800},
+    "device_scale_factor": 1,
+    "has_touch": False,
+    "is_mobile": False,
+}
+
+
+class StealthBrowser:
+    """
+    One headless Chromium instance with a stealth context whose page is
+    reused across fetches. Playwright's sync API is bound to the thread
+    that started it, so a browser must only be used by its own thread.
+
+    The context aborts the requests extraction does not need (see
+    rendering.should_abort_request). A fetch stops navigating at
+    domcontentloaded, then waits for the network to be idle, at most
+    `network_idle_timeout` ms; `last_render` holds its render stats.
+    """
+
+    def __init__(self, navigation_timeout: int = 60000,
+                 network_idle_timeout: Optional[int] = None):
+        settings = rendering_settings()
+        self.navigation_timeout = navigation_timeout
+        self.wait_until = settings["wait_until"]
+        self.network_idle_timeout = (
+            settings["network_idle_timeout"] if network_idle_timeout is None
+            else network_idle_timeout
+        )
+        self.last_render: Optional[dict] = None
+        self._aborted = 0
+        self._playwright = sync_playwright().start()
+        self._browser = None
+        self._context = None
+        self._page = None
+        self._launch()
+
+    def _launch(self) -> None:
+        self._browser = self._playwright.chromium.launch(headless=True)
+        self._context = self._browser.new_context(**CONTEXT_OPTIONS)
+        self._context.route("**/*", self._route)
+        self._page = None
+
+    def _route(self, route) -> None:
+        if should_abort_request(route.request):
+            self._aborted += 1
+            route.abort()
+        else:
+            route.continue_()
+
+    def _get_page(self):
+        if not self._browser.is_connected():
+            logger.warning("Stealth browser disconnected, relaunching it")
+            self._launch()
+        if self._page is None or self._page.is_closed():
+            self._page = self._context.new_page()
+            stealth_sync(self._page)
+        return self._page
+
+    def fetch(self, url: str) -> str:
+        page = self._get_page()
+        finished = []
+        on_finished = finished.append
+        page.on("requestfinished", on_finished)
+        self._aborted = 0
+        started = time.monotonic()
+        try:
+            page.goto(url, wait_until=self.wait_until, timeout=self.navigation_timeout)
+            try:
+                page.wait_for_load_state("networkidle", timeout=self.network_idle_timeout)
+            except PlaywrightError:
+                pass  # Pages polling forever are used as they are
+            html = page.content()
+        except Exception:
+            # Do not reuse a page left in an unknown state
+            self._page = None
+            try:
+                page.close()
+            except Exception:
+                pass
+            raise
+        finally:
+            page.remove_listener("requestfinished", on_finished)
+        total = 0
+        for request in finished:
+            try:
+                total += transferred_bytes(request.sizes())
+            except PlaywrightError:
+                pass
+        self.last_render = {
+            "bytes": total,
+            "requests": len(finished),
+            "aborted_requests": self._aborted,
+            "render_time": time.monotonic() - started,
+        }
+        return html
+
+    def close(self) -> None:
+        try:
+            self._browser.close()
+        finally:
+            self._playwright.stop()
+
+
+class _Job:
+    def __init__(self, url: str):
+        self.url = url
+        self.domain = extract_domain(url) or url
+        self.future = Future()
+        self.submitted_at = time.monotonic()
+
+
+class StealthBrowserPool:
+    """
+    Fetch pages with `size` warm browsers, each owned by a worker thread.
+
+    Jobs of different domains run concurrently. Jobs of one domain run one
+    at a time, at least `domain_delay` seconds apart. Browsers are started
+    on first use and kept open until `close`.
+    """
+
+    def __init__(self, size: int = 4, domain_delay: float = 3.0,
+                 browser_factory: Optional[Callable[[], StealthBrowser]] = None):
+        if size < 1:
+            raise ValueError("Browser pool size must be at least 1.")
+        self.size = size
+        self.domain_delay = domain_delay
+        self.browser_factory = browser_factory or StealthBrowser
+        self._cond = threading.Condition()
+        self._pending: List[_Job] = []
+        self._busy_domains = set()
+        self._next_allowed: Dict[str, float] = {}
+        self._workers: List[threading.Thread] = []
+        self._closed = False
+        self._started_at = None
+        self._closed_at = None
+        self._busy_time = 0.0
+        self._startup_time = 0.0
+        self._latencies: List[float] = []
+        self._queue_waits: List[float] = []
+        self._errors = 0
+        self._render = {"pages": 0, "bytes": 0, "requests": 0,
+                        "aborted_requests": 0, "render_time": 0.0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _start(self) -> None:
+        self._started_at = time.monotonic()
+        for i in range(self.size):
+            worker = threading.Thread(
+                target=self._work, name=f"stealth-browser-{i}", daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, url: str) -> Future:
+        """ Queue a fetch; the future resolves to the page HTML. """
+        job = _Job(url)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Browser pool is closed.")
+            if not self._workers:
+                self._start()
+            self._pending.append(job)
+            self._cond.notify_all()
+        return job.future
+
+    def fetch(self, url: str) -> str:
+        return self.submit(url).result()
+
+    def _next_job(self) -> Optional[_Job]:
+        """
+        Take the oldest job whose domain is idle and past its delay,
+        waiting until one is; None once the pool is closed and drained.
+        """
+        with self._cond:
+            while True:
+                if self._closed and not self._pending:
+                    return None
+                now = time.monotonic()
+                wake_at = None
+                for position, job in enumerate(self._pending):
+                    if job.domain in self._busy_domains:
+                        continue
+                    allowed_at = self._next_allowed.get(job.domain, 0.0)
+                    if allowed_at <= now:
+                        del self._pending[position]
+                        self._busy_domains.add(job.domain)
+                        return job
+                    wake_at = allowed_at if wake_at is None else min(wake_at, allowed_at)
+                self._cond.wait(None if wake_at is None else wake_at - now)
+
+    def _release(self, job: _Job, started: float, error: bool,
+                 render: Optional[dict] = None) -> None:
+        finished = time.monotonic()
+        with self._cond:
+            if render:
+                self._render["pages"] += 1
+                for name, value in render.items():
+                    self._render[name] += value
+            self._busy_domains.discard(job.domain)
+            self._next_allowed[job.domain] = finished + self.domain_delay
+            self._busy_time += finished - started
+            self._latencies.append(finished - started)
+            self._queue_waits.append(started - job.submitted_at)
+            self._errors += int(error)
+            self._cond.notify_all()
+
+    def _work(self) -> None:
+        browser = None
+        try:
+            while True:
+                job = self._next_job()
+                if job is None:
+                    return
+                if browser is None:
+                    launch_start = time.monotonic()
+                    try:
+                        browser = self.browser_factory()
+                    except Exception as e:
+                        self._release(job, time.monotonic(), error=True)
+                        job.future.set_exception(e)
+                        continue
+                    finally:
+                        with self._cond:
+                            self._startup_time += time.monotonic() - launch_start
+                started = time.monotonic()
+                try:
+                    html = browser.fetch(job.url)
+                except Exception as e:
+                    self._release(job, started, error=True)
+                    job.future.set_exception(e)
+                else:
+                    self._release(job, started, error=False,
+                                  render=getattr(browser, "last_render", None))
+                    job.future.set_result(html)
+        finally:
+            if browser is not None:
+                try:
+                    browser.close()
+                except Exception as e:
+                    logger.warning(f"Failed to close stealth browser: {e}")
+
+    def close(self) -> None:
+        """ Finish the queued fetches, then close every browser. """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        for worker in self._workers:
+            worker.join()
+        self._closed_at = time.monotonic()
+
+    def stats(self) -> dict:
+        """
+        Pool utilization (share of worker time spent fetching), per-fetch
+        latency in seconds, excluding browser startup, and the bytes
+        transferred to render the pages.
+        """
+        with self._cond:
+            latencies = sorted(self._latencies)
+            queue_waits = list(self._queue_waits)
+            busy_time = self._busy_time
+            startup_time = self._startup_time
+            errors = self._errors
+            render = dict(self._render)
+        if self._started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._closed_at or time.monotonic()) - self._started_at
+
+        def percentile(q):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+        return {
+            "size": self.size,
+            "fetches": len(latencies),
+            "errors": errors,
+            "elapsed": elapsed,
+            "startup_time": startup_time,
+            "utilization": busy_time / (self.size * elapsed) if elapsed else 0.0,
+            "mean_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p50_latency": percentile(0.5),
+            "p95_latency": percentile(0.95),
+            "max_latency": latencies[-1] if latencies else 0.0,
+            "mean_queue_wait":
+                sum(queue_waits) / len(queue_waits) if queue_waits else 0.0,
+            "render_bytes": render["bytes"],
+            "render_requests": render["requests"],
+            "aborted_requests": render["aborted_requests"],
+            "mean_render_time":
+                render["render_time"] / render["pages"] if render["pages"] else 0.0,
+        }
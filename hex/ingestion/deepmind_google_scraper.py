@@ -15,6 +15,8 @@ class DeepMindGoogleScraper(HTMLArticleScraper):
     """
 
     name = "deepmind_google_scraper"
+    listing_ready_selector = "gdm-filter a"
+    article_ready_selector = "h1.glue-headline"
     
     def __init__(
         self,
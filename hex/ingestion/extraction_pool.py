@@ -0,0 +1,158 @@
+""" Process pool running the HTML-to-markdown extraction off the crawler thread. """
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+from .parser import clean_markdown, extract_markdown_from_html
+
+
+logger = logging.getLogger(__name__)
+
+
+def extract_fields(html: str, summary: str) -> dict:
+    """
+    Extract the markdown text of a page and clean its summary.
+    Runs in a worker process, so it only takes and returns plain data.
+    """
+    start_time = time.perf_counter()
+    text_content = extract_markdown_from_html(html)
+    summary = clean_markdown(summary)
+    return {
+        "text_content": text_content,
+        "summary": summary,
+        "extraction_time": time.perf_counter() - start_time,
+    }
+
+
+class ExtractionPool:
+    """
+    Run `extract_fields` in `max_workers` processes.
+
+    At most `max_pending` extractions are queued or running, which slows
+    the spiders down instead of buffering every downloaded page in
+    memory. When the queue is full, `submit` blocks its thread, while
+    `extract_async` waits on the event loop without blocking it, so the
+    reactor keeps downloading. The processes are started on first use.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.max_workers
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._waiters = deque()
+        self._pending = 0
+        self._counts = {"submitted": 0, "failed": 0, "max_queue_depth": 0,
+                        "queue_depth_total": 0, "extraction_time": 0.0,
+                        "blocked_time": 0.0}
+
+    def submit(self, html: str, summary: str) -> Future:
+        """
+        Queue an extraction; the future resolves to extract_fields(...).
+        Blocks the calling thread while the queue is full: coroutines on
+        the reactor's event loop use extract_async instead.
+        """
+        start_time = time.perf_counter()
+        self._slots.acquire()
+        return self._submit(html, summary, time.perf_counter() - start_time)
+
+    async def extract_async(self, html: str, summary: str) -> dict:
+        """ extract_fields(...) in the pool, waiting for a slot without blocking. """
+        start_time = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._slots.acquire(blocking=False):
+                    break
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            await waiter
+        future = self._submit(html, summary, time.perf_counter() - start_time)
+        return await asyncio.wrap_future(future)
+
+    def _submit(self, html: str, summary: str, blocked_time: float) -> Future:
+        """ Submit once a slot is held; the slot is released by _done. """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            self._pending += 1
+            self._counts["submitted"] += 1
+            self._counts["queue_depth_total"] += self._pending
+            self._counts["max_queue_depth"] = max(
+                self._counts["max_queue_depth"], self._pending
+            )
+            self._counts["blocked_time"] += blocked_time
+        try:
+            future = self._executor.submit(extract_fields, html, summary)
+        except BaseException:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Optional[Future]) -> None:
+        with self._lock:
+            self._pending -= 1
+            if (future is None or future.cancelled()
+                    or future.exception() is not None):
+                self._counts["failed"] += 1
+            else:
+                self._counts["extraction_time"] += future.result()["extraction_time"]
+            # Under the lock, so a coroutine cannot miss the release
+            self._slots.release()
+        self._wake_next()
+
+    def _wake_next(self) -> None:
+        """ Let the longest waiting coroutine try to take a free slot. """
+        with self._lock:
+            if not self._waiters:
+                return
+            loop, waiter = self._waiters.popleft()
+        loop.call_soon_threadsafe(self._wake, waiter)
+
+    def _wake(self, waiter: asyncio.Future) -> None:
+        if waiter.done():
+            # Cancelled while waiting: pass the wake-up on
+            self._wake_next()
+        else:
+            waiter.set_result(None)
+
+    def extract(self, html: str, summary: str) -> dict:
+        return self.submit(html, summary).result()
+
+    def stats(self) -> dict:
+        """ Queue depth and extraction time (summed over the workers). """
+        with self._lock:
+            counts = dict(self._counts)
+        submitted = counts.pop("submitted")
+        depth_total = counts.pop("queue_depth_total")
+        done = submitted - counts["failed"]
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "extractions": submitted,
+            **counts,
+            "mean_queue_depth": depth_total / submitted if submitted else 0.0,
+            "mean_extraction_time":
+                counts["extraction_time"] / done if done else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        logger.info(f"✅ Extraction pool done: {self.stats()}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
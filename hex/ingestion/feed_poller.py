@@ -0,0 +1,223 @@
+""" Concurrent RSS feed polling with conditional GET. """
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+import feedparser
+
+from hex.utils.files import atomic_write
+from hex.utils.registry import SharedRegistry
+
+
+logger = logging.getLogger(__name__)
+
+
+def entry_guid(entry: dict) -> str:
+    """ Stable identifier of a feed entry: its id, else its link or title. """
+    return entry.get("id") or entry.get("link") or entry.get("title") or ""
+
+
+class FeedPoller:
+    """
+    Download every feed concurrently and return only the new entries.
+
+    Each feed's ETag and Last-Modified are sent back as conditional
+    request headers, so unchanged feeds answer 304 and are skipped. The
+    GUIDs of the entries already scheduled are kept per feed (the most
+    recent `max_guids`), so a changed feed only yields the entries that
+    were never stored.
+
+    A feed's validators are only saved once `complete` is called for it,
+    after all its new entries were scheduled: a feed cut short by the
+    articles limit is downloaded again on the next run. `retry` drops
+    them when one of its articles could not be fetched, so the feed is
+    downloaded again and the entry, never marked seen, comes back.
+
+    State is persisted as JSON: {feed_url: {"etag", "modified",
+    "guids", "polled_at"}}. All methods are thread-safe.
+    """
+
+    def __init__(self, path: str, max_workers: int = 8, max_guids: int = 1000,
+                 parse: Optional[Callable] = None):
+        self.path = Path(path)
+        self.max_workers = max_workers
+        self.max_guids = max_guids
+        self.parse = parse
+        self._lock = threading.Lock()
+        self.feeds: Dict[str, dict] = {}
+        self._validators: Dict[str, dict] = {}
+        self.counts = {"polled": 0, "not_modified": 0, "failed": 0,
+                       "entries": 0, "new_entries": 0}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.feeds = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring invalid feed state file {self.path}: {e}")
+            self.feeds = {}
+
+    def _fetch(self, feed_url: str):
+        with self._lock:
+            state = dict(self.feeds.get(feed_url, {}))
+        parse = self.parse or feedparser.parse
+        return parse(
+            feed_url, etag=state.get("etag"), modified=state.get("modified")
+        )
+
+    def poll(self, feed_urls: Iterable[str]) -> List[Tuple[str, List[dict]]]:
+        """
+        Fetch the feeds concurrently. Returns (feed_url, new entries) for
+        every changed feed, in the order of `feed_urls`.
+        """
+        feed_urls = list(dict.fromkeys(feed_urls))
+        if not feed_urls:
+            return []
+        start_time = time.time()
+        workers = min(self.max_workers, len(feed_urls))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            feeds = list(executor.map(self._fetch, feed_urls))
+
+        results = []
+        for feed_url, feed in zip(feed_urls, feeds):
+            entries = self._new_entries(feed_url, feed)
+            if entries is not None:
+                results.append((feed_url, entries))
+        self._log_poll(len(feed_urls), start_time)
+        return results
+
+    async def poll_async(self, feed_urls: Iterable[str]
+                         ) -> AsyncIterator[Tuple[str, List[dict]]]:
+        """
+        Fetch the feeds concurrently in worker threads, without blocking
+        the event loop. Yields (feed_url, new entries) for every changed
+        feed as soon as it is downloaded. Closing the generator early
+        cancels the downloads that have not started.
+        """
+        feed_urls = list(dict.fromkeys(feed_urls))
+        if not feed_urls:
+            return
+        start_time = time.time()
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(feed_urls))
+        )
+
+        async def fetch(feed_url):
+            return feed_url, await loop.run_in_executor(executor, self._fetch, feed_url)
+
+        tasks = [asyncio.ensure_future(fetch(feed_url)) for feed_url in feed_urls]
+        try:
+            for done in asyncio.as_completed(tasks):
+                feed_url, feed = await done
+                entries = self._new_entries(feed_url, feed)
+                if entries is not None:
+                    yield feed_url, entries
+            self._log_poll(len(feed_urls), start_time)
+        finally:
+            for task in tasks:
+                task.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _log_poll(self, feed_count: int, start_time: float) -> None:
+        logger.info(
+            f"Polled {feed_count} feeds in {time.time() - start_time:.2f}s: "
+            f"{self.counts['not_modified']} not modified, "
+            f"{self.counts['new_entries']} new entries"
+        )
+
+    def _new_entries(self, feed_url: str, feed):
+        status = feed.get("status")
+        with self._lock:
+            self.counts["polled"] += 1
+            if status == 304:
+                self.counts["not_modified"] += 1
+                logger.info(f"Feed not modified: {feed_url}")
+                return None
+            if status is None and feed.get("bozo"):
+                self.counts["failed"] += 1
+                logger.warning(
+                    f"Failed to fetch feed {feed_url}: {feed.get('bozo_exception')}"
+                )
+                return None
+            seen = set(self.feeds.get(feed_url, {}).get("guids", []))
+            entries = [
+                entry for entry in feed.entries if entry_guid(entry) not in seen
+            ]
+            self.counts["entries"] += len(feed.entries)
+            self.counts["new_entries"] += len(entries)
+            self._validators[feed_url] = {
+                "etag": feed.get("etag"), "modified": feed.get("modified")
+            }
+        return entries
+
+    def mark_seen(self, feed_url: str, entry: dict) -> None:
+        """ Remember an entry as stored, so later polls skip it. """
+        with self._lock:
+            state = self.feeds.setdefault(feed_url, {})
+            guids = state.setdefault("guids", [])
+            guid = entry_guid(entry)
+            if guid and guid not in guids:
+                guids.append(guid)
+                del guids[:-self.max_guids]
+
+    def complete(self, feed_url: str) -> None:
+        """ Save the feed's validators once all its new entries are scheduled. """
+        with self._lock:
+            validators = self._validators.pop(feed_url, None)
+            if validators is None:
+                return
+            state = self.feeds.setdefault(feed_url, {})
+            state.update(validators, polled_at=time.time())
+
+    def retry(self, feed_url: str) -> None:
+        """ Drop the feed's validators: the next poll downloads it in full. """
+        with self._lock:
+            self._validators.pop(feed_url, None)
+            state = self.feeds.get(feed_url)
+            if state is not None:
+                state.pop("etag", None)
+                state.pop("modified", None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+    def persist(self) -> None:
+        """ Write the feed state (atomic replace). """
+        with self._lock:
+            payload = json.dumps(self.feeds, indent=2, sort_keys=True)
+        atomic_write(self.path, payload)
+        logger.info(f"✅ Persisted the state of {len(self.feeds)} feeds")
+
+
+_SHARED_POLLERS: SharedRegistry[FeedPoller] = SharedRegistry()
+
+
+def get_feed_poller(storage, parse: Optional[Callable] = None) -> FeedPoller:
+    """
+    Return the process-wide feed poller, its state stored next to the
+    database, loading it on first use. `parse`, when given, downloads
+    the feeds from now on (e.g. through the HTTP cache).
+    """
+    path = Path(storage.db_path).parent / "feed_state.json"
+    poller = _SHARED_POLLERS.get(
+        os.path.abspath(path), lambda: FeedPoller(str(path))
+    )
+    if parse is not None:
+        poller.parse = parse
+    return poller
+
+
+def clear_feed_pollers() -> None:
+    """ Drop the pollers, so the next one reloads its feed state. """
+    _SHARED_POLLERS.clear()
@@ -0,0 +1,157 @@
+""" Per-domain choice between plain HTTP and browser rendering. """
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from hex.utils.files import atomic_write
+from hex.utils.registry import SharedRegistry
+
+from .parser import extract_domain
+from .rendering import browser_meta
+
+
+logger = logging.getLogger(__name__)
+
+HTTP = "http"
+BROWSER = "browser"
+
+
+class FetchStrategy:
+    """
+    Decide per domain whether pages are downloaded over plain HTTP or
+    rendered in Playwright.
+
+    Pages are fetched over HTTP first. When the extracted text is shorter
+    than `min_text_length`, the page is fetched again in the browser and
+    the domain is switched to the browser for the next runs. Domains
+    listed in `js_only_domains` always use the browser. Learned browser
+    decisions expire after `recheck_after_days`, so sites that became
+    server-rendered are tried over HTTP again.
+
+    Decisions are persisted as JSON: {domain: {"mode", "http_failures",
+    "updated_at"}}. All methods are thread-safe.
+    """
+
+    def __init__(self, path: str, min_text_length: int = 500,
+                 js_only_domains: Iterable[str] = (),
+                 recheck_after_days: float = 30):
+        self.path = Path(path)
+        self.min_text_length = min_text_length
+        self.js_only_domains = set(js_only_domains)
+        self.recheck_after = recheck_after_days * 86400
+        self._lock = threading.Lock()
+        self.domains: Dict[str, dict] = {}
+        self.counts = {"http": 0, "browser": 0, "escalated": 0}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.domains = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring invalid fetch strategy file {self.path}: {e}")
+            self.domains = {}
+
+    def mode(self, url: str) -> str:
+        """ HTTP or BROWSER, the path to try first for this URL. """
+        domain = extract_domain(url)
+        if domain in self.js_only_domains:
+            return BROWSER
+        with self._lock:
+            decision = self.domains.get(domain)
+            if decision is None or decision["mode"] != BROWSER:
+                return HTTP
+            if time.time() - decision["updated_at"] > self.recheck_after:
+                return HTTP
+            return BROWSER
+
+    def request_meta(self, url: str, meta: Optional[dict] = None,
+                     ready_selector: Optional[str] = None) -> dict:
+        """
+        Request meta for the first fetch of `url`, merged with `meta`;
+        in the browser, the page is ready once `ready_selector` is found.
+        """
+        meta = dict(meta or {})
+        if self.mode(url) == BROWSER:
+            meta.update(browser_meta(ready_selector))
+        return meta
+
+    def accepts(self, url: str, text: Optional[str],
+                 from_browser: bool) -> bool:
+        """
+        Record the outcome of an article fetch from the length of its
+        extracted text. Returns False when an HTTP fetch extracted too
+        little text and the page should be fetched again in the browser.
+        """
+        return self.record(
+            url, from_browser, len(text or "") >= self.min_text_length
+        )
+
+    def record(self, url: str, from_browser: bool, ok: bool) -> bool:
+        """
+        Record whether a fetch got usable content. Returns False when an
+        HTTP fetch failed and the page should be fetched again in the
+        browser; browser results are always kept.
+        """
+        domain = extract_domain(url)
+        now = time.time()
+        with self._lock:
+            decision = self.domains.setdefault(
+                domain, {"mode": HTTP, "http_failures": 0, "updated_at": now}
+            )
+            if from_browser:
+                self.counts["browser"] += 1
+                return True
+            self.counts["http"] += 1
+            if ok:
+                decision.update(mode=HTTP, http_failures=0, updated_at=now)
+                return True
+            self.counts["escalated"] += 1
+            decision.update(
+                mode=BROWSER, http_failures=decision["http_failures"] + 1,
+                updated_at=now
+            )
+        logger.info(f"Unusable page over HTTP, using the browser for {url}")
+        return False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self.counts,
+                "browser_domains": sorted(
+                    domain for domain, decision in self.domains.items()
+                    if decision["mode"] == BROWSER
+                ),
+            }
+
+    def persist(self) -> None:
+        """ Write the decisions (atomic replace). """
+        with self._lock:
+            payload = json.dumps(self.domains, indent=2, sort_keys=True)
+        atomic_write(self.path, payload)
+        logger.info(f"✅ Persisted fetch strategy of {len(self.domains)} domains")
+
+
+_SHARED_STRATEGIES: SharedRegistry[FetchStrategy] = SharedRegistry()
+
+
+def get_fetch_strategy(storage) -> FetchStrategy:
+    """
+    Return the process-wide fetch strategy, stored next to the database,
+    loading it on first use.
+    """
+    path = Path(storage.db_path).parent / "fetch_strategy.json"
+    return _SHARED_STRATEGIES.get(
+        os.path.abspath(path), lambda: FetchStrategy(str(path))
+    )
+
+
+def clear_fetch_strategies() -> None:
+    """ Drop the strategies, so the next one reloads its decisions. """
+    _SHARED_STRATEGIES.clear()
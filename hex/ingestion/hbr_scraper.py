@@ -3,6 +3,7 @@ from typing import List, Optional
 from datetime import datetime
 
 from .html_article import HTMLArticleScraper
+from .throttle import crawl_settings
 
 
 logger = logging.getLogger(__name__)
@@ -15,41 +16,10 @@ class HBRScraper(HTMLArticleScraper):
     """
 
     name = "hbr_scraper"
+    listing_ready_selector = "stream-list a"
+    article_ready_selector = "h1"
     
-    # Custom settings for HBR
-    custom_settings = {
-        "CONCURRENT_REQUESTS": 1,
-        "DOWNLOAD_DELAY": 3,
-        "RANDOMIZE_DOWNLOAD_DELAY": True,
-        "DOWNLOAD_TIMEOUT": 60,
-        "RETRY_TIMES": 3,
-        "TELNETCONSOLE_ENABLED": False,
-        "RETRY_HTTP_CODES": [400, 403, 429, 500, 502, 503, 504, 522, 524, 408],
-        "DEFAULT_REQUEST_HEADERS": {
-            "User-Agent": (
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36"
-            ),
-            "Accept": (
-                "text/html,application/xhtml+xml,"
-                "application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8"
-            ),
-            "Accept-Language": "en-US,en;q=0.9",
-            "Accept-Encoding": "gzip, deflate, br",
-            "DNT": "1",
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1",
-            "Sec-Fetch-Dest": "document",
-            "Sec-Fetch-Mode": "navigate",
-            "Sec-Fetch-Site": "none",
-            "Sec-Fetch-User": "?1",
-            "Cache-Control": "max-age=0",
-            "Referer": "https://www.google.com/",
-            "Origin": "https://hbr.org",
-        },
-        "PLAYWRIGHT_DEFAULT_NAVIGATION_TIMEOUT": 120000,
-    }
+    custom_settings = crawl_settings("hbr_scraper")
     
     def __init__(
         self,
@@ -113,13 +83,6 @@ class HBRScraper(HTMLArticleScraper):
         """
         return None
 
-    def get_text_content(self, response) -> Optional[str]:
-        """
-        Extract the main text content from the article page.
-        Uses the parent method get_text_content
-        """
-        return super().get_text_content(response)
-
     def get_published_date(self, response) -> Optional[str]:
         """
         Extract the published date from the article page.
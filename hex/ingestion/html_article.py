@@ -3,10 +3,11 @@ import logging
 import scrapy
 from abc import abstractmethod
 from typing import List, Optional, Dict, Any
-from scrapy_playwright.page import PageMethod
 
 from .base_article import BaseArticleScraper
+from .extraction_pool import ExtractionPool
 from .parser import extract_domain, extract_markdown_from_html
+from .throttle import crawl_settings
 
 
 logger = logging.getLogger(__name__)
@@ -19,30 +20,13 @@ class HTMLArticleScraper(BaseArticleScraper):
     """
 
     name = "html_article_scraper"
-    custom_settings = {
-        "CONCURRENT_REQUESTS": 1,
-        "DOWNLOAD_DELAY": 3,
-        "RANDOMIZE_DOWNLOAD_DELAY": True,
-        "DOWNLOAD_TIMEOUT": 30,
-        "RETRY_TIMES": 5,
-        "TELNETCONSOLE_ENABLED": False,
-        "RETRY_HTTP_CODES": [500, 502, 503, 504, 522, 524, 408],
-        "DEFAULT_REQUEST_HEADERS": {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36"
-            ),
-            "Accept": (
-                "text/html,application/xhtml+xml,"
-                "application/xml;q=0.9,image/webp,*/*;q=0.8"
-            ),
-            "Accept-Language": "en-US,en;q=0.9",
-            "Referer": "https://www.google.com",
-            "Connection": "close"
-        },
-        "PLAYWRIGHT_DEFAULT_NAVIGATION_TIMEOUT": 100000,
-    }
+
+    custom_settings = crawl_settings("html_article_scraper")
+
+    # Selectors found once a rendered listing or article page is ready
+    # (None: wait for the network to be idle)
+    listing_ready_selector = None
+    article_ready_selector = None
 
     def __init__(
         self,
@@ -52,8 +36,8 @@ class HTMLArticleScraper(BaseArticleScraper):
         articles_limit=None,
         date_threshold=None,
         playwright_timeout: int = 60000,
-        wait_for_js: int = 3000,
         *args,
+        extraction_pool: ExtractionPool = None,
         **kwargs
     ):
         super().__init__(
@@ -61,7 +45,7 @@ class HTMLArticleScraper(BaseArticleScraper):
             *args, **kwargs
         )
         self.playwright_timeout = playwright_timeout
-        self.wait_for_js = wait_for_js
+        self.extraction_pool = extraction_pool
 
     def start_requests(self):
         """Generate requests for each start URL."""
@@ -70,19 +54,9 @@ class HTMLArticleScraper(BaseArticleScraper):
                 url=url,
                 callback=self.parse,
                 errback=self.handle_error,
-                meta={
+                meta=self.fetch_strategy.request_meta(url, {
                     "handle_httpstatus_all": True,
-                    "playwright": True,
-                    "playwright_include_page": True,
-                    "playwright_page_methods": [
-                        PageMethod(
-                            "evaluate",
-                            "() => Object.defineProperty( \
-                                navigator, 'webdriver', {get: () => undefined})"
-                        ),
-                        PageMethod("wait_for_timeout", self.wait_for_js),
-                    ]
-                }
+                }, self.listing_ready_selector)
             )
 
     def handle_error(self, failure):
@@ -100,7 +74,12 @@ class HTMLArticleScraper(BaseArticleScraper):
         Parse the main page and extract article links.
         Calls load_more_articles if needed, then processes each article.
         After processing all articles, handles pagination if needed.
+        A page downloaded over HTTP without article links is requested
+        again through the browser.
         """
+        if self.blocked_over_http(response):
+            yield self.browser_retry(response, self.listing_ready_selector)
+            return
         if response.status != 200:
             logger.warning(
                 f"Failed to load page {response.url}: status {response.status}"
@@ -113,6 +92,12 @@ class HTMLArticleScraper(BaseArticleScraper):
         # Extract article links from the page
         article_links = list(dict.fromkeys(self.extract_article_links(response)))
         article_links = article_links[:6]
+        if not self.fetch_strategy.record(
+            response.url, from_browser=bool(response.meta.get("playwright")),
+            ok=bool(article_links)
+        ):
+            yield self.browser_retry(response, self.listing_ready_selector)
+            return
 
         if not article_links:
             logger.info(f"No article links found on {response.url}")
@@ -123,25 +108,17 @@ class HTMLArticleScraper(BaseArticleScraper):
             for link in article_links:
                 if self.limit_is_reached():
                     break
+                if self.skip_known_article(link):
+                    continue
 
                 yield scrapy.Request(
                     url=link,
                     callback=self.parse_article_page,
                     errback=self.handle_article_error,
-                    meta={
+                    meta=self.fetch_strategy.request_meta(link, {
                         "handle_httpstatus_all": True,
-                        "playwright": True,
-                        "playwright_include_page": True,
                         "dont_redirect": False,
-                        "playwright_page_methods": [
-                            PageMethod(
-                                "evaluate",
-                                "() => Object.defineProperty( \
-                                    navigator, 'webdriver', {get: () => undefined})"
-                            ),
-                            PageMethod("wait_for_timeout", self.wait_for_js),
-                        ]
-                    }
+                    }, self.article_ready_selector)
                 )
 
         # Handle pagination after processing all articles
@@ -152,20 +129,10 @@ class HTMLArticleScraper(BaseArticleScraper):
                 url=next_page_url,
                 callback=self.parse,
                 errback=self.handle_error,
-                meta={
+                meta=self.fetch_strategy.request_meta(next_page_url, {
                     "handle_httpstatus_all": True,
-                    "playwright": True,
-                    "playwright_include_page": True,
                     "dont_redirect": False,
-                    "playwright_page_methods": [
-                        PageMethod(
-                            "evaluate",
-                            "() => Object.defineProperty( \
-                                navigator, 'webdriver', {get: () => undefined})"
-                        ),
-                        PageMethod("wait_for_timeout", self.wait_for_js),
-                    ]
-                }
+                }, self.listing_ready_selector)
             )
 
     def handle_article_error(self, failure):
@@ -178,10 +145,15 @@ class HTMLArticleScraper(BaseArticleScraper):
         logger.warning(f"Article request failed: {error}")
         return []
 
-    def parse_article_page(self, response):
+    async def parse_article_page(self, response):
         """
         Parse individual article pages and extract structured data.
+        Pages downloaded over HTTP with too little text are requested
+        again through the browser.
         """
+        if self.blocked_over_http(response):
+            yield self.browser_retry(response, self.article_ready_selector)
+            return
         if response.status != 200:
             logger.warning(
                 f"Failed to load article {response.url}: status {response.status}"
@@ -201,8 +173,14 @@ class HTMLArticleScraper(BaseArticleScraper):
                 "author": self.get_author(response),
                 "published_date": self.get_published_date(response),
                 "html_content": response.text,
-                "text_content": self.get_text_content(response)
+                "text_content": await self.extract_text_content(response)
             }
+            if not self.fetch_strategy.accepts(
+                response.url, article_data["text_content"],
+                from_browser=bool(response.meta.get("playwright"))
+            ):
+                yield self.browser_retry(response, self.article_ready_selector)
+                return
 
             # Clean and validate the data
             if not article_data["title"]:
@@ -312,14 +290,40 @@ class HTMLArticleScraper(BaseArticleScraper):
         """
         pass
 
+    def get_content_html(self, response) -> Optional[str]:
+        """
+        Extract the HTML of the article body, converted to markdown by
+        get_text_content. This default implementation returns the page.
+        """
+        return response.text
+
     def get_text_content(self, response) -> Optional[str]:
         """
         Extract the main text content from the article page.
-        Gets all text content within the section
+        Site scrapers override it with selector-based extraction, or
+        override get_content_html to convert only part of the page.
         """
-        # Get all text content from the section
-        content_elements = extract_markdown_from_html(response.text)
-        return content_elements
+        article_html = self.get_content_html(response)
+        if not article_html:
+            return None
+        return extract_markdown_from_html(article_html)
+
+    async def extract_text_content(self, response) -> Optional[str]:
+        """
+        get_text_content, with the markdown conversion run in the
+        extraction pool when there is one, so the reactor keeps
+        downloading. Selector-based overrides run inline.
+        """
+        overridden = (
+            type(self).get_text_content is not HTMLArticleScraper.get_text_content
+        )
+        if self.extraction_pool is None or overridden:
+            return self.get_text_content(response)
+        article_html = self.get_content_html(response)
+        if not article_html:
+            return None
+        fields = await self.extraction_pool.extract_async(article_html, "")
+        return fields["text_content"]
 
     @abstractmethod
     def load_more_articles(self, response) -> None:
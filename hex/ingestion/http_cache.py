@@ -0,0 +1,333 @@
+""" Record/replay cache of the responses fetched during ingestion. """
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import feedparser
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Response
+from scrapy.responsetypes import responsetypes
+
+from hex.utils.files import atomic_write
+from hex.utils.registry import SharedRegistry
+
+
+logger = logging.getLogger(__name__)
+
+# off: no cache; record: fetch live and store every response; replay: only
+# serve stored responses; refresh: serve stored responses younger than
+# max_age, fetch and store the others.
+HTTP_CACHE_MODES = ("off", "record", "replay", "refresh")
+
+# How a response was fetched: responses of one URL differ between them
+VIA_HTTP, VIA_BROWSER, VIA_STEALTH, VIA_FEED = "http", "browser", "stealth", "feed"
+
+
+class CacheMiss(Exception):
+    """ A response missing from the cache in replay mode. """
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk store of responses.
+
+    Bodies are gzipped under the SHA-256 of their content in `blobs/`, so
+    a page served at several URLs or recorded several times is stored
+    once. Each request (how it was fetched, method, URL and body) has an
+    entry in `entries/` with the status, headers, final URL, fetch time
+    and body key of its latest response.
+
+    `lookup` tells whether a request is served from disk in the cache's
+    mode; in replay mode a miss raises CacheMiss. All methods are
+    thread-safe.
+    """
+
+    def __init__(self, path: str, mode: str = "record",
+                 max_age: Optional[float] = None):
+        if mode not in HTTP_CACHE_MODES or mode == "off":
+            raise ValueError(f"Invalid HTTP cache mode: {mode}")
+        if mode == "refresh" and max_age is None:
+            raise ValueError("The refresh mode needs a max_age.")
+        self.path = Path(path)
+        self.mode = mode
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.counts = {"hits": 0, "misses": 0, "stale": 0, "stored": 0,
+                       "bytes_served": 0, "bytes_stored": 0}
+
+    @staticmethod
+    def request_key(url: str, method: str = "GET", body: bytes = b"",
+                    via: str = VIA_HTTP) -> str:
+        digest = hashlib.sha256()
+        for part in (via, method.upper(), url):
+            digest.update(part.encode("utf-8") + b"\0")
+        digest.update(body or b"")
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path / "entries" / key[:2] / f"{key}.json"
+
+    def _blob_path(self, key: str) -> Path:
+        return self.path / "blobs" / key[:2] / f"{key}.gz"
+
+    def _count(self, **increments) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                self.counts[name] += value
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """ The stored response of a request key, body included, or None. """
+        try:
+            entry = json.loads(self._entry_path(key).read_text(encoding="utf-8"))
+            entry["body"] = gzip.decompress(
+                self._blob_path(entry["body_sha256"]).read_bytes()
+            )
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"Ignoring unreadable cache entry {key}: {e}")
+            return None
+        return entry
+
+    def lookup(self, url: str, method: str = "GET", body: bytes = b"",
+               via: str = VIA_HTTP) -> Optional[Dict[str, Any]]:
+        """
+        The stored response to serve for a request, or None when it must
+        be fetched live (always in record mode). Raises CacheMiss when a
+        response is missing in replay mode.
+        """
+        if self.mode == "record":
+            return None
+        entry = self.get(self.request_key(url, method, body, via))
+        if entry is None:
+            self._count(misses=1)
+            if self.mode == "replay":
+                raise CacheMiss(f"No cached response for {method} {url} ({via})")
+            return None
+        if self.mode == "refresh" and time.time() - entry["fetched_at"] > self.max_age:
+            self._count(stale=1)
+            return None
+        self._count(hits=1, bytes_served=len(entry["body"]))
+        return entry
+
+    def store(self, url: str, status: int, headers: Dict[str, list],
+              body: bytes, method: str = "GET", request_body: bytes = b"",
+              via: str = VIA_HTTP, response_url: Optional[str] = None) -> None:
+        """ Store a live response; nothing is written in replay mode. """
+        if self.mode == "replay":
+            return
+        body_sha256 = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(body_sha256)
+        stored_bytes = 0
+        if not blob_path.exists():
+            atomic_write(blob_path, gzip.compress(body, mtime=0), fsync=False)
+            stored_bytes = len(body)
+        entry = {
+            "url": response_url or url,
+            "status": status,
+            "headers": headers,
+            "body_sha256": body_sha256,
+            "fetched_at": time.time(),
+        }
+        key = self.request_key(url, method, request_body, via)
+        atomic_write(self._entry_path(key), json.dumps(entry), fsync=False)
+        self._count(stored=1, bytes_stored=stored_bytes)
+
+    def submit(self, url: str, fetch) -> Future:
+        """
+        Wrap a page fetch returning HTML (e.g. StealthBrowserPool.submit):
+        served from disk when cached, else fetched and stored.
+        """
+        try:
+            entry = self.lookup(url, via=VIA_STEALTH)
+        except CacheMiss as e:
+            future = Future()
+            future.set_exception(e)
+            return future
+        if entry is not None:
+            future = Future()
+            future.set_result(entry["body"].decode("utf-8"))
+            return future
+
+        def store(done: Future) -> None:
+            if not done.cancelled() and done.exception() is None:
+                self.store(url, 200, {}, done.result().encode("utf-8"),
+                           via=VIA_STEALTH)
+
+        future = fetch(url)
+        future.add_done_callback(store)
+        return future
+
+    def parse_feed(self, url: str, etag: Optional[str] = None,
+                   modified: Optional[str] = None):
+        """
+        Drop-in for feedparser.parse (as FeedPoller.parse). A feed served
+        from disk is always parsed in full, so replayed runs see the
+        recorded entries whatever the validators of the last live poll.
+        """
+        try:
+            entry = self.lookup(url, via=VIA_FEED)
+        except CacheMiss as e:
+            return feedparser.FeedParserDict(bozo=1, bozo_exception=e, entries=[])
+        if entry is None:
+            try:
+                entry = self._download_feed(url, etag, modified)
+            except Exception as e:
+                return feedparser.FeedParserDict(bozo=1, bozo_exception=e, entries=[])
+            if entry["status"] == 304:
+                return feedparser.FeedParserDict(status=304, entries=[])
+            self.store(url, entry["status"], entry["headers"], entry["body"],
+                       via=VIA_FEED, response_url=entry["url"])
+        headers = {name: values[-1] for name, values in entry["headers"].items()}
+        feed = feedparser.parse(entry["body"], response_headers=headers)
+        feed["status"] = entry["status"]
+        feed["href"] = entry["url"]
+        lowered = {name.lower(): value for name, value in headers.items()}
+        if "etag" in lowered:
+            feed["etag"] = lowered["etag"]
+        if "last-modified" in lowered:
+            feed["modified"] = lowered["last-modified"]
+        return feed
+
+    @staticmethod
+    def _download_feed(url: str, etag: Optional[str], modified: Optional[str],
+                       timeout: float = 30) -> Dict[str, Any]:
+        headers = {"User-Agent": feedparser.USER_AGENT}
+        if etag:
+            headers["If-None-Match"] = etag
+        if modified:
+            headers["If-Modified-Since"] = modified
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return {
+                    "url": response.url,
+                    "status": response.status,
+                    "headers": {
+                        name: [value] for name, value in response.headers.items()
+                    },
+                    "body": response.read(),
+                }
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return {"url": url, "status": 304, "headers": {}, "body": b""}
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self.counts)
+        lookups = counts["hits"] + counts["misses"] + counts["stale"]
+        return {
+            "mode": self.mode,
+            **counts,
+            "hit_rate": counts["hits"] / lookups if lookups else 0.0,
+        }
+
+
+class ResponseCacheMiddleware:
+    """
+    Scrapy downloader middleware serving and recording responses with the
+    ResponseCache selected by the HEX_HTTP_CACHE_* settings. Pages
+    rendered by scrapy-playwright are cached apart from plain HTTP ones.
+
+    In replay mode a missing response becomes a 504 that is not retried,
+    so a replayed crawl never reaches the network.
+    """
+
+    def __init__(self, cache: ResponseCache):
+        self.cache = cache
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        cache = get_response_cache({
+            "http_cache_mode": crawler.settings.get("HEX_HTTP_CACHE_MODE", "off"),
+            "http_cache_dir": crawler.settings.get("HEX_HTTP_CACHE_DIR"),
+            "http_cache_max_age": crawler.settings.getfloat(
+                "HEX_HTTP_CACHE_MAX_AGE", 0
+            ) or None,
+        })
+        if cache is None:
+            raise NotConfigured
+        return cls(cache)
+
+    @staticmethod
+    def _via(request) -> str:
+        return VIA_BROWSER if request.meta.get("playwright") else VIA_HTTP
+
+    def process_request(self, request, spider=None):
+        try:
+            entry = self.cache.lookup(
+                request.url, request.method, request.body, self._via(request)
+            )
+        except CacheMiss as e:
+            logger.warning(str(e))
+            request.meta["dont_retry"] = True
+            return Response(request.url, status=504, request=request,
+                            flags=["cache-miss"])
+        if entry is None:
+            return None
+        headers = entry["headers"]
+        response_class = responsetypes.from_args(
+            headers=headers, url=entry["url"], body=entry["body"]
+        )
+        return response_class(
+            url=entry["url"], status=entry["status"], headers=headers,
+            body=entry["body"], request=request, flags=["cached"]
+        )
+
+    def process_response(self, request, response, spider=None):
+        if "cached" in response.flags or "cache-miss" in response.flags:
+            return response
+        headers = {
+            name.decode("latin-1"): [value.decode("latin-1") for value in values]
+            for name, values in response.headers.items()
+        }
+        self.cache.store(
+            request.url, response.status, headers, response.body,
+            request.method, request.body, self._via(request), response.url
+        )
+        return response
+
+
+def http_cache_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    """ Scrapy settings enabling ResponseCacheMiddleware as in config.yaml. """
+    return {
+        "HEX_HTTP_CACHE_MODE": config.get("http_cache_mode", "off"),
+        "HEX_HTTP_CACHE_DIR": config.get("http_cache_dir"),
+        "HEX_HTTP_CACHE_MAX_AGE": config.get("http_cache_max_age"),
+    }
+
+
+_SHARED_CACHES: SharedRegistry[ResponseCache] = SharedRegistry()
+
+
+def get_response_cache(config: Dict[str, Any]) -> Optional[ResponseCache]:
+    """
+    Return the process-wide response cache selected by `http_cache_mode`,
+    `http_cache_dir` and `http_cache_max_age` in config, or None when the
+    mode is off. The spiders, the stealth browsers and the feed poller
+    share it, and its stats.
+    """
+    mode = config.get("http_cache_mode") or "off"
+    if mode == "off":
+        return None
+    if not config.get("http_cache_dir"):
+        raise ValueError("The HTTP cache needs an http_cache_dir.")
+    key = os.path.abspath(os.path.expanduser(config["http_cache_dir"]))
+    return _SHARED_CACHES.get(
+        key, lambda: ResponseCache(key, mode, config.get("http_cache_max_age")),
+        reuse=lambda cache: cache.mode == mode
+    )
+
+
+def clear_response_caches() -> None:
+    """ Drop the caches and their stats, e.g. after changing their mode. """
+    _SHARED_CACHES.clear()
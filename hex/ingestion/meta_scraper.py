@@ -3,6 +3,7 @@ from typing import List, Optional
 from datetime import datetime
 
 from .html_article import HTMLArticleScraper
+from .throttle import crawl_settings
 
 
 logger = logging.getLogger(__name__)
@@ -15,40 +16,10 @@ class MetaScraper(HTMLArticleScraper):
     """
 
     name = "meta_scraper"
+    listing_ready_selector = "a[href*='/blog/']"
+    article_ready_selector = "h1 span"
     
-    # Custom settings for Meta AI blog
-    custom_settings = {
-        "CONCURRENT_REQUESTS": 1,
-        "DOWNLOAD_DELAY": 5,  # Increased delay for Meta
-        "RANDOMIZE_DOWNLOAD_DELAY": True,
-        "DOWNLOAD_TIMEOUT": 60,  # Increased timeout
-        "RETRY_TIMES": 3,
-        "RETRY_HTTP_CODES": [400, 403, 429, 500, 502, 503, 504, 522, 524, 408],
-        "DEFAULT_REQUEST_HEADERS": {
-            "User-Agent": (
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36"
-            ),
-            "Accept": (
-                "text/html,application/xhtml+xml,"
-                "application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8"
-            ),
-            "Accept-Language": "en-US,en;q=0.9",
-            "Accept-Encoding": "gzip, deflate, br",
-            "DNT": "1",
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1",
-            "Sec-Fetch-Dest": "document",
-            "Sec-Fetch-Mode": "navigate",
-            "Sec-Fetch-Site": "none",
-            "Sec-Fetch-User": "?1",
-            "Cache-Control": "max-age=0",
-            "Referer": "https://www.google.com/",
-            "Origin": "https://ai.meta.com",
-        },
-        "PLAYWRIGHT_DEFAULT_NAVIGATION_TIMEOUT": 120000,  # Increased timeout
-    }
+    custom_settings = crawl_settings("meta_scraper")
     
     def __init__(
         self,
@@ -112,13 +83,6 @@ class MetaScraper(HTMLArticleScraper):
         """
         return None
 
-    def get_text_content(self, response) -> Optional[str]:
-        """
-        Extract the main text content from the article page.
-        Uses the parent method get_text_content
-        """
-        return super().get_text_content(response)
-
     def get_published_date(self, response) -> Optional[str]:
         """
         Extract the published date from the article page.
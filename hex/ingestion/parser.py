@@ -1,5 +1,5 @@
 import re
-from urllib.parse import urlparse
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 from main_content_extractor import MainContentExtractor
 
 
@@ -22,41 +22,113 @@ def _extract_domain_urllib(url):
 extract_domain = _extract_domain_urllib
 
 
-def clean_markdown(text):
+# Query parameters that only track the visit and never change the page.
+TRACKING_PARAMS = re.compile(
+    r'^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|ref_src|source|ncid|cmpid)$'
+)
+
 
-    # Remove urls
-    text = re.sub(r'(https?:\/\/|www\.)([\w\.\/-]+)', r'', text)
+def canonicalize_url(url):
+    """
+    Normalize a URL so that links to the same article compare equal.
 
-    # Remove images but preserve alt text if present
-    text = re.sub(r'!\[([^\]]*?)\]\(.*?\)', r'\1', text, flags=re.DOTALL)
+    Lowercases the scheme and host, drops "www.", default ports, the
+    fragment, tracking query parameters and the trailing slash, and sorts
+    the remaining query parameters.
 
-    # Remove remaining links but keep the link text
-    text = re.sub(r'\[([^\]]*?)\]\(.*?\)', r'\1', text, flags=re.DOTALL)
+    Parameters:
+    url (str): The URL string.
 
-    # Fix dashes separated by line breaks (e.g., "-\nword" → "-word")
-    text = re.sub(r'(-)\n(\w)', r'\1\2', text)
+    Returns:
+    str: The canonical URL ("" for an empty URL).
+    """
+    if not url:
+        return ""
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    host = re.sub(r'^www\.', '', (parsed.hostname or "").lower())
+    if parsed.port and (scheme, parsed.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parsed.port}"
+    path = re.sub(r'/+$', '', parsed.path) or "/"
+    query = urlencode(sorted(
+        (key, value)
+        for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not TRACKING_PARAMS.match(key.lower())
+    ))
+    return urlunparse((scheme, host, path, "", query, ""))
+
+
+# clean_markdown patterns, compiled once. Most start with a literal so the
+# regex engine jumps between candidates instead of trying every position.
+MD_URL = re.compile(r'(?:https?://|www\.)[\w./-]+')
+MD_IMAGE = re.compile(r'!\[([^\]]*?)\]\(.*?\)', re.DOTALL)
+MD_LINK = re.compile(r'\[([^\]]*?)\]\(.*?\)', re.DOTALL)
+MD_HYPHEN_BREAK = re.compile(r'-\n(?=\w)')
+MD_LINE_BREAK = re.compile(r'\n(?<=\S\n)(?=\S)')
+MD_NUMBERED_ITEM = re.compile(r' +(\d+\.) +')
+MD_HTML_TAG = re.compile(r'<[^>]+>')
+MD_EMPTY_LINES = re.compile(r'\n[ *#\n]+')
+MD_SPACES = re.compile(r'  +')
 
-    # Merge broken lines that are not paragraph breaks
-    text = re.sub(r'(\S)\n(?=\S)', r'\1 ', text)
 
-    # Fix markdown bullet lists
-    text = re.sub(r'\s*\*\s*', r'\n* ', text)
+def clean_markdown(text):
+    """
+    Clean the markdown extracted from a page: drop URLs, images, links,
+    HTML tags and empty lines, keep the visible text, merge wrapped lines
+    and put list items on their own lines.
+
+    Each step gives the same result as the regex substitution in its
+    comment, applied in this order, with cheaper patterns or string
+    methods.
+
+    Parameters:
+    text (str): The markdown text.
+
+    Returns:
+    str: The cleaned text.
+    """
+    # Remove urls: (https?:\/\/|www\.)([\w\.\/-]+) -> ''
+    text = MD_URL.sub('', text)
+
+    if '](' in text:
+        # Remove images but preserve alt text if present
+        if '![' in text:
+            text = MD_IMAGE.sub(r'\1', text)
+        # Remove remaining links but keep the link text
+        text = MD_LINK.sub(r'\1', text)
+
+    # Fix dashes separated by line breaks: (-)\n(\w) -> \1\2
+    text = MD_HYPHEN_BREAK.sub('-', text)
+
+    # Merge broken lines that are not paragraph breaks: (\S)\n(?=\S) -> '\1 '
+    text = MD_LINE_BREAK.sub(' ', text)
+
+    # Fix markdown bullet lists: \s*\*\s* -> '\n* '. The whitespace on both
+    # sides of every "*" is dropped, which is what str.strip() does.
+    if '*' in text:
+        parts = text.split('*')
+        last = len(parts) - 1
+        text = '\n* '.join(
+            part.rstrip() if i == 0 else part.lstrip() if i == last else part.strip()
+            for i, part in enumerate(parts)
+        )
 
     # Fix markdown numbered lists
-    text = re.sub(r' +(\d+\.) +', r'\n\1 ', text)
+    text = MD_NUMBERED_ITEM.sub(r'\n\1 ', text)
 
     # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
+    if '<' in text:
+        text = MD_HTML_TAG.sub('', text)
 
     # Remove Non-breaking space
-    text = re.sub(r'&nbsp;', '', text)
+    text = text.replace('&nbsp;', '')
 
-    # Remove lines full of [ \*#\n]
-    text = re.sub(r'\n[ \*#\n]*', r'\n', text, flags=re.DOTALL)
+    # Remove lines full of [ \*#\n]: \n[ \*#\n]* -> \n. This also leaves no
+    # consecutive newlines to collapse.
+    text = MD_EMPTY_LINES.sub('\n', text)
 
-    # Normalize whitespace and line breaks
-    text = re.sub(r'\n{2,}', '\n', text)         # Collapse multiple newlines
-    text = re.sub(r'[ \t]+', ' ', text)          # Collapse multiple spaces/tabs
+    # Collapse multiple spaces/tabs: [ \t]+ -> ' '
+    text = MD_SPACES.sub(' ', text.replace('\t', ' '))
 
     return text.strip()
 
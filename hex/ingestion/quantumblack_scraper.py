@@ -15,6 +15,8 @@ class QuantumBlackScraper(HTMLArticleScraper):
     """
 
     name = "quantumblack_scraper"
+    listing_ready_selector = "div.js-collectionStream a"
+    article_ready_selector = "section h1"
     
     def __init__(
         self,
@@ -0,0 +1,164 @@
+""" Lean Playwright rendering: blocked resources, readiness waits and render stats. """
+import logging
+import time
+from functools import lru_cache
+from typing import List, Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import Error as PlaywrightError
+from scrapy import signals
+from scrapy_playwright.page import PageMethod
+
+from .throttle import CRAWL_SETTINGS_PATH, load_crawl_settings
+
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def rendering_settings(path: str = str(CRAWL_SETTINGS_PATH)) -> dict:
+    """
+    The `rendering` section of crawl_settings.yaml, built once: it is read
+    for every sub-request of every rendered page. Blocked hosts and
+    resource types are sets.
+    """
+    settings = dict(load_crawl_settings(path)["rendering"])
+    settings["blocked_hosts"] = frozenset(settings["blocked_hosts"])
+    settings["blocked_resource_types"] = frozenset(
+        settings["blocked_resource_types"]
+    )
+    return settings
+
+
+def is_blocked_host(url: str, blocked_hosts) -> bool:
+    """ True if the URL's host or one of its parent domains is blocked. """
+    parts = (urlparse(url).hostname or "").split(".")
+    return any(".".join(parts[i:]) in blocked_hosts for i in range(len(parts)))
+
+
+def should_abort_request(request) -> bool:
+    """
+    PLAYWRIGHT_ABORT_REQUEST (and stealth browser route) rule: abort
+    the resources no extraction needs (images, fonts, stylesheets,
+    media...) and every request to an ad or analytics host.
+    """
+    settings = rendering_settings()
+    return (
+        request.resource_type in settings["blocked_resource_types"]
+        or is_blocked_host(request.url, settings["blocked_hosts"])
+    )
+
+
+def transferred_bytes(sizes: dict) -> int:
+    """ Bytes received for a finished Playwright request, from request.sizes(). """
+    return sizes["responseBodySize"] + sizes["responseHeadersSize"]
+
+
+async def track_render(page, request) -> None:
+    """
+    playwright_page_init_callback: start the render clock and collect the
+    requests the page completes, measured once it is ready.
+    """
+    stats = request.meta.get("render_stats")
+    if stats is None:
+        return
+    stats["started_at"] = time.monotonic()
+    finished = stats.setdefault("finished_requests", [])
+    page.on("requestfinished", finished.append)
+
+
+async def wait_until_ready(page, stats: dict,
+                           ready_selector: Optional[str] = None) -> None:
+    """
+    PageMethod run after navigation (at domcontentloaded): wait for the
+    page's ready selector, else for the network to be idle. A page that
+    is not ready in time is used as it is. Fills `stats` with the render
+    time and the bytes transferred.
+    """
+    settings = rendering_settings()
+    try:
+        if ready_selector:
+            await page.wait_for_selector(
+                ready_selector, state="attached", timeout=settings["ready_timeout"]
+            )
+        else:
+            await page.wait_for_load_state(
+                "networkidle", timeout=settings["network_idle_timeout"]
+            )
+    except PlaywrightError as e:
+        logger.info(f"Page not ready, using it as it is: {page.url} ({e})")
+    finished: List = stats.pop("finished_requests", [])
+    total = 0
+    for request in finished:
+        try:
+            total += transferred_bytes(await request.sizes())
+        except PlaywrightError:
+            pass
+    stats["bytes"] = total
+    stats["requests"] = len(finished)
+    stats["render_time"] = time.monotonic() - stats.pop("started_at", time.monotonic())
+
+
+def browser_meta(ready_selector: Optional[str] = None) -> dict:
+    """
+    Request meta rendering the page in Playwright: navigation stops at
+    domcontentloaded, then the page waits for `ready_selector` (or for
+    network idle) instead of sleeping. The render time and bytes end up
+    in response.meta["render_stats"].
+    """
+    stats = {}
+    return {
+        "playwright": True,
+        "playwright_page_goto_kwargs": {
+            "wait_until": rendering_settings()["wait_until"],
+        },
+        "playwright_page_init_callback": track_render,
+        "playwright_page_methods": [
+            PageMethod(
+                "evaluate",
+                "() => Object.defineProperty( \
+                    navigator, 'webdriver', {get: () => undefined})"
+            ),
+            PageMethod(wait_until_ready, stats, ready_selector),
+        ],
+        "render_stats": stats,
+    }
+
+
+class RenderStats:
+    """
+    Scrapy extension adding the render time and bytes of every page
+    rendered by Playwright to the crawler stats (render/*).
+    """
+
+    def __init__(self, crawler):
+        self.stats = crawler.stats
+        crawler.signals.connect(self._response_received,
+                                signal=signals.response_received)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def _response_received(self, response, request, spider=None):
+        render = request.meta.get("render_stats")
+        if not render or "render_time" not in render or "cached" in response.flags:
+            return
+        self.stats.inc_value("render/pages")
+        self.stats.inc_value("render/bytes", render["bytes"])
+        self.stats.inc_value("render/requests", render["requests"])
+        self.stats.inc_value("render/time", render["render_time"])
+
+
+def render_summary(stats) -> dict:
+    """ Pages, bytes and mean render time from crawler stats. """
+    pages = stats.get_value("render/pages", 0)
+    return {
+        "pages": pages,
+        "bytes": stats.get_value("render/bytes", 0),
+        "requests": stats.get_value("render/requests", 0),
+        "aborted_requests": stats.get_value("playwright/request_count/aborted", 0),
+        "render_time": stats.get_value("render/time", 0.0),
+        "mean_render_time":
+            stats.get_value("render/time", 0.0) / pages if pages else 0.0,
+    }
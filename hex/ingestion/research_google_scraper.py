@@ -15,6 +15,8 @@ class ResearchGoogleScraper(HTMLArticleScraper):
     """
 
     name = "research_google_scraper"
+    listing_ready_selector = "div.list-wrapper a"
+    article_ready_selector = "h1.headline-1"
     
     def __init__(
         self,
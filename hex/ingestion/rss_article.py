@@ -1,17 +1,18 @@
 import time
-import feedparser
 import re
 import logging
 import scrapy
 from pathlib import Path
 from scrapy.exceptions import CloseSpider
-from scrapy_playwright.page import PageMethod
+from scrapy.spidermiddlewares.httperror import HttpError
 from typing import Tuple, Optional
 from .base_article import BaseArticleScraper
-from .parser import extract_domain, extract_markdown_from_html, clean_markdown
-
-from playwright.sync_api import sync_playwright
-from playwright_stealth import stealth_sync
+from .browser_pool import StealthBrowserPool
+from .extraction_pool import ExtractionPool, extract_fields
+from .feed_poller import FeedPoller, get_feed_poller
+from .http_cache import ResponseCache
+from .parser import extract_domain
+from .throttle import crawl_settings
 
 
 logger = logging.getLogger(__name__)
@@ -51,10 +52,16 @@ def extract_error_status_and_url(message: str) -> Tuple[Optional[str], Optional[
 
 def extract_article(self, entry: dict) -> dict:
     assert "html_content" in entry
-    entry["text_content"] = extract_markdown_from_html(entry["html_content"])
+    return apply_extracted_fields(
+        entry, extract_fields(entry["html_content"], entry["summary"])
+    )
+
+def apply_extracted_fields(entry: dict, fields: dict) -> dict:
+    """ Store the output of `extract_fields` and the length statistics. """
+    entry["text_content"] = fields["text_content"]
     entry["html_content_length"] = len(entry["html_content"])
     entry["text_content_length"] = len(entry["text_content"])
-    entry["summary"] = clean_markdown(entry["summary"])
+    entry["summary"] = fields["summary"]
     entry["summary_length"] = len(entry["summary"])
     entry["summary_text_ratio"] = \
         entry["summary_length"]/entry["text_content_length"]
@@ -63,76 +70,172 @@ def extract_article(self, entry: dict) -> dict:
         logger.warning(f"Weird Summary/Text ratio {ratio}")
     return entry
 
+def submit_extraction(pool: Optional[ExtractionPool], entry: dict):
+    """
+    Start extracting `entry` in the pool; without a pool, the returned
+    callable extracts it in the calling thread. Either way, calling the
+    result returns the extracted entry.
+    """
+    if pool is None:
+        return lambda: extract_article(None, entry)
+    future = pool.submit(entry["html_content"], entry["summary"])
+    return lambda: apply_extracted_fields(entry, future.result())
+
+
+def iter_new_entries(scraper, pending=lambda: 0):
+    """
+    Yield (feed_url, entry, normalized entry) for the new entries of the
+    scraper's feeds, polled concurrently, skipping known articles and
+    stopping at entries older than the date threshold or once the
+    articles limit is reached (counting `pending()` in-flight articles).
+    Yielded entries are marked seen by the scraper once stored.
+    """
+    for feed_url, entries in scraper.feed_poller.poll(scraper.start_urls):
+        yield from _new_feed_entries(scraper, feed_url, entries, pending)
+        if scraper.limit_is_reached(pending()):
+            break
+
+
+async def iter_new_entries_async(scraper, pending=lambda: 0):
+    """
+    Same as iter_new_entries, but the feeds are downloaded off the event
+    loop and the entries of each feed are yielded as soon as it arrives.
+    """
+    feeds = scraper.feed_poller.poll_async(scraper.start_urls)
+    try:
+        async for feed_url, entries in feeds:
+            for new_entry in _new_feed_entries(scraper, feed_url, entries, pending):
+                yield new_entry
+            if scraper.limit_is_reached(pending()):
+                break
+    finally:
+        await feeds.aclose()
+
+
+def _new_feed_entries(scraper, feed_url: str, entries, pending):
+    """
+    The new entries of one polled feed. The feed is completed once all
+    of them were yielded, so a feed cut short is downloaded again.
+    """
+    poller = scraper.feed_poller
+    complete = True
+    for entry in entries:
+        if scraper.limit_is_reached(pending()):
+            complete = False
+            break
+        normalized = scraper.parse_article(entry)
+        if scraper.too_old_entry(normalized):
+            break
+
+        article_url = normalized.get("url")
+        if article_url and scraper.skip_known_article(
+            article_url, normalized.get("title"), normalized.get("url_domain")
+        ):
+            poller.mark_seen(feed_url, entry)
+            continue
+        if article_url:
+            yield feed_url, entry, normalized
+        else:
+            poller.mark_seen(feed_url, entry)
+    if complete:
+        poller.complete(feed_url)
+
+
+def mark_stored(poller: FeedPoller, feed_url: str, entry: dict,
+                error: Optional[dict]) -> None:
+    """
+    Mark a stored entry seen, or have its feed downloaded again on the
+    next run when its article could not be fetched.
+    """
+    if error is None:
+        poller.mark_seen(feed_url, entry)
+    else:
+        poller.retry(feed_url)
+
 
 class StealthRSSArticleScraper(BaseArticleScraper):
     """
     Scraper that parses RSS feeds, then uses undetected Playwright for scraping.
-    The normalized RSS entry is passed via meta for enrichment.
+    Articles are fetched concurrently by a pool of warm stealth browsers,
+    one request at a time per domain, and extracted in the extraction
+    pool when one is given.
     """
 
     name = "rss_article_scraper"
+    browser_pool_size = 4
+    domain_delay = 3.0
+
+    def __init__(self, *args, browser_pool: StealthBrowserPool = None,
+                 feed_poller: FeedPoller = None,
+                 extraction_pool: ExtractionPool = None,
+                 response_cache: ResponseCache = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.feed_poller = feed_poller or get_feed_poller(self.storage)
+        self.extraction_pool = extraction_pool
+        self.response_cache = response_cache
+        self.browser_pool = browser_pool
+        self.browser_pool_stats = {}
 
     def start_requests(self):
-        for feed_url in self.start_urls:
-            feed = feedparser.parse(feed_url)
-
-            for idx, entry in enumerate(feed.entries):
-                start_time = time.time()
-                normalized = self.parse_article(entry)
-
-                if self.should_skip_entry(normalized):
-                    break
-
-                article_url = normalized.get("url")
-                if article_url:
-                    html,error = self.fetch_with_undetected_playwright(article_url)
-                    if html:
-                        normalized["html_content"] = html
-                        try:
-                            normalized = extract_article(self, normalized)
-                        except Exception as e:
-                            logger.warning(f"Error extracting article {article_url}: {e}")
-                            error = {
-                                "status": "Error extracting article",
-                                "message": str(e),
-                                "url": article_url,
-                            }
-                    elapsed_time = time.time() - start_time
-                    normalized["metadata"] = {
-                        "error": error,
-                        "duration": int(elapsed_time)
-                    }
-                    self.store([normalized])
-                    self.stored_count += 1
-
-            if self.limit_is_reached():
-                break
+        owns_pool = self.browser_pool is None
+        if owns_pool:
+            self.browser_pool = StealthBrowserPool(
+                self.browser_pool_size, self.domain_delay
+            )
+        try:
+            # Queue every new article of every feed, then store them in order
+            fetches = []
+            for feed_url, entry, normalized in iter_new_entries(
+                self, pending=lambda: len(fetches)
+            ):
+                fetches.append((
+                    (feed_url, entry), normalized, time.time(),
+                    self.submit_fetch(normalized["url"])
+                ))
+
+            # Extract pages in the pool as they arrive, then store in order
+            extractions = []
+            for source, normalized, start_time, fetch in fetches:
+                html, error = self.fetch_result(normalized["url"], fetch)
+                extraction = None
+                if html:
+                    normalized["html_content"] = html
+                    extraction = submit_extraction(self.extraction_pool, normalized)
+                extractions.append((source, normalized, start_time, error, extraction))
+
+            for source, normalized, start_time, error, extraction in extractions:
+                article_url = normalized["url"]
+                if extraction is not None:
+                    try:
+                        normalized = extraction()
+                    except Exception as e:
+                        logger.warning(f"Error extracting article {article_url}: {e}")
+                        error = {
+                            "status": "Error extracting article",
+                            "message": str(e),
+                            "url": article_url,
+                        }
+                elapsed_time = time.time() - start_time
+                normalized["metadata"] = {
+                    "error": error,
+                    "duration": int(elapsed_time)
+                }
+                self.store([normalized])
+                self.stored_count += 1
+                mark_stored(self.feed_poller, *source, error)
+        finally:
+            if owns_pool:
+                self.browser_pool.close()
+            self.browser_pool_stats = self.browser_pool.stats()
+            logger.info(f"Stealth browser pool: {self.browser_pool_stats}")
+            if owns_pool:
+                self.browser_pool = None
         return iter([])
 
-    def fetch_with_undetected_playwright(self, url: str) -> str:
+    def fetch_result(self, url: str, fetch) -> Tuple[Optional[str], Optional[dict]]:
+        """ Wait for a pooled fetch and return (html, error). """
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                context = browser.new_context(
-                    user_agent=(
-                        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) "
-                        "Chrome/120.0.0.0 Safari/537.36"
-                    ),
-                    locale="en-US",
-                    timezone_id="Europe/Paris",
-                    viewport={"width": 1280, "height": 800},
-                    device_scale_factor=1,
-                    has_touch=False,
-                    is_mobile=False
-                )
-                page = context.new_page()
-                stealth_sync(page)
-                page.goto(url, timeout=60000)
-                page.wait_for_timeout(3000)  # wait for JS to render
-                html = page.content()
-                browser.close()
-                return html,None
+            return fetch.result(), None
         except Exception as e:
             logger.warning(f"Undetected Playwright failed for {url}: {e}")
             status, url = extract_error_status_and_url(str(e))
@@ -141,6 +244,19 @@ class StealthRSSArticleScraper(BaseArticleScraper):
                 "url": url
             }
 
+    def submit_fetch(self, url: str, pool: StealthBrowserPool = None):
+        """ Queue a pooled fetch, served from the response cache if any. """
+        pool = pool or self.browser_pool
+        if self.response_cache is None:
+            return pool.submit(url)
+        return self.response_cache.submit(url, pool.submit)
+
+    def fetch_with_undetected_playwright(self, url: str) -> str:
+        if self.browser_pool is None:
+            with StealthBrowserPool(1, self.domain_delay) as pool:
+                return self.fetch_result(url, self.submit_fetch(url, pool))
+        return self.fetch_result(url, self.submit_fetch(url))
+
     def parse(self, response):
         pass  # unused now, handled in start_requests
 
@@ -155,93 +271,98 @@ class RSSArticleScraper(BaseArticleScraper):
     """
 
     name = "rss_article_scraper"
-    custom_settings = {
-        "CONCURRENT_REQUESTS": 1, 
-        "DOWNLOAD_DELAY": 3,
-        "RANDOMIZE_DOWNLOAD_DELAY": True,
-        "DOWNLOAD_TIMEOUT": 30,
-        "RETRY_TIMES": 5,
-        "RETRY_HTTP_CODES": [500, 502, 503, 504, 522, 524, 408],
-        "DEFAULT_REQUEST_HEADERS": {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36"
-            ),
-            "Accept": ("text/html,application/xhtml+xml," +
-                       "application/xml;q=0.9,image/webp,*/*;q=0.8"),
-            "Accept-Language": "en-US,en;q=0.9",
-            "Referer": "https://www.google.com",
-            "Connection": "close"
-        },
-        "PLAYWRIGHT_DEFAULT_NAVIGATION_TIMEOUT": 100000,
-    }
+
+    custom_settings = crawl_settings("rss_article_scraper")
+
+    def __init__(self, *args, feed_poller: FeedPoller = None,
+                 extraction_pool: ExtractionPool = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.feed_poller = feed_poller or get_feed_poller(self.storage)
+        self.extraction_pool = extraction_pool
+
+    async def start(self):
+        """
+        Poll the feeds off the reactor and request the articles of each
+        feed as soon as it is downloaded.
+        """
+        async for feed_url, entry, normalized in iter_new_entries_async(self):
+            yield self.article_request(feed_url, entry, normalized)
 
     def start_requests(self):
-        for feed_url in self.start_urls:
-            feed = feedparser.parse(feed_url)
-
-            for idx, entry in enumerate(feed.entries):
-                self.start_time = time.time()
-                normalized = self.parse_article(entry)
-
-                if self.should_skip_entry(normalized):
-                    break
-
-                article_url = normalized.get("url")
-                self.normalized = normalized
-                if article_url:
-                    yield scrapy.Request(
-                        url=article_url,
-                        callback=self.parse,
-                        errback=self.handle_error,
-                        meta={
-                            "rss_data": normalized,
-                            "handle_httpstatus_all": True,
-                            "playwright": True,
-                            "playwright_include_page": True,
-                            "playwright_page_methods": [
-                                PageMethod(
-                                    "evaluate", "() => Object.defineProperty( \
-                                        navigator, 'webdriver', {get: () => undefined})"
-                                ),
-                                PageMethod("wait_for_timeout", 2000),
-                            ]
-                        }
-                    )
-            if self.limit_is_reached():
-                break
+        """ Entry point of Scrapy < 2.13: the feeds are polled before yielding. """
+        for feed_url, entry, normalized in iter_new_entries(self):
+            yield self.article_request(feed_url, entry, normalized)
+
+    def article_request(self, feed_url: str, entry: dict, normalized: dict):
+        article_url = normalized["url"]
+        # Each request carries its own entry and start time
+        return scrapy.Request(
+            url=article_url,
+            callback=self.parse,
+            errback=self.handle_error,
+            meta=self.fetch_strategy.request_meta(article_url, {
+                "rss_data": normalized,
+                "feed_entry": (feed_url, entry),
+                "start_time": time.time(),
+                "handle_httpstatus_all": True,
+            })
+        )
 
     def handle_error(self, failure):
-        error = {
-            "status": failure.response.status,
-            "url": failure.response.url
-        }
+        """ Store the entry of a failed request with its error. """
+        if failure.check(HttpError):
+            response = failure.value.response
+            error = {
+                "status": response.status,
+                "url": response.url
+            }
+        else:
+            # DNS, connection, timeout, ...: there is no response
+            error = {
+                "status": type(failure.value).__name__,
+                "message": str(failure.value),
+                "url": failure.request.url
+            }
+        self.store_error(failure.request.meta, error)
+
+    def store_error(self, meta: dict, error: dict):
         logger.warning(error)
-        elapsed_time = time.time() - self.start_time
-        self.normalized["metadata"] = {
+        elapsed_time = time.time() - meta["start_time"]
+        normalized = dict(meta["rss_data"])
+        normalized["metadata"] = {
             "error": error,
             "duration": int(elapsed_time)
         }
-        self.store([self.normalized])
+        self.store([normalized])
         self.stored_count += 1
+        mark_stored(self.feed_poller, *meta["feed_entry"], error)
 
-    def parse(self, response):
+    async def parse(self, response):
         """
         Called for each full article page.
         You can enrich the original RSS data with full HTML content here.
+        Pages downloaded over HTTP with too little text (or blocked with a
+        403) are requested again through the browser.
+        With an extraction pool, the page is extracted in a worker process
+        while the reactor keeps downloading.
         """
+        if self.blocked_over_http(response):
+            yield self.browser_retry(response)
+            return
 
         if response.status != 200:
-            failure = scrapy.spidermiddlewares.httperror.HttpError(response)
-            return self.handle_error(failure)
+            self.store_error(response.meta, {
+                "status": response.status,
+                "url": response.url
+            })
+            return
 
-        rss_data = response.meta.get("rss_data", {})
+        rss_data = dict(response.meta.get("rss_data", {}))
         rss_data["html_content"] = response.text if not response.text=='' else None
         error = None
         if rss_data["html_content"] is not None:
             try:
-                rss_data = extract_article(self, rss_data)
+                rss_data = await self.extract(rss_data)
             except Exception as e:
                 logger.warning(f"Error extracting article {response.url}: {e}")
                 error = {
@@ -254,13 +375,28 @@ class RSSArticleScraper(BaseArticleScraper):
                 "status": "No HTML content",
                 "url": response.url,
             }
-        elapsed_time = time.time() - self.start_time
+        if not self.fetch_strategy.accepts(
+            response.url, rss_data.get("text_content"),
+            from_browser=bool(response.meta.get("playwright"))
+        ):
+            yield self.browser_retry(response)
+            return
+        elapsed_time = time.time() - response.meta["start_time"]
         rss_data["metadata"] = {
             "error": error,
             "duration": int(elapsed_time)
         }
         self.store([rss_data])
         self.stored_count += 1
+        mark_stored(self.feed_poller, *response.meta["feed_entry"], error)
+
+    async def extract(self, entry: dict) -> dict:
+        if self.extraction_pool is None:
+            return extract_article(self, entry)
+        fields = await self.extraction_pool.extract_async(
+            entry["html_content"], entry["summary"]
+        )
+        return apply_extracted_fields(entry, fields)
 
     def parse_article(self, response):
         return parse_article(response)
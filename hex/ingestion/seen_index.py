@@ -0,0 +1,202 @@
+""" Shared, persistent index of the articles already ingested. """
+import logging
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from hex.ingestion.parser import canonicalize_url
+from hex.utils.files import atomic_open
+from hex.utils.hash import sha256_key
+from hex.utils.registry import SharedRegistry
+
+
+logger = logging.getLogger(__name__)
+
+# File layout: magic, doc_id watermark, fingerprint of the watermark article,
+# then the sorted little-endian uint64 hashes
+HEADER = struct.Struct("<8sQQ")
+MAGIC = b"HEXSEEN2"
+
+
+def url_key(url: str) -> str:
+    return "url:" + canonicalize_url(url)
+
+
+def title_key(title: str, url_domain: str) -> str:
+    return "title:" + title.strip() + "\x1f" + url_domain.strip()
+
+
+def key_hash(key: str) -> int:
+    """64-bit hash of a key (first 8 bytes of its SHA-256)."""
+    return int(sha256_key(key)[:16], 16)
+
+
+def article_keys(article: dict):
+    """Keys identifying a stored article: canonical URL and (title, domain)."""
+    keys = []
+    if article.get("url"):
+        keys.append(url_key(article["url"]))
+    title = (article.get("title") or "").strip()
+    url_domain = (article.get("url_domain") or "").strip()
+    if title and url_domain:
+        keys.append(title_key(title, url_domain))
+    return keys
+
+
+class SeenIndex:
+    """
+    Set of 64-bit hashes of the canonical URLs and (title, url_domain) of
+    the stored articles, shared by every spider of a crawl.
+
+    The hashes are persisted as a sorted array that is memory-mapped and
+    binary-searched, so opening the index does not read the history. Only
+    articles stored after the persisted doc_id watermark are read from the
+    database on open. All methods are thread-safe.
+    """
+
+    def __init__(self, path: str, storage, articles_table: str = "articles"):
+        self.path = Path(path)
+        self.storage = storage
+        self.articles_table = articles_table
+        self._lock = threading.Lock()
+        self._persisted = np.empty(0, dtype="<u8")
+        self._added = set()
+        self._claimed = set()
+        self.last_doc_id = 0
+        self._fingerprint = 0
+        self._load()
+        self._catch_up()
+
+    def _load(self) -> None:
+        if not self.path.exists() or self.path.stat().st_size < HEADER.size:
+            return
+        with open(self.path, "rb") as f:
+            magic, last_doc_id, fingerprint = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            logger.warning(f"Ignoring invalid seen index file {self.path}")
+            return
+        if (self.path.stat().st_size - HEADER.size) // 8:
+            self._persisted = np.memmap(
+                self.path, dtype="<u8", mode="r", offset=HEADER.size
+            )
+        self.last_doc_id = last_doc_id
+        self._fingerprint = fingerprint
+
+    def _article_fingerprint(self, doc_id: int) -> int:
+        """Hash identifying the article stored under doc_id (0 if none)."""
+        articles = self.storage.range_by_id(self.articles_table, doc_id - 1, doc_id)
+        if not articles:
+            return 0
+        return key_hash("\n".join(article_keys(articles[0])))
+
+    def _catch_up(self) -> None:
+        """Index the articles stored since the index was last persisted."""
+        table_last_id = self.storage.last_doc_id(self.articles_table)
+        if (table_last_id < self.last_doc_id
+                or self._article_fingerprint(self.last_doc_id) != self._fingerprint):
+            # The table was emptied or replaced: start over
+            logger.info(f"Rebuilding seen index {self.path}")
+            self._persisted = np.empty(0, dtype="<u8")
+            self._added = set()
+            self.last_doc_id = 0
+        articles = self.storage.range_by_id(self.articles_table, self.last_doc_id)
+        for article in articles:
+            self._add_keys(article_keys(article))
+        self.last_doc_id = table_last_id
+        logger.info(f"Seen index caught up on {len(articles)} new articles")
+
+    def _contains_hash(self, value: int) -> bool:
+        if value in self._added:
+            return True
+        position = np.searchsorted(self._persisted, np.uint64(value))
+        return bool(
+            position < len(self._persisted) and self._persisted[position] == value
+        )
+
+    def _add_keys(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            value = key_hash(key)
+            if not self._contains_hash(value):
+                self._added.add(value)
+
+    def __len__(self) -> int:
+        return len(self._persisted) + len(self._added)
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            return self._contains_hash(key_hash(key))
+
+    def is_known(self, url: Optional[str] = None, title: Optional[str] = None,
+                 url_domain: Optional[str] = None) -> bool:
+        """True if an article with this URL or title and domain is stored."""
+        keys = article_keys({"url": url, "title": title, "url_domain": url_domain})
+        with self._lock:
+            return any(self._contains_hash(key_hash(key)) for key in keys)
+
+    def claim(self, url: str) -> bool:
+        """
+        Mark a URL as requested for this run. Returns False if another
+        spider already claimed it. Claims are not persisted, so a failed
+        request is retried on the next run.
+        """
+        value = key_hash(url_key(url))
+        with self._lock:
+            if value in self._claimed:
+                return False
+            self._claimed.add(value)
+            return True
+
+    def add(self, article: dict) -> bool:
+        """
+        Record a stored article. Returns False if it was already known by
+        its title and domain.
+        """
+        keys = article_keys(article)
+        with self._lock:
+            known = any(
+                self._contains_hash(key_hash(key))
+                for key in keys if key.startswith("title:")
+            )
+            self._add_keys(keys)
+            return not known
+
+    def persist(self) -> None:
+        """Merge the new hashes into the sorted file (atomic replace)."""
+        with self._lock:
+            last_doc_id = max(
+                self.last_doc_id, self.storage.last_doc_id(self.articles_table)
+            )
+            fingerprint = self._article_fingerprint(last_doc_id)
+            added = np.fromiter(self._added, dtype="<u8", count=len(self._added))
+            merged = np.union1d(np.asarray(self._persisted), added).astype("<u8")
+
+            with atomic_open(self.path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, last_doc_id, fingerprint))
+                f.write(merged.tobytes())
+            self._persisted = merged
+            self._added = set()
+            self.last_doc_id = last_doc_id
+        logger.info(f"✅ Persisted {len(merged)} seen hashes to {self.path}")
+
+
+_SHARED_INDEXES: SharedRegistry[SeenIndex] = SharedRegistry()
+
+
+def get_seen_index(storage, articles_table: str = "articles") -> SeenIndex:
+    """
+    Return the process-wide seen index of a table, stored next to the
+    database, opening it on first use.
+    """
+    path = Path(storage.db_path).parent / f"{articles_table}_seen.idx"
+    return _SHARED_INDEXES.get(
+        os.path.abspath(path), lambda: SeenIndex(str(path), storage, articles_table)
+    )
+
+
+def clear_seen_indexes() -> None:
+    """ Drop the indexes, e.g. after the databases were replaced. """
+    _SHARED_INDEXES.clear()
@@ -3,7 +3,6 @@ from typing import List, Optional
 from datetime import datetime
 
 from .html_article import HTMLArticleScraper
-from .parser import extract_markdown_from_html
 
 
 logger = logging.getLogger(__name__)
@@ -16,6 +15,8 @@ class SloanReviewScraper(HTMLArticleScraper):
     """
 
     name = "sloan_review_scraper"
+    listing_ready_selector = "div#Data-AI-and-Machine-Learning-Tiled a"
+    article_ready_selector = "div.article-content"
     
     def __init__(
         self,
@@ -83,18 +84,12 @@ class SloanReviewScraper(HTMLArticleScraper):
             return author.strip()
         return None
 
-    def get_text_content(self, response) -> Optional[str]:
-        """
-        Extract the main text content from the article page.
-        Gets all text content within the section
-        """
-        # Get all text content from the section
-        article_html = response.css("div.article-content").get()
-        if article_html:
-            content_elements = extract_markdown_from_html(article_html)
-        else:
-            content_elements = None
-        return content_elements
+    def get_content_html(self, response) -> Optional[str]:
+        """
+        Extract the HTML of the article body.
+        Gets the div.article-content section
+        """
+        return response.css("div.article-content").get()
 
     def get_published_date(self, response) -> Optional[str]:
         """
@@ -15,6 +15,8 @@ class SyncedReviewScraper(HTMLArticleScraper):
     """
 
     name = "synced_review_scraper"
+    listing_ready_selector = "div#primary a"
+    article_ready_selector = "h1.entry-title"
     
     def __init__(
         self,
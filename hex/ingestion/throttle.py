@@ -0,0 +1,226 @@
+""" Per-domain adaptive politeness for the Scrapy scrapers. """
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+import yaml
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+
+logger = logging.getLogger(__name__)
+
+CRAWL_SETTINGS_PATH = Path(__file__).parent / "crawl_settings.yaml"
+
+# Domain limits, overridable per source and per domain
+DOMAIN_KEYS = ("domain_concurrency", "domain_delay", "min_delay", "max_delay")
+
+# Responses asking the client to slow down
+BACKOFF_STATUSES = (429, 503)
+
+
+@lru_cache(maxsize=None)
+def load_crawl_settings(path: str = str(CRAWL_SETTINGS_PATH)) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def source_settings(source: str, path: str = str(CRAWL_SETTINGS_PATH)) -> dict:
+    """ Defaults merged with the overrides of one source (scraper name). """
+    config = load_crawl_settings(path)
+    settings = dict(config["defaults"])
+    overrides = config.get("sources", {}).get(source, {})
+    settings.update(overrides)
+    settings["headers"] = {
+        **config["defaults"].get("headers", {}), **overrides.get("headers", {})
+    }
+    return settings
+
+
+def domain_limits(domain: str, defaults: dict,
+                  path: str = str(CRAWL_SETTINGS_PATH)) -> dict:
+    """
+    Limits of a domain: `defaults` overridden by the `domains` entry of
+    the domain or of its closest parent domain.
+    """
+    domains = load_crawl_settings(path).get("domains", {})
+    limits = {key: defaults[key] for key in DOMAIN_KEYS}
+    parts = domain.lower().split(".")
+    for i in range(len(parts)):
+        overrides = domains.get(".".join(parts[i:]))
+        if overrides:
+            limits.update(overrides)
+            break
+    return limits
+
+
+def crawl_settings(source: str, path: str = str(CRAWL_SETTINGS_PATH)) -> dict:
+    """
+    Scrapy `custom_settings` of a scraper: high global concurrency, with
+    concurrency and delay limited per domain by DomainThrottle.
+    """
+    settings = source_settings(source, path)
+    return {
+        "CONCURRENT_REQUESTS": settings["global_concurrency"],
+        "CONCURRENT_REQUESTS_PER_DOMAIN": settings["domain_concurrency"],
+        "DOWNLOAD_DELAY": settings["domain_delay"],
+        "RANDOMIZE_DOWNLOAD_DELAY": True,
+        "DOWNLOAD_TIMEOUT": settings["download_timeout"],
+        "RETRY_TIMES": settings["retry_times"],
+        "RETRY_HTTP_CODES": settings["retry_http_codes"],
+        "TELNETCONSOLE_ENABLED": False,
+        "DEFAULT_REQUEST_HEADERS": settings["headers"],
+        # Requests with meta["playwright"] are rendered, see rendering.py
+        "DOWNLOAD_HANDLERS": {
+            "http": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
+            "https": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
+        },
+        "PLAYWRIGHT_DEFAULT_NAVIGATION_TIMEOUT": settings["navigation_timeout"],
+        "PLAYWRIGHT_ABORT_REQUEST": "hex.ingestion.rendering.should_abort_request",
+        "AUTOTHROTTLE_ENABLED": False,
+        "HEX_CRAWL_SOURCE": source,
+        "HEX_CRAWL_SETTINGS_PATH": path,
+        "EXTENSIONS": {
+            "hex.ingestion.throttle.DomainThrottle": 500,
+            "hex.ingestion.rendering.RenderStats": 510,
+        },
+        # Disabled unless HEX_HTTP_CACHE_MODE is set, see http_cache.py
+        "DOWNLOADER_MIDDLEWARES": {
+            "hex.ingestion.http_cache.ResponseCacheMiddleware": 900
+        },
+    }
+
+
+class DomainThrottle:
+    """
+    Scrapy extension adapting each domain's downloader slot.
+
+    A slot starts with its configured concurrency and delay. Successful
+    responses move the delay towards latency / concurrency, as Scrapy's
+    AutoThrottle does, within [min_delay, max_delay]. A 429 or 503 doubles
+    the delay (at least the Retry-After value) and halves the
+    concurrency; `recover_after` successes in a row then give one
+    concurrency back, up to the configured maximum.
+    """
+
+    recover_after = 10
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        source = crawler.settings.get("HEX_CRAWL_SOURCE")
+        if not source:
+            raise NotConfigured
+        self.path = crawler.settings.get("HEX_CRAWL_SETTINGS_PATH")
+        self.defaults = source_settings(source, self.path)
+        self.domains: Dict[str, dict] = {}
+        crawler.signals.connect(
+            self._request_reached_downloader,
+            signal=signals.request_reached_downloader
+        )
+        crawler.signals.connect(
+            self._response_downloaded, signal=signals.response_downloaded
+        )
+        crawler.signals.connect(self._spider_closed, signal=signals.spider_closed)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def _slot(self, request):
+        key = request.meta.get("download_slot")
+        if key is None:
+            return None, None
+        return key, self.crawler.engine.downloader.slots.get(key)
+
+    def _request_reached_downloader(self, request, spider=None):
+        key, slot = self._slot(request)
+        if slot is None:
+            return
+        state = self.domains.get(key)
+        if state is None:
+            limits = domain_limits(key, self.defaults, self.path)
+            slot.concurrency = limits["domain_concurrency"]
+            slot.delay = limits["domain_delay"]
+            self.domains[key] = {
+                **limits, "slot": slot, "successes": 0, "backoffs": 0,
+                "responses": 0, "latency": 0.0,
+            }
+        elif state["slot"] is not slot:
+            # Idle slots are garbage-collected: keep the learned limits
+            slot.concurrency = state["slot"].concurrency
+            slot.delay = state["slot"].delay
+            state["slot"] = slot
+
+    def _response_downloaded(self, response, request, spider=None):
+        key, _ = self._slot(request)
+        state = self.domains.get(key)
+        if state is None:
+            return
+        slot = state["slot"]
+        latency = request.meta.get("download_latency") or 0.0
+        state["responses"] += 1
+        state["latency"] += latency
+        if response.status in BACKOFF_STATUSES:
+            self.back_off(key, slot, state, response)
+        elif response.status < 400:
+            self.speed_up(slot, state, latency)
+
+    def back_off(self, key, slot, state, response) -> None:
+        retry_after = _retry_after(response)
+        slot.delay = min(
+            max(slot.delay * 2, retry_after or 0, state["min_delay"]),
+            state["max_delay"]
+        )
+        slot.concurrency = max(1, slot.concurrency // 2)
+        state["successes"] = 0
+        state["backoffs"] += 1
+        logger.info(
+            f"Backing off {key} after a {response.status}: "
+            f"delay {slot.delay:.1f}s, concurrency {slot.concurrency}"
+        )
+
+    def speed_up(self, slot, state, latency: float) -> None:
+        state["successes"] += 1
+        if (state["successes"] >= self.recover_after
+                and slot.concurrency < state["domain_concurrency"]):
+            slot.concurrency += 1
+            state["successes"] = 0
+        target_delay = latency / slot.concurrency
+        new_delay = max(target_delay, (slot.delay + target_delay) / 2)
+        slot.delay = min(max(new_delay, state["min_delay"]), state["max_delay"])
+
+    def stats(self) -> dict:
+        """ Final limits, backoffs and mean latency of every domain. """
+        stats = {}
+        for key, state in self.domains.items():
+            stats[key] = {
+                "responses": state["responses"],
+                "backoffs": state["backoffs"],
+                "mean_latency":
+                    state["latency"] / state["responses"] if state["responses"] else 0.0,
+                "delay": state["slot"].delay,
+                "concurrency": state["slot"].concurrency,
+            }
+        return stats
+
+    def _spider_closed(self, spider, reason=None):
+        stats = self.stats()
+        crawler_stats = self.crawler.stats
+        crawler_stats.set_value("throttle/domains", len(stats))
+        crawler_stats.set_value(
+            "throttle/backoffs", sum(s["backoffs"] for s in stats.values())
+        )
+        for key, domain_stats in stats.items():
+            if domain_stats["backoffs"]:
+                logger.info(f"Throttled {key}: {domain_stats}")
+
+
+def _retry_after(response) -> Optional[float]:
+    value = response.headers.get(b"Retry-After")
+    if not value:
+        return None
+    try:
+        return float(value.decode("latin-1").strip())
+    except ValueError:
+        return None
@@ -75,6 +75,8 @@ class ModelSpec(BaseSpec):
         Field(..., description="Name of the model provider (e.g., 'openai').")
     config: ModelConfig = \
         Field(..., description="Model configuration (temperature, etc.)")
+    concurrency: int = \
+        Field(1, ge=1, description="Predictions run at once by hex.flows.predict.")
     _loaded_model: Optional[Any] = None
 
     def load_model(self):
@@ -82,7 +84,7 @@ class ModelSpec(BaseSpec):
         """
 
         if self.provider == "openai":
-            self._loaded_model = OpenAIModel(self.config)
+            self._loaded_model = OpenAIModel(self.config, self.name, self.version)
 
         elif self.provider == "openai_embedding":
             self._loaded_model = OpenAIEmbedding(self.config)
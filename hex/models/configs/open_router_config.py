@@ -21,3 +21,19 @@ class OpenRouterConfig(BaseModel):
     temperature: Optional[float] = Field(0.0, description="Sampling temperature")
     max_tokens: Optional[int] = Field(5000, description="Maximum tokens to generate")
     n: Optional[int] = Field(1, description="Number of completions to generate")
+    cache_completions: bool = Field(
+        True, description="Cache completions on disk (disable for non-deterministic specs)"
+    )
+    completion_cache_dir: Optional[str] = Field(
+        "models/completions",
+        description="Directory of the completion cache, relative to data_dir"
+    )
+    completion_cache_max_bytes: int = Field(
+        512 * 1024 ** 2, description="Size of the completion cache before LRU eviction"
+    )
+    requests_per_minute: Optional[int] = Field(
+        300, description="Requests per minute allowed on base_url (None: no limit)"
+    )
+    tokens_per_minute: Optional[int] = Field(
+        None, description="Tokens per minute allowed on base_url (None: no limit)"
+    )
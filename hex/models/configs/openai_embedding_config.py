@@ -14,6 +14,9 @@ class OpenAIEmbeddingConfig(BaseModel):
         "OPENAI_API_KEY", description="Environment variable for API key"
     )
     api_key: Optional[str] = Field(None, description="API key")
+    batch_size: int = Field(
+        512, description="Inputs sent per embeddings request (at most 2048)"
+    )
     # Only supported in text-embedding-3 and later models.
     dimensions: Optional[int] = Field(
         None, description="Number of dimensions for the embedding"
@@ -1,11 +1,15 @@
+import fcntl
 import json
+import os
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import Dict, Optional, Tuple, List
 from sklearn.metrics.pairwise import cosine_similarity
 from pydantic import BaseModel
 from openai import OpenAI
 import numpy as np
 
+from hex.utils.files import atomic_open
 from hex.utils.hash import sha256_key
 
 
@@ -19,7 +23,7 @@ def compute_tag_list_similarity(tags1: List[str],
     Args:
         tags1 (List[str]): First list of tags (ground-truth).
         tags2 (List[str]): Second list of tags (predicted).
-        embedding_model: An embedding model instance with `.predict()` method.
+        embedding_model: An embedding model instance with `.predict_many()` method.
 
     Returns:
         float: Average of maximum cosine similarities.
@@ -27,20 +31,11 @@ def compute_tag_list_similarity(tags1: List[str],
     if not tags1 or not tags2:
         return 0.0
 
-    # Get embeddings for each tag individually
-    embeddings1 = []
-    embeddings2 = []
-
-    for tag in tags1:
-        result = embedding_model.predict(tag)
-        embeddings1.append(result["output"])
-
-    for tag in tags2:
-        result = embedding_model.predict(tag)
-        embeddings2.append(result["output"])
-
-    embeddings1 = np.vstack(embeddings1)  # Shape: (len(tags1), embedding_dim)
-    embeddings2 = np.vstack(embeddings2)  # Shape: (len(tags2), embedding_dim)
+    # Embed both lists in one bulk call
+    results = embedding_model.predict_many(list(tags1) + list(tags2))
+    embeddings1 = np.vstack([r["output"] for r in results[:len(tags1)]])
+    embeddings2 = np.vstack([r["output"] for r in results[len(tags1):]])
+    # Shapes: (len(tags1), embedding_dim), (len(tags2), embedding_dim)
 
     # Compute cosine similarity matrix
     # Shape: (len(tags2), len(tags1))
@@ -55,60 +50,256 @@ def compute_tag_list_similarity(tags1: List[str],
 
 class EmbeddingMatrixCache:
     """
-    A class to manage an embedding matrix cache.
-    This class is used to store embeddings and their corresponding keys.
+    Append-only embedding cache, indexed by the SHA-256 of the input text.
+
+    Vectors are float32 rows appended to a binary file read through
+    np.memmap. `index.jsonl` is a write-ahead log: a header naming the
+    vector file, then one {"key", "meta"} line per row, appended once the
+    row is written. A dict maps keys to rows, so lookups are O(1) and
+    adding k embeddings appends k rows and k lines.
+
+    Appends, loads and compactions hold an exclusive lock on `.lock`, so
+    several processes can share a cache: before appending, an instance
+    reads the lines other instances appended since it last looked, and
+    numbers its new rows from the size of the vector file.
+
+    Loading drops a torn tail (a row without its line or a partial line)
+    and compacts the cache when more than `compact_ratio` of its rows are
+    dead (a key added twice, e.g. by concurrent runs). Compaction writes a
+    new vector file, then switches to it by replacing the index, so a
+    crash leaves either cache intact. Legacy embeddings.npy, keys.json and
+    metadata.jsonl caches are migrated on load.
     """
-    def __init__(self, dir_path: str, embedding_dim: int = 1536):
+    dtype = np.float32
+
+    def __init__(self, dir_path: str, embedding_dim: int = 1536,
+                 compact_ratio: float = 0.25):
         self.dir = Path(dir_path)
+        self.index_path = self.dir / "index.jsonl"
+        # Legacy cache files
         self.emb_path = self.dir / "embeddings.npy"
         self.keys_path = self.dir / "keys.json"
         self.meta_path = self.dir / "metadata.jsonl"
+        self.lock_path = self.dir / ".lock"
         self.embedding_dim = embedding_dim
+        self.compact_ratio = compact_ratio
+
+        self._reset()
+        if self.index_path.exists() or self.emb_path.exists():
+            with self._locked():
+                self._load()
 
-        self._load()
+    @contextmanager
+    def _locked(self):
+        """ Hold the cache's exclusive lock, across processes. """
+        self.dir.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    @property
+    def row_bytes(self) -> int:
+        return self.embedding_dim * np.dtype(self.dtype).itemsize
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.dir / self._vectors_name
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        """ The (rows, embedding_dim) float32 matrix, memory-mapped. """
+        if self._vectors is None or len(self._vectors) != len(self.keys):
+            if self.keys:
+                self._vectors = np.memmap(
+                    self.vectors_path, dtype=self.dtype, mode="r",
+                    shape=(len(self.keys), self.embedding_dim)
+                )
+            else:
+                self._vectors = np.empty((0, self.embedding_dim), dtype=self.dtype)
+        return self._vectors
+
+    def _reset(self, vectors_name: str = "vectors-0.f32"):
+        self._vectors_name = vectors_name
+        self._vectors = None
+        self.keys: List[str] = []  # Key of each row
+        self.metadata: List[dict] = []  # Metadata of each row
+        self.index: Dict[str, int] = {}  # Key -> latest row
+        self._index_offset = 0  # End of the last index line read
+
+    def _read_lines(self, f) -> bool:
+        """
+        Read index lines from the position of `f` (binary). Returns False
+        if it stopped at a partial line.
+        """
+        for line in iter(f.readline, b""):
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("partial line")
+                record = json.loads(line)
+            except ValueError:
+                return False  # Interrupted append
+            self.index[record["key"]] = len(self.keys)
+            self.keys.append(record["key"])
+            self.metadata.append(record["meta"])
+            self._index_offset = f.tell()
+        return True
 
     def _load(self):
-        if self.emb_path.exists():
-            self.embeddings = np.load(self.emb_path)
-        else:
-            self.embeddings = np.empty((0, self.embedding_dim))
-
-        self.keys = json.load(
-            open(self.keys_path, encoding='utf-8')
-        ) if self.keys_path.exists() else []
-        self.metadata = [
-            json.loads(line) for line in open(
-                self.meta_path, encoding='utf-8'
+        """ Read the cache (under the lock). """
+        self._reset()
+        if not self.index_path.exists():
+            if self.emb_path.exists():
+                self._migrate_legacy()
+            return
+
+        with open(self.index_path, "rb") as f:
+            header = json.loads(f.readline())
+            self._index_offset = f.tell()
+            torn = not self._read_lines(f)
+        if header["dim"] != self.embedding_dim:
+            raise ValueError(
+                f"Embedding cache {self.dir} holds {header['dim']}-dimension "
+                f"vectors, not {self.embedding_dim}."
             )
-        ] if self.meta_path.exists() else []
+        self._vectors_name = header["vectors"]
+
+        row_bytes = self.row_bytes
+        size = self.vectors_path.stat().st_size if self.vectors_path.exists() else 0
+        if size // row_bytes < len(self.keys):
+            # Lines without their rows: forget them
+            del self.keys[size // row_bytes:]
+            del self.metadata[size // row_bytes:]
+            self.index = {key: row for row, key in enumerate(self.keys)}
+            torn = True
+        dead = len(self.keys) - len(self.index)
+        if torn or size != len(self.keys) * row_bytes \
+                or dead > self.compact_ratio * len(self.keys):
+            self.compact()
+
+    def _migrate_legacy(self):
+        embeddings = np.load(self.emb_path)
+        with open(self.keys_path, encoding="utf-8") as f:
+            keys = json.load(f)
+        with open(self.meta_path, encoding="utf-8") as f:
+            metadata = [json.loads(line) for line in f]
+        self._write(np.asarray(embeddings, dtype=self.dtype), keys, metadata,
+                    "vectors-1.f32")
+        for path in (self.emb_path, self.keys_path, self.meta_path):
+            path.unlink()
+
+    def _write(self, embeddings: np.ndarray, keys: List[str],
+               metadata: List[dict], vectors_name: str):
+        """ Write a complete cache under a new vector file, then switch to it. """
+        self.dir.mkdir(parents=True, exist_ok=True)
+        vectors_path = self.dir / vectors_name
+        with open(vectors_path, "wb") as f:
+            embeddings.astype(self.dtype, copy=False).tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        with atomic_open(self.index_path) as f:
+            f.write(json.dumps({"vectors": vectors_name,
+                                "dim": self.embedding_dim}) + "\n")
+            for key, meta in zip(keys, metadata):
+                f.write(json.dumps({"key": key, "meta": meta}) + "\n")
+        self._reset(vectors_name)
+        self.keys.extend(keys)
+        self.metadata.extend(metadata)
+        self.index = {key: row for row, key in enumerate(keys)}
+        self._index_offset = self.index_path.stat().st_size
+
+    def compact(self):
+        """
+        Rewrite the cache with only the latest row of each key (under the
+        lock).
+        """
+        rows = sorted(self.index.values())
+        embeddings = np.asarray(self.embeddings[rows], dtype=self.dtype) \
+            if rows else np.empty((0, self.embedding_dim), dtype=self.dtype)
+        old_vectors_path = self.vectors_path
+        generation = int(self._vectors_name.split("-")[1].split(".")[0]) + 1
+        self._write(embeddings, [self.keys[row] for row in rows],
+                    [self.metadata[row] for row in rows],
+                    f"vectors-{generation}.f32")
+        if old_vectors_path.exists():
+            old_vectors_path.unlink()
 
     def add(self, input_text: str, embedding: list, meta: dict):
-        key = sha256_key(input_text)
-
-        if key in self.keys:
-            return  # Skip duplicate
-
-        self.embeddings = np.vstack([self.embeddings, embedding])
-        self.keys.append(key)
-        self.metadata.append(meta)
-
-        self._persist()
+        self.add_many([(input_text, embedding, meta)])
+
+    def _catch_up(self):
+        """
+        Read the rows other instances appended since the last read, and
+        drop the torn tail of one that died mid-append (under the lock).
+        """
+        if not self.index_path.exists():
+            self._write(np.empty((0, self.embedding_dim), dtype=self.dtype),
+                        [], [], self._vectors_name)
+            return
+        with open(self.index_path, "rb") as f:
+            header = json.loads(f.readline())
+            if header["vectors"] != self._vectors_name:
+                # Compacted by another instance: read it again
+                self._load()
+                return
+            self._index_offset = max(self._index_offset, f.tell())
+            f.seek(self._index_offset)
+            complete = self._read_lines(f)
+        size = self.vectors_path.stat().st_size
+        if size < len(self.keys) * self.row_bytes:
+            self._load()  # Lines without their rows
+            return
+        if not complete:
+            os.truncate(self.index_path, self._index_offset)
+        if size > len(self.keys) * self.row_bytes:
+            os.truncate(self.vectors_path, len(self.keys) * self.row_bytes)
+
+    def add_many(self, items: List[Tuple[str, list, dict]]):
+        """ Append (input_text, embedding, meta) items in one write. """
+        with self._locked():
+            self._catch_up()
+            new_embeddings, new_keys, new_metadata = [], [], []
+            seen = set()
+            for input_text, embedding, meta in items:
+                key = sha256_key(input_text)
+                if key in self.index or key in seen:
+                    continue  # Skip duplicate
+                seen.add(key)
+                new_embeddings.append(embedding)
+                new_keys.append(key)
+                new_metadata.append(meta)
+
+            if not new_keys:
+                return
+            embeddings = np.asarray(new_embeddings, dtype=self.dtype)
+            if embeddings.shape != (len(new_keys), self.embedding_dim):
+                raise ValueError(
+                    f"Expected {self.embedding_dim}-dimension embeddings, "
+                    f"got shape {embeddings.shape}."
+                )
+            # Rows first: the index lines commit them
+            with open(self.vectors_path, "ab") as f:
+                first_row = f.tell() // self.row_bytes
+                embeddings.tofile(f)
+            with open(self.index_path, "ab") as f:
+                f.write("".join(
+                    json.dumps({"key": key, "meta": meta}) + "\n"
+                    for key, meta in zip(new_keys, new_metadata)
+                ).encode("utf-8"))
+                self._index_offset = f.tell()
+            for row, (key, meta) in enumerate(zip(new_keys, new_metadata),
+                                              start=first_row):
+                self.index[key] = row
+                self.keys.append(key)
+                self.metadata.append(meta)
 
     def get_embedding(self, input_text: str) -> Optional[Tuple[np.ndarray, dict]]:
-        key = sha256_key(input_text)
-        if key not in self.keys:
+        row = self.index.get(sha256_key(input_text))
+        if row is None:
             return None
-        idx = self.keys.index(key)
-        return self.embeddings[idx], self.metadata[idx]
-
-    def _persist(self):
-        self.dir.mkdir(parents=True, exist_ok=True)
-        np.save(self.emb_path, self.embeddings)
-        with open(self.keys_path, "w", encoding='utf-8') as f:
-            json.dump(self.keys, f)
-        with open(self.meta_path, "w", encoding='utf-8') as f:
-            for meta in self.metadata:
-                f.write(json.dumps(meta) + "\n")
+        return np.array(self.embeddings[row]), self.metadata[row]
 
 
 DEFAULT_EMBED_DIMS = {
@@ -126,6 +317,7 @@ class OpenAIEmbedding():
         dim = config.dimensions if isinstance(config.dimensions, int) else dim
         self.cache = EmbeddingMatrixCache(config.matrix_cache_dir, embedding_dim=dim)
         self.model_name = config.model_name
+        self.batch_size = config.batch_size
 
         embeddings_params = {}
         for k in ["dimensions"]:
@@ -133,18 +325,51 @@ class OpenAIEmbedding():
         self.embeddings_params = embeddings_params
 
     def predict(self, input_text: str) -> dict:
-        cached = self.cache.get_embedding(input_text)
-        if cached:
-            embedding, metadata = cached
-            return {
-                "output": embedding,
-                "metadata": metadata
-            }
-
-        # Make API call
+        return self.predict_many([input_text])[0]
+
+    def predict_many(self, input_texts: List[str]) -> List[dict]:
+        """
+        Embed several texts: cached ones are read locally, the others are
+        sent to the API `batch_size` at a time, and the new embeddings are
+        added to the cache in one persist. Results follow `input_texts`.
+        """
+        results = {}
+        missing = []
+        for input_text in dict.fromkeys(input_texts):
+            cached = self.cache.get_embedding(input_text)
+            if cached:
+                embedding, metadata = cached
+                results[input_text] = {"output": embedding, "metadata": metadata}
+            else:
+                missing.append(input_text)
+
+        new_items = []
         try:
-            response = self.client.embeddings.create(
-                input=input_text,
+            for start in range(0, len(missing), self.batch_size):
+                batch = missing[start:start + self.batch_size]
+                response = self._embed(batch)
+                metadata = {
+                    "model_name": response.model,
+                    "object": response.object,
+                    "usage": dict(response.usage) if hasattr(response, "usage") else {},
+                    "batch_size": len(batch),
+                }
+                for item in sorted(response.data, key=lambda item: item.index):
+                    input_text = batch[item.index]
+                    results[input_text] = {
+                        "output": item.embedding, "metadata": metadata
+                    }
+                    new_items.append((input_text, item.embedding, metadata))
+        finally:
+            # Keep the batches already paid for, even if a later one failed
+            self.cache.add_many(new_items)
+
+        return [results[input_text] for input_text in input_texts]
+
+    def _embed(self, batch: List[str]):
+        try:
+            return self.client.embeddings.create(
+                input=batch,
                 model=self.model_name,
                 **self.embeddings_params
             )
@@ -155,17 +380,4 @@ class OpenAIEmbedding():
                     "You need to set the OPENAI_API_KEY in the .env file!\n"
                     ">>> See README.md for more details <<<"
                 )
-
-        embedding = response.data[0].embedding
-        metadata = {
-            "model_name": response.model,
-            "object": response.object,
-            "usage": dict(response.usage) if hasattr(response, "usage") else {},
-        }
-
-        self.cache.add(input_text, embedding, metadata)
-
-        return {
-            "output": embedding,
-            "metadata": metadata
-        }
+            raise
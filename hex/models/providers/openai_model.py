@@ -1,7 +1,19 @@
+import hashlib
+import json
+import os
 import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
 from openai import OpenAI
 from pydantic import BaseModel
 
+from hex.utils.config import load_path_resolver
+from hex.utils.registry import SharedRegistry
+
 
 class PromptTemplate:
     """ A class to represent a prompt template with placeholders. """
@@ -24,23 +36,223 @@ class PromptTemplate:
                f"placeholders={self.placeholders})>"
 
 
+class CompletionCache:
+    """
+    SQLite store of completions, keyed by the hash of everything that
+    determines them (see OpenAIModel.cache_key), evicting the least
+    recently used ones once the stored responses exceed `max_bytes`.
+
+    Hits and misses are counted per namespace (the model spec name).
+    Thread-safe.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 ** 2):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            str(self.path / "completions.sqlite3"), check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            "key TEXT PRIMARY KEY, namespace TEXT NOT NULL, "
+            "response TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS completions_last_used "
+            "ON completions (last_used)"
+        )
+        self.conn.commit()
+        self.total_bytes = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM completions"
+        ).fetchone()[0]
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self.evicted = 0
+
+    def _count(self, namespace: str, name: str) -> None:
+        counts = self.counts.setdefault(
+            namespace, {"hits": 0, "misses": 0, "stored": 0}
+        )
+        counts[name] += 1
+
+    def get(self, key: str, namespace: str) -> Optional[dict]:
+        """ The cached response of a key, counted as a hit, or None. """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT response FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE completions SET last_used = ? WHERE key = ?",
+                (time.time(), key)
+            )
+            self.conn.commit()
+            self._count(namespace, "hits")
+        return json.loads(row[0])
+
+    def miss(self, namespace: str) -> None:
+        with self.lock:
+            self._count(namespace, "misses")
+
+    def store(self, key: str, namespace: str, response: dict) -> None:
+        data = json.dumps(response)
+        size = len(data.encode("utf-8"))
+        with self.lock:
+            previous = self.conn.execute(
+                "SELECT size FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, data, size, time.time())
+            )
+            self.total_bytes += size - (previous[0] if previous else 0)
+            self._count(namespace, "stored")
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self) -> None:
+        """ Drop the least recently used completions beyond max_bytes. """
+        if self.total_bytes <= self.max_bytes:
+            return
+        rows = self.conn.execute(
+            "SELECT key, size FROM completions ORDER BY last_used"
+        )
+        evicted = []
+        for key, size in rows:
+            if self.total_bytes <= self.max_bytes:
+                break
+            evicted.append((key,))
+            self.total_bytes -= size
+        self.conn.executemany("DELETE FROM completions WHERE key = ?", evicted)
+        self.evicted += len(evicted)
+
+    def stats(self, namespace: Optional[str] = None) -> dict:
+        """ Hits, misses and stored completions of a namespace (or all). """
+        with self.lock:
+            if namespace is None:
+                counts = {"hits": 0, "misses": 0, "stored": 0}
+                for namespace_counts in self.counts.values():
+                    for name, value in namespace_counts.items():
+                        counts[name] += value
+            else:
+                counts = dict(self.counts.get(
+                    namespace, {"hits": 0, "misses": 0, "stored": 0}
+                ))
+            lookups = counts["hits"] + counts["misses"]
+            return {
+                **counts,
+                "hit_rate": counts["hits"] / lookups if lookups else 0.0,
+                "evicted": self.evicted,
+                "bytes": self.total_bytes,
+            }
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+_SHARED_COMPLETION_CACHES: SharedRegistry[CompletionCache] = SharedRegistry()
+
+
+def get_completion_cache(path: str, max_bytes: int) -> CompletionCache:
+    """
+    Return the process-wide completion cache stored in `path`, shared by
+    the models (and their counters) of every spec loaded in the process.
+    """
+    key = os.path.abspath(os.path.expanduser(path))
+    cache = _SHARED_COMPLETION_CACHES.get(key, lambda: CompletionCache(key, max_bytes))
+    cache.max_bytes = max_bytes
+    return cache
+
+
+def completion_cache_stats(namespace: Optional[str] = None) -> dict:
+    """ Counters of the shared completion caches, for one spec name or all. """
+    caches = _SHARED_COMPLETION_CACHES.values()
+    stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0, "bytes": 0}
+    for cache in caches:
+        for name, value in cache.stats(namespace).items():
+            if name in stats:
+                stats[name] += value
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
+
+
+def clear_completion_caches() -> None:
+    """ Close and forget the shared completion caches. """
+    _SHARED_COMPLETION_CACHES.clear(close=CompletionCache.close)
+
+
 class OpenAIModel():
-    """ A class to represent an OpenAI model. """
-    def __init__(self, config: BaseModel):
+    """
+    A class to represent an OpenAI model.
+
+    Completions are cached on disk under config.completion_cache_dir
+    (relative to data_dir) unless config.cache_completions is False (for
+    non-deterministic specs), so re-running a flow does not pay twice for
+    the same prompt.
+    """
+    def __init__(self, config: BaseModel, spec_name: Optional[str] = None,
+                 spec_version: Optional[str] = None):
         self.prompt = PromptTemplate(config.prompt_spec)
         self.client = OpenAI(base_url=config.base_url,
                              api_key=config.api_key)
         self.config = config
+        self.spec_name = spec_name or config.prompt_spec.name
+        self.spec_version = spec_version or config.prompt_spec.version
 
         chat_completions_params = {}
         for k in ["temperature", "max_tokens", "n"]:
             chat_completions_params[k] = getattr(config, k, None)
         self.chat_completions_params = chat_completions_params
 
-    def predict(self, input_data: dict) -> dict:
+        self.cache = None
+        cache_dir = getattr(config, "completion_cache_dir", None)
+        if getattr(config, "cache_completions", False) and cache_dir:
+            self.cache = get_completion_cache(
+                str(load_path_resolver().resolve_path(cache_dir)),
+                config.completion_cache_max_bytes
+            )
+
+    def cache_key(self, prompt: str) -> str:
+        """ Hash of the spec, model, sampling params and rendered prompt. """
+        return hashlib.sha256(json.dumps([
+            self.spec_name, self.spec_version, self.config.model_name,
+            self.chat_completions_params, prompt
+        ], sort_keys=True).encode("utf-8")).hexdigest()
+
+    def cached_prediction(self, input_data: dict) -> Optional[dict]:
+        """ The cached prediction of an input, or None. """
+        if self.cache is None:
+            return None
+        prediction = self.cache.get(
+            self.cache_key(self.prompt(**input_data)), self.spec_name
+        )
+        if prediction is not None:
+            prediction["metadata"]["cached"] = True
+        return prediction
+
+    def predict(self, input_data: dict, check_cache: bool = True) -> dict:
+        """
+        Complete the prompt of an input, served from the cache if it is
+        there. `check_cache=False` skips the lookup when the caller has
+        already missed it with cached_prediction (hex.flows.predict).
+        """
+        if check_cache:
+            cached = self.cached_prediction(input_data)
+            if cached is not None:
+                return cached
+        if self.cache is not None:
+            self.cache.miss(self.spec_name)
+
+        prompt = self.prompt(**input_data)
         response = self.client.chat.completions.create(
             model=self.config.model_name,
-            messages=[{"role": "user", "content": self.prompt(**input_data)}],
+            messages=[{"role": "user", "content": prompt}],
             **self.chat_completions_params
         )
 
@@ -53,7 +265,7 @@ class OpenAIModel():
                 f"{response.error.get('message')}"
             )
 
-        return {
+        prediction = {
             "output": response.choices[0].message.content.strip(),
             "metadata": {
                 "prompt_tokens": response.usage.prompt_tokens,
@@ -61,6 +273,9 @@ class OpenAIModel():
                 "total_tokens": response.usage.total_tokens,
             },
         }
+        if self.cache is not None:
+            self.cache.store(self.cache_key(prompt), self.spec_name, prediction)
+        return prediction
 
 
 class OpenAIImageModel:
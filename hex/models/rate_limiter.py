@@ -0,0 +1,156 @@
+""" Token-bucket rate limiting of the model providers' APIs. """
+import threading
+import time
+from typing import Optional
+
+from hex.utils.registry import SharedRegistry
+
+
+class TokenBucket:
+    """
+    `capacity` units refilled evenly over `period` seconds.
+
+    `acquire` blocks until the units are available. A request larger than
+    the capacity waits for a full bucket and leaves it in debt, so it is
+    delayed rather than rejected. `adjust` charges or refunds units once
+    the actual cost of a request is known.
+    """
+
+    def __init__(self, capacity: float, period: float = 60.0,
+                 clock=time.monotonic, sleep=time.sleep):
+        if capacity <= 0:
+            raise ValueError("Token bucket capacity must be positive.")
+        self.capacity = capacity
+        self.rate = capacity / period
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._level = capacity
+        self._updated_at = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._level = min(
+            self.capacity, self._level + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """ Take `amount` units, waiting as needed; returns the time waited. """
+        needed = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._level >= needed:
+                    self._level -= amount
+                    return waited
+                wait = (needed - self._level) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+    def adjust(self, amount: float) -> None:
+        """ Take (or give back, when negative) `amount` units at once. """
+        with self._lock:
+            self._refill()
+            self._level = min(self.capacity, self._level - amount)
+
+
+class RateLimiter:
+    """
+    Requests per minute and tokens per minute of one provider endpoint,
+    shared by every model calling it. A limit of None is not enforced.
+    """
+
+    def __init__(self, requests_per_minute: Optional[int] = None,
+                 tokens_per_minute: Optional[int] = None):
+        self.limits = (requests_per_minute, tokens_per_minute)
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = threading.Lock()
+        self.counts = {"requests": 0, "tokens": 0, "wait_time": 0.0}
+
+    def tighten(self, requests_per_minute: Optional[int] = None,
+                tokens_per_minute: Optional[int] = None) -> None:
+        """
+        Lower the limits to the strictest of the current and the given
+        ones. A new bucket keeps what the old one had left.
+        """
+        with self._lock:
+            requests_limit = _strictest(self.limits[0], requests_per_minute)
+            tokens_limit = _strictest(self.limits[1], tokens_per_minute)
+            if requests_limit != self.limits[0]:
+                self.requests = _replace_bucket(self.requests, requests_limit)
+            if tokens_limit != self.limits[1]:
+                self.tokens = _replace_bucket(self.tokens, tokens_limit)
+            self.limits = (requests_limit, tokens_limit)
+
+    def acquire(self, estimated_tokens: int = 0) -> float:
+        """ Wait for one request and `estimated_tokens`; returns the time waited. """
+        waited = 0.0
+        if self.requests is not None:
+            waited += self.requests.acquire(1)
+        if self.tokens is not None:
+            waited += self.tokens.acquire(estimated_tokens)
+        with self._lock:
+            self.counts["requests"] += 1
+            self.counts["wait_time"] += waited
+        return waited
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """ Charge the difference between the estimated and actual tokens. """
+        if actual_tokens is None:
+            actual_tokens = estimated_tokens
+        if self.tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+        with self._lock:
+            self.counts["tokens"] += actual_tokens
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests_per_minute": self.limits[0],
+                "tokens_per_minute": self.limits[1],
+                **self.counts,
+            }
+
+
+def _strictest(limit: Optional[int], other: Optional[int]) -> Optional[int]:
+    """ The lowest of two limits, None meaning no limit. """
+    if limit is None:
+        return other
+    if other is None:
+        return limit
+    return min(limit, other)
+
+
+def _replace_bucket(bucket: Optional[TokenBucket], capacity: int) -> TokenBucket:
+    new_bucket = TokenBucket(capacity)
+    if bucket is not None:
+        with bucket._lock:
+            bucket._refill()
+            new_bucket._level = min(capacity, bucket._level)
+    return new_bucket
+
+
+_SHARED_LIMITERS: SharedRegistry[RateLimiter] = SharedRegistry()
+
+
+def get_rate_limiter(key: str, requests_per_minute: Optional[int] = None,
+                     tokens_per_minute: Optional[int] = None) -> RateLimiter:
+    """
+    Return the process-wide rate limiter of a provider endpoint (e.g. its
+    base URL), so that concurrent predictions of several model specs share
+    the provider's limits. Specs asking with different limits get the same
+    limiter, held to the strictest of them.
+    """
+    limiter = _SHARED_LIMITERS.get(
+        key, lambda: RateLimiter(requests_per_minute, tokens_per_minute)
+    )
+    limiter.tighten(requests_per_minute, tokens_per_minute)
+    return limiter
+
+
+def clear_rate_limiters() -> None:
+    """ Drop the limiters and the budget they had left. """
+    _SHARED_LIMITERS.clear()
@@ -70,6 +70,7 @@ ARTICLE_IS_AI_CLASSIFIER_SPEC = ModelSpec(
     version="v1",
     description="Classifies if article is about AI",
     provider="openai",
+    concurrency=8,
     config=OpenRouterConfig(
         prompt_spec=ARTICLE_IS_AI_PROMPT,
         model_name="google/gemini-2.5-flash",
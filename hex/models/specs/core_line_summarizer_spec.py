@@ -53,6 +53,7 @@ CORE_LINE_SUMMARIZER_SPEC = ModelSpec(
     version="v1",
     description="Extracts a dense summary from an article",
     provider="openai",
+    concurrency=8,
     config=OpenRouterConfig(
         prompt_spec=CORE_LINE_SUMMARIZER_PROMPT,
         model_name="google/gemini-2.5-flash",
@@ -62,6 +62,7 @@ DENSE_SUMMARIZER_SPEC = ModelSpec(
     version="v1",
     description="Extracts a dense summary from an article.",
     provider="openai",
+    concurrency=8,
     config=OpenRouterConfig(
         prompt_spec=DENSE_SUMMARIZER_PROMPT,
         model_name="google/gemini-2.5-flash",
@@ -92,6 +92,7 @@ NEWSLETTER_TWITTER_POST_SPEC = ModelSpec(
         model_name="openai/gpt-4.1",
         api_key_env_var="OPENROUTER_API_KEY",
         temperature=0.0,
+        cache_completions=False,
         max_tokens=10000,
         n=1
     )
@@ -79,6 +79,7 @@ TAGGER_SPEC = ModelSpec(
     version="v1",
     description="Extracts a dense summary from an article.",
     provider="openai",
+    concurrency=8,
     config=OpenRouterConfig(
         prompt_spec=TAGGER_PROMPT,
         model_name="google/gemini-2.5-flash",
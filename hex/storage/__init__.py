@@ -1,13 +1,17 @@
 """
 Submodule for all storage logic.
-Backed by pluggable storage implementations (e.g., TinyDB).
+Backed by pluggable storage implementations (e.g., TinyDB, SQLite).
 """
 
-from .base_storage import StorageService, TinyDBStorageService
-from .hex_storage import HexStorage
+from .base_storage import StorageService, TinyDBStorageService, SQLiteStorageService
+from .hex_storage import HexStorage, SQLiteHexStorage, load_storage, get_storage
 
 __all__ = [
     "StorageService",
     "TinyDBStorageService",
+    "SQLiteStorageService",
     "HexStorage",
+    "SQLiteHexStorage",
+    "load_storage",
+    "get_storage",
 ]
@@ -1,15 +1,104 @@
+import gzip
 import json
 import uuid
 from pathlib import Path
-from typing import Any
+from typing import Any, List
 from datetime import datetime
 
+from hex.utils.files import atomic_write
+from hex.utils.hash import sha256_key
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+ARTIFACT_MODES = ("files", "cas")
+COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
 
 class ArtifactManager:
-    def __init__(self, base_path: str, max_inline_bytes: int = 10000):
+    """
+    Offloads large record fields out of the database.
+
+    mode="files" writes one text file per field and document.
+    mode="cas" stores compressed blobs under the SHA-256 of their content,
+    so identical payloads are written once whatever the table or update.
+    """
+
+    def __init__(self, base_path: str, max_inline_bytes: int = 10000,
+                 mode: str = "files", compression: str = "gzip"):
+        if mode not in ARTIFACT_MODES:
+            raise ValueError(f"Artifact mode '{mode}' not in {ARTIFACT_MODES}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Compression '{compression}' not supported.")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires the 'zstandard' package.")
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
         self.max_inline_bytes = max_inline_bytes
+        self.mode = mode
+        self.compression = compression
+        self.blob_dir = self.base_path / "blobs"
+
+    def _blob_path(self, key: str, compression: str) -> Path:
+        return self.blob_dir / key[:2] / f"{key}{COMPRESSIONS[compression]}"
+
+    def _compress(self, payload: bytes, compression: str) -> bytes:
+        if compression == "zstd":
+            return zstandard.ZstdCompressor().compress(payload)
+        return gzip.compress(payload, mtime=0)
+
+    def _decompress(self, data: bytes, compression: str) -> bytes:
+        if compression == "zstd":
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def write_blob(self, payload: str) -> str:
+        """
+        Store a payload under its SHA-256 if not already stored.
+        Returns the content key.
+        """
+        key = sha256_key(payload)
+        path = self._blob_path(key, self.compression)
+        if path.exists():
+            return key
+
+        atomic_write(path, self._compress(payload.encode("utf-8"), self.compression))
+        return key
+
+    def read_blob(self, key: str, compression: str) -> str:
+        path = self._blob_path(key, compression)
+        return self._decompress(path.read_bytes(), compression).decode("utf-8")
+
+    def delete_blob(self, key: str) -> bool:
+        """Delete a blob whatever its compression. Returns True if deleted."""
+        deleted = False
+        for compression in COMPRESSIONS:
+            path = self._blob_path(key, compression)
+            if path.exists():
+                path.unlink()
+                deleted = True
+        return deleted
+
+    def stored_blob_keys(self) -> List[str]:
+        """Content keys of every blob on disk."""
+        if not self.blob_dir.exists():
+            return []
+        return [
+            path.name.split(".")[0] for path in self.blob_dir.glob("*/*")
+            if not path.name.startswith(".tmp-")
+        ]
+
+    @staticmethod
+    def blob_keys(record: dict) -> List[str]:
+        """Content keys of the blobs referenced by a record."""
+        return [
+            value["sha256"] for key, value in record.items()
+            if key.endswith("_artifact") and isinstance(value, dict)
+            and "sha256" in value
+        ]
 
     def _should_offload(self, value: Any) -> bool:
         if isinstance(value, (dict, list, str)):
@@ -31,7 +120,17 @@ class ArtifactManager:
         doc_id = str(record.get("doc_id") or uuid.uuid4().hex)
 
         for key, value in record.items():
-            if self._should_offload(value):
+            if self._should_offload(value) and self.mode == "cas":
+                is_text = isinstance(value, str)
+                payload = value if is_text else json.dumps(value, ensure_ascii=False)
+                updated.pop(key)
+                updated[f"{key}_artifact"] = {
+                    "sha256": self.write_blob(payload),
+                    "format": "text" if is_text else "json",
+                    "encoding": "utf-8",
+                    "compression": self.compression
+                }
+            elif self._should_offload(value):
                 path = self._generate_artifact_path(table_name, doc_id, key, timestamp)
                 with open(path, "w", encoding="utf-8") as f:
                     if isinstance(value, str):
@@ -49,10 +148,26 @@ class ArtifactManager:
         return updated
 
     def lazy_load_fields(self, record: dict) -> dict:
+        manager = self
+
         class LazyRecord(dict):
             def __getitem__(self, item):
-                # New format: field_artifact = { path, ... }
                 artifact_key = f"{item}_artifact"
+                # Content-addressed format: field_artifact = { sha256, ... }
+                if artifact_key in self and "sha256" in self.get(artifact_key):
+                    info = self.get(artifact_key)
+                    try:
+                        value = manager.read_blob(
+                            info["sha256"], info.get("compression", "gzip")
+                        )
+                    except FileNotFoundError:
+                        return super().__getitem__(item)
+                    if info.get("format") != "text":
+                        value = json.loads(value)
+                    self[item] = value
+                    return value
+
+                # New format: field_artifact = { path, ... }
                 if artifact_key in self:
                     info = self.get(artifact_key)
                     path = info.get("path")
@@ -1,5 +1,11 @@
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from tinydb import TinyDB, Query
+from tinydb.table import Document
+
+from .index import HashIndex, IndexedTable, SortedIndex, equality_terms
+from .json_storage import TransactionalJSONStorage
+from .sqlite_db import SQLiteDB
 
 
 class StorageService(ABC):
@@ -35,17 +41,117 @@ class StorageService(ABC):
 class TinyDBStorageService(StorageService):
     def __init__(self, db_path: str):
         self.db_path = db_path
-        self.db = TinyDB(db_path)
+        self.db = TinyDB(db_path, storage=TransactionalJSONStorage)
+        self.db.table_class = IndexedTable
+        self._indexes = {}
+
+    @contextmanager
+    def transaction(self):
+        """
+        Buffer every write made inside the block in memory and flush them
+        in one atomic file write on exit. Nothing is written on error.
+        """
+        storage = self.db.storage
+        storage.begin()
+        try:
+            yield self
+        except BaseException:
+            storage.rollback()
+            for table_name in self.db.tables():
+                self.db.table(table_name).clear_cache()
+            for indexes in self._indexes.values():
+                for index in indexes.values():
+                    index.invalidate()
+            raise
+        storage.commit()
+
+    def cache_stats(self):
+        """ Parse counts and parse time saved by the parsed-document cache. """
+        return self.db.storage.cache_stats()
+
+    def create_index(self, table_name: str, field: str):
+        """
+        Declare a hash index on `field`, used by indexed_search for
+        equality queries. It is built lazily on first use.
+        """
+        self._indexes.setdefault(table_name, {}).setdefault(field, HashIndex(field))
+
+    def create_range_index(self, table_name: str, field: str):
+        """
+        Declare a sorted index on a numeric `field`, used by range_search.
+        It is built lazily on first use.
+        """
+        indexes = self._indexes.setdefault(table_name, {})
+        if not isinstance(indexes.get(field), SortedIndex):
+            indexes[field] = SortedIndex(field)
+
+    def range_search(self, table_name, field, lower=None, upper=None):
+        """
+        Fetch the records whose numeric `field` is within [lower, upper],
+        ordered by doc_id. Bounds are optional.
+        """
+        self.create_range_index(table_name, field)
+        table = self.get_table(table_name)
+        index = self._indexes[table_name][field]
+        if not index.is_synced(table):
+            index.build(table)
+        return table.get_many(index.range(lower, upper))
+
+    def _sync_indexes(self, table_name, version_before, apply):
+        """
+        Apply an incremental change to the table's indexes after a write.
+        Indexes that missed a write are invalidated and rebuilt on next use.
+        """
+        table = self.get_table(table_name)
+        for index in self._indexes.get(table_name, {}).values():
+            write_count, parse_count = version_before
+            if (index.table is table and index.version == version_before
+                    and table.version == (write_count + 1, parse_count)):
+                apply(index)
+                index.version = table.version
+            else:
+                index.invalidate()
+
+    def indexed_search(self, table_name, query):
+        """
+        Search using a declared index for one of the query's equality terms.
+        Returns None when no index applies.
+        """
+        indexes = self._indexes.get(table_name)
+        if not indexes:
+            return None
+        for field, value in equality_terms(query):
+            if field not in indexes:
+                continue
+            table = self.get_table(table_name)
+            index = indexes[field]
+            if not index.is_synced(table):
+                index.build(table)
+            doc_ids = index.lookup(value)
+            if doc_ids is None:
+                continue
+            return [doc for doc in table.get_many(doc_ids) if query(doc)]
+        return None
 
     def get_table(self, table_name: str):
         return self.db.table(table_name)
 
     def insert(self, table_name, data):
         table = self.get_table(table_name)
+        before = table.version
         if isinstance(data, list):
-            return table.insert_multiple(data)
+            ids = table.insert_multiple(data)
+            records = list(zip(ids, data))
         else:
-            return table.insert(data)
+            ids = table.insert(data)
+            records = [(ids, data)]
+
+        def apply(index):
+            for doc_id, record in records:
+                index.set(doc_id, record)
+
+        self._sync_indexes(table_name, before, apply)
+        return ids
 
     def update_single(self, table_name, data):
         doc_id = int(data.get("doc_id"))
@@ -73,20 +179,60 @@ class TinyDBStorageService(StorageService):
                 if key != "doc_id":  # Skip doc_id
                     doc[key] = value
 
+        before = table.version
         table.update(update_doc, doc_ids=[doc_id])
+        self._sync_indexes(
+            table_name, before, lambda index: index.set(doc_id, data)
+        )
+
+    def update(self, table_name, data):
+        if not isinstance(data, list):
+            data = [data]
+        return [self.update_single(table_name, obj) for obj in data]
 
     def delete(self, table_name, query_field, query_value):
         table = self.get_table(table_name)
         q = Query()
-        table.remove(q[query_field] == query_value)
+        before = table.version
+        removed = table.remove(q[query_field] == query_value)
+        self._sync_indexes(table_name, before, lambda index: [
+            index.discard(doc_id) for doc_id in removed
+        ])
 
     def remove(self, table_name, doc_ids):
         table = self.get_table(table_name)
-        return table.remove(doc_ids=doc_ids)
+        before = table.version
+        removed = table.remove(doc_ids=doc_ids)
+        self._sync_indexes(table_name, before, lambda index: [
+            index.discard(doc_id) for doc_id in removed
+        ])
+        return removed
 
     def get_all(self, table_name):
         return self.get_table(table_name).all()
 
+    def last_doc_id(self, table_name) -> int:
+        """ Highest doc_id of a table, 0 when empty. """
+        return self.get_table(table_name).last_doc_id()
+
+    def range_by_id(self, table_name, after_id=0, upper_id=None):
+        """
+        Fetch the documents with after_id < doc_id <= upper_id, ordered by
+        doc_id, without reading the rest of the table.
+        """
+        return self.get_table(table_name).get_range(after_id, upper_id)
+
+    def get_by_ids(self, table_name, doc_ids):
+        """ Fetch documents by doc_id, ordered by doc_id. """
+        return self.get_table(table_name).get_many(doc_ids)
+
+    def iter_documents(self, table_name, fields=None, where=None):
+        """
+        Stream the documents of a table matching `where` (a TinyDB query),
+        projected on `fields` when given.
+        """
+        return self.get_table(table_name).iter_projected(fields, where)
+
     def get_by_field(self, table_name: str, field_name: str, field_value: str):
         table = self.get_table(table_name)
         q = Query()
@@ -96,3 +242,103 @@ class TinyDBStorageService(StorageService):
 
     def count_records(self, table_name):
         return len(self.get_table(table_name))
+
+
+class SQLiteStorageService(TinyDBStorageService):
+    """
+    SQLite-backed storage service (WAL mode, one row per document).
+    Keeps the TinyDB table API and doc_id semantics, but writes only the
+    touched rows and pushes equality queries down to indexed columns.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.db = SQLiteDB(db_path)
+
+    @contextmanager
+    def transaction(self):
+        """ Run every write made inside the block in one SQLite transaction. """
+        with self.db.transaction():
+            yield self
+
+    def cache_stats(self):
+        """ SQLite decodes only the rows it reads; nothing is cached. """
+        return {"parses": 0, "parse_time": 0.0, "cache_hits": 0,
+                "saved_parse_time": 0.0}
+
+    def create_index(self, table_name: str, field: str):
+        """ Create an SQLite expression index on `field`. """
+        self.get_table(table_name).create_index(field)
+
+    def create_range_index(self, table_name: str, field: str):
+        """ Create an SQLite expression index on a numeric `field`. """
+        self.get_table(table_name).create_index(field)
+
+    def range_search(self, table_name, field, lower=None, upper=None):
+        """
+        Fetch the records whose numeric `field` is within [lower, upper],
+        ordered by doc_id. Bounds are optional.
+        """
+        return self.get_table(table_name).range_search(field, lower, upper)
+
+    def indexed_search(self, table_name, query):
+        """ SQLite tables push equality terms down to their indexes. """
+        return None
+
+    def insert(self, table_name, data):
+        table = self.get_table(table_name)
+        if isinstance(data, list):
+            return table.insert_multiple(data)
+        else:
+            return table.insert(data)
+
+    def update_single(self, table_name, data):
+        doc_id = int(data.get("doc_id"))
+        if not doc_id:
+            raise ValueError("Missing 'doc_id' for update operation.")
+
+        table = self.get_table(table_name)
+        if not table.contains(doc_id=doc_id):
+            raise ValueError(
+                f"No document found in '{table_name}' with doc_id {doc_id}"
+            )
+
+        record = {key: value for key, value in data.items() if key != "doc_id"}
+
+        def replace_doc(doc):
+            doc.clear()
+            doc.update(record)
+
+        table.update(replace_doc, doc_ids=[doc_id])
+
+    def delete(self, table_name, query_field, query_value):
+        table = self.get_table(table_name)
+        q = Query()
+        table.remove(q[query_field] == query_value)
+
+    def remove(self, table_name, doc_ids):
+        table = self.get_table(table_name)
+        return table.remove(doc_ids=doc_ids)
+
+    def get_by_field(self, table_name: str, field_name: str, field_value: str):
+        table = self.get_table(table_name)
+        q = Query()
+        result = table.search(q[field_name] == field_value)
+        return [{**record, "doc_id": str(record.doc_id)} for record in result] \
+            if result else None
+
+    def migrate_from_tinydb(self, tinydb_path: str):
+        """
+        Copy every table of a TinyDB JSON database, keeping doc_ids.
+        Tables already holding records in the SQLite database are skipped.
+        """
+        source = TinyDB(tinydb_path)
+        for table_name in source.tables():
+            if self.count_records(table_name) > 0:
+                continue
+            records = [
+                Document(dict(record), doc_id=record.doc_id)
+                for record in source.table(table_name)
+            ]
+            self.get_table(table_name).insert_multiple(records)
+        source.close()
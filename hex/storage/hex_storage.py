@@ -1,25 +1,57 @@
 """ Unified storage interface for the full Hex application. """
+import os
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from tinydb import Query
 
-from .base_storage import TinyDBStorageService
+from hex.utils.date import to_epoch
+from hex.utils.registry import SharedRegistry
+from .base_storage import TinyDBStorageService, SQLiteStorageService
 from .artifact_manager import ArtifactManager
 
 
-class HexStorage(TinyDBStorageService):
+ARTIFACT_REFS_TABLE = "artifact_refs"
+CHANGES_TABLE = "changes"
+CURSORS_TABLE = "cursors"
+# Bookkeeping tables whose writes are not logged in the change feed.
+UNLOGGED_TABLES = {
+    ARTIFACT_REFS_TABLE, CHANGES_TABLE, CURSORS_TABLE, "migrations"
+}
+
+
+class HexStorageMixin:
     """
-    Unified storage interface for the full Hex application.
+    Hex table logic shared by every storage backend.
     Manages all entity tables (articles, models, tags, predictions, etc.)
-    using TinyDB as backend.
     Automatically handles large object persistence using ArtifactManager.
     """
 
-    def __init__(self, db_path):
+    # Fields looked up by equality in hot loops of the flows.
+    DEFAULT_INDEXES = {
+        "tags": ["name"],
+        "tagged_articles": ["original_doc_id"],
+        "selected_articles": ["original_doc_id"],
+        "replicated_articles": ["original_doc_id"],
+        ARTIFACT_REFS_TABLE: ["sha256"],
+        CURSORS_TABLE: ["consumer"],
+    }
+
+    def __init__(self, db_path, artifact_mode: str = "files",
+                 artifact_compression: str = "gzip"):
         super().__init__(db_path)
 
         artifact_dir = Path(db_path).parent / "artifacts"
-        self.artifacts = ArtifactManager(base_path=str(artifact_dir))
+        self.artifacts = ArtifactManager(
+            base_path=str(artifact_dir),
+            mode=artifact_mode,
+            compression=artifact_compression
+        )
+
+        for table_name, fields in self.DEFAULT_INDEXES.items():
+            for field in fields:
+                self.create_index(table_name, field)
 
     def save(self, table_name: str, data) -> List[str]:
         """
@@ -31,6 +63,7 @@ class HexStorage(TinyDBStorageService):
             data = [data]
 
         result = []
+        blob_refs = Counter()
         for obj in data:
             obj["table_name"] = table_name
             obj["created_at"] = datetime.utcnow().isoformat()
@@ -40,16 +73,25 @@ class HexStorage(TinyDBStorageService):
                 # TODO ADD self.model_manager.save(obj)
                 obj["last_updated"] = obj["created_at"]
 
+            # Keep a sortable epoch next to the RFC-822 published date
+            if "published_date" in obj:
+                obj["published_ts"] = to_epoch(obj["published_date"])
+
             # Automatically offload large or structured fields
             obj = self.artifacts.save_large_fields(
                 obj,
                 table_name=table_name,
                 timestamp=obj["created_at"]
             )
+            blob_refs.update(self.artifacts.blob_keys(obj))
 
             result.append(obj)
 
-        return [str(id) for id in self.insert(table_name, result)]
+        with self.transaction():
+            ids = self.insert(table_name, result)
+            self._count_blob_refs(blob_refs)
+            self._log_changes(table_name, ids)
+        return [str(id) for id in ids]
 
     def update(self, table_name: str, data: List[Dict[str, Any]]) -> List[str]:
         """
@@ -62,17 +104,236 @@ class HexStorage(TinyDBStorageService):
             data = [data]
 
         ids = []
+        updates = []
+        blob_refs = Counter()
+        # Blob keys of each record as of the previous update of the batch
+        latest_keys = {}
         for obj in data:
             obj["last_updated"] = datetime.utcnow().isoformat()
+            if "published_date" in obj:
+                obj["published_ts"] = to_epoch(obj["published_date"])
             obj = self.artifacts.save_large_fields(
                 obj,
                 table_name=table_name,
                 timestamp=obj["last_updated"]
             )
-            ids.append(self.update_single(table_name, obj))
+            if self.artifacts.mode == "cas":
+                doc_id = int(obj["doc_id"])
+                if doc_id not in latest_keys:
+                    previous = self.get_table(table_name).get(doc_id=doc_id)
+                    latest_keys[doc_id] = self.artifacts.blob_keys(previous or {})
+                blob_refs.subtract(latest_keys[doc_id])
+                latest_keys[doc_id] = self.artifacts.blob_keys(obj)
+                blob_refs.update(latest_keys[doc_id])
+            updates.append(obj)
+
+        with self.transaction():
+            for obj in updates:
+                ids.append(self.update_single(table_name, obj))
+            self._count_blob_refs(blob_refs)
+            self._log_changes(table_name, [obj["doc_id"] for obj in updates])
 
         return [str(id) for id in ids]
 
+    def remove(self, table_name: str, doc_ids) -> List[int]:
+        """
+        Remove records by doc_id and release the blobs they reference.
+        """
+        table = self.get_table(table_name)
+        blob_refs = Counter()
+        for doc_id in doc_ids:
+            record = table.get(doc_id=int(doc_id))
+            blob_refs.subtract(self.artifacts.blob_keys(record or {}))
+        with self.transaction():
+            removed = super().remove(table_name, doc_ids)
+            self._count_blob_refs(blob_refs)
+        return removed
+
+    def drop_table(self, table_name: str):
+        """
+        Drop a table and release the blobs its records reference.
+        """
+        blob_refs = Counter()
+        if self.artifacts.mode == "cas":
+            for record in self.iter_documents(table_name):
+                blob_refs.subtract(self.artifacts.blob_keys(record))
+        with self.transaction():
+            self.db.drop_table(table_name)
+            self._count_blob_refs(blob_refs)
+
+    def _count_blob_refs(self, blob_refs: Dict[str, int]):
+        """ Apply reference count changes of content-addressed blobs. """
+        Ref = Query()
+        for key, delta in blob_refs.items():
+            if delta == 0:
+                continue
+            refs = self.search(ARTIFACT_REFS_TABLE, Ref.sha256 == key)
+            if refs:
+                ref = refs[0]
+                ref["count"] += delta
+                self.update_single(ARTIFACT_REFS_TABLE, ref)
+            else:
+                self.insert(ARTIFACT_REFS_TABLE, {"sha256": key, "count": delta})
+
+    def _log_changes(self, table_name: str, doc_ids):
+        """ Append written doc_ids to the change feed read by changes_since. """
+        if table_name in UNLOGGED_TABLES or not doc_ids:
+            return
+        self.insert(CHANGES_TABLE, [
+            {"target_table": table_name, "record_id": int(doc_id)}
+            for doc_id in doc_ids
+        ])
+
+    def _find_cursor(self, table_name: str, consumer: str):
+        Cursor = Query()
+        cursors = self.search(
+            CURSORS_TABLE,
+            (Cursor.consumer == consumer) & (Cursor.target_table == table_name)
+        )
+        return cursors[0] if cursors else None
+
+    def changes_since(self, table_name: str, consumer: str, where=None,
+                      limit: Optional[int] = None,
+                      fields: Optional[List[str]] = None
+                      ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Fetch the records inserted or updated since the consumer's last
+        committed cursor, in change order, each record once. A consumer
+        without a cursor gets every record of the table.
+        Records left pending by earlier commits come first. `where`
+        filters records: those it rejects are consumed, and come back only
+        if they change again. `limit` caps how many are returned; records
+        past the limit are not consumed and stay pending.
+        Only the changed and pending records are read.
+        Returns the records and the cursor to pass to commit_cursor once
+        they have been processed.
+        """
+        cursor_record = self._find_cursor(table_name, consumer)
+        if cursor_record is None:
+            record_ids = [doc.doc_id for doc in self.iter_documents(table_name, [])]
+            position = self.last_doc_id(CHANGES_TABLE)
+        else:
+            entries, position = self.read_since(
+                CHANGES_TABLE, cursor_record["cursor"]
+            )
+            # Pending records first, then by their last change
+            last_change = dict.fromkeys(cursor_record.get("pending", []))
+            for entry in entries:
+                if entry["target_table"] == table_name:
+                    last_change.pop(entry["record_id"], None)
+                    last_change[entry["record_id"]] = None
+            record_ids = list(last_change)
+
+        records = {
+            record.doc_id: record
+            for record in self.get_by_ids(table_name, record_ids)
+        }
+        results = []
+        pending = []
+        for record_id in record_ids:
+            record = records.get(record_id)
+            if record is None:
+                continue
+            if where is not None and not where(record):
+                continue
+            if limit is not None and len(results) >= limit:
+                pending.append(record_id)
+                continue
+            if fields is not None:
+                record = {key: record[key] for key in fields if key in record}
+            results.append({**record, "doc_id": str(record_id)})
+        return results, {"position": position, "pending": pending}
+
+    def commit_cursor(self, table_name: str, consumer: str,
+                      cursor: Dict[str, Any], unhandled=()):
+        """
+        Record that the consumer processed the records returned with
+        `cursor`, except the `unhandled` doc_ids, which stay pending with
+        the records changes_since did not return. Then compact the feed.
+        """
+        pending = list(dict.fromkeys(
+            cursor["pending"] + [int(doc_id) for doc_id in unhandled]
+        ))
+        with self.transaction():
+            cursor_record = self._find_cursor(table_name, consumer)
+            if cursor_record:
+                cursor_record["cursor"] = cursor["position"]
+                cursor_record["pending"] = pending
+                self.update_single(CURSORS_TABLE, cursor_record)
+            else:
+                self.insert(CURSORS_TABLE, {
+                    "consumer": consumer, "target_table": table_name,
+                    "cursor": cursor["position"], "pending": pending
+                })
+            self.compact_changes()
+
+    def reset_cursor(self, table_name: str, consumer: str):
+        """ Make the consumer's next changes_since return every record. """
+        cursor_record = self._find_cursor(table_name, consumer)
+        if cursor_record:
+            self.remove(CURSORS_TABLE, [int(cursor_record["doc_id"])])
+
+    def compact_changes(self) -> int:
+        """
+        Drop the change entries every consumer has read: those up to the
+        slowest cursor, read by doc_id range, so the cost follows the
+        entries added since the last compaction, not the size of the
+        feed. Without consumers, every entry is dropped. The last entry
+        is kept, so that TinyDB, which numbers new documents after the
+        highest doc_id, never reuses a change id.
+        Returns the number of dropped entries.
+        """
+        last_id = self.last_doc_id(CHANGES_TABLE)
+        upper_id = min(
+            (cursor_record["cursor"] for cursor_record in self.get_all(CURSORS_TABLE)),
+            default=last_id
+        )
+        upper_id = min(upper_id, last_id - 1)
+        if upper_id <= 0:
+            return 0
+        consumed = [
+            entry.doc_id
+            for entry in self.range_by_id(CHANGES_TABLE, 0, upper_id)
+        ]
+        if consumed:
+            super().remove(CHANGES_TABLE, consumed)
+        return len(consumed)
+
+    def collect_artifacts(self) -> int:
+        """
+        Garbage-collect blobs that no record references any more, including
+        blobs left behind by a write that failed before counting its refs.
+        Returns the number of deleted blobs.
+        """
+        refs = self.get_all(ARTIFACT_REFS_TABLE)
+        live = {ref["sha256"] for ref in refs if ref["count"] > 0}
+        dead_ids = [int(ref["doc_id"]) for ref in refs if ref["count"] <= 0]
+
+        deleted = 0
+        for key in self.artifacts.stored_blob_keys():
+            if key not in live and self.artifacts.delete_blob(key):
+                deleted += 1
+        if dead_ids:
+            super().remove(ARTIFACT_REFS_TABLE, dead_ids)
+        return deleted
+
+    def save_many(self, table_name: str, data: List[Dict[str, Any]]) -> List[str]:
+        """
+        Save a batch of records in a single transaction.
+        Returns list of doc_ids.
+        """
+        with self.transaction():
+            return self.save(table_name, data)
+
+    def update_many(self, table_name: str, data: List[Dict[str, Any]]) -> List[str]:
+        """
+        Update a batch of records in a single transaction, so the database
+        is written once instead of once per record.
+        Returns list of doc_ids.
+        """
+        with self.transaction():
+            return self.update(table_name, data)
+
     def get_all(self, table_name: str) -> List[Dict[str, Any]]:
         """
         Retrieve all records from the specified table.
@@ -81,15 +342,76 @@ class HexStorage(TinyDBStorageService):
         table = super().get_table(table_name)
         return [{**record, "doc_id": str(record.doc_id)} for record in table]
 
+    def iter(self, table_name: str, fields: Optional[List[str]] = None,
+             where=None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream records of the specified table one at a time, without
+        materializing the table. Only `fields` are copied when given and
+        `where` is an optional TinyDB query.
+        Add doc_id to results.
+        """
+        for record in self.iter_documents(table_name, fields, where):
+            record["doc_id"] = str(record.doc_id)
+            yield record
+
     def search(self, table_name: str, query) -> List[Dict[str, Any]]:
         """
         Search for records in the specified table using a query.
+        Equality queries on an indexed field use the index.
         Add doc_id to results.
         """
-        table = super().get_table(table_name)
-        results = table.search(query)
+        results = self.indexed_search(table_name, query)
+        if results is None:
+            table = super().get_table(table_name)
+            results = table.search(query)
         return [{**record, "doc_id": str(record.doc_id)} for record in results]
 
+    def search_range(self, table_name: str, field: str,
+                     lower: Optional[float] = None,
+                     upper: Optional[float] = None,
+                     query=None) -> List[Dict[str, Any]]:
+        """
+        Fetch records whose numeric field (e.g. published_ts) is within
+        [lower, upper] using a range index, optionally filtered by a query.
+        Add doc_id to results.
+        """
+        results = self.range_search(table_name, field, lower, upper)
+        if query is not None:
+            results = [record for record in results if query(record)]
+        return [{**record, "doc_id": str(record.doc_id)} for record in results]
+
+    def backfill_published_ts(self, table_name: str) -> int:
+        """
+        One-time migration adding published_ts to records saved before it
+        existed. Returns the number of records updated.
+        """
+        Migration = Query()
+        done = self.search(
+            "migrations",
+            (Migration.name == "published_ts")
+            & (Migration.target_table == table_name)
+        )
+        if done:
+            return 0
+
+        with self.transaction():
+            table = self.get_table(table_name)
+            doc_ids = [
+                record.doc_id for record in table
+                if "published_date" in record and "published_ts" not in record
+            ]
+
+            def add_published_ts(record):
+                record["published_ts"] = to_epoch(record.get("published_date"))
+
+            table.update(add_published_ts, doc_ids=doc_ids)
+            self.save("migrations", {
+                "name": "published_ts",
+                "target_table": table_name,
+                "updated_count": len(doc_ids)
+            })
+        return len(doc_ids)
+
     def lazy_load(self, data) -> List[Dict[str, Any]]:
         """ Turn data into lazy load objects. """
         if not isinstance(data, list):
@@ -121,13 +443,87 @@ class HexStorage(TinyDBStorageService):
 
     def get_obj_in_range(self, table_name, first_id=None, last_id=None):
         """Fetch objects with ID between first_id and last_id (inclusive)."""
-        objs = self.get_all(table_name)
-        if first_id is None:
-            first_id = 0
-        if last_id is None:
-            last_id = len(objs)
-        objs = [obj for obj in objs if
-                    int(obj.get("doc_id")) > first_id and
-                    int(obj.get("doc_id")) <= last_id]
-
-        return objs
+        records = self.range_by_id(table_name, first_id or 0, last_id)
+        return [{**record, "doc_id": str(record.doc_id)} for record in records]
+
+    def read_since(self, table_name: str, cursor: int = 0,
+                   limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Fetch records inserted after the `cursor` doc_id, at most `limit`.
+        Returns the records and the cursor to pass on the next call.
+        """
+        last_id = self.last_doc_id(table_name)
+        while True:
+            upper_id = cursor + limit if limit is not None else None
+            records = self.get_obj_in_range(table_name, cursor, upper_id)
+            if records or upper_id is None or upper_id >= last_id:
+                break
+            # Skip over a gap of deleted doc_ids
+            cursor = upper_id
+        next_cursor = int(records[-1]["doc_id"]) if records else cursor
+        return records, next_cursor
+
+
+class HexStorage(HexStorageMixin, TinyDBStorageService):
+    """
+    Unified storage interface for the full Hex application.
+    Uses TinyDB as backend.
+    """
+
+
+class SQLiteHexStorage(HexStorageMixin, SQLiteStorageService):
+    """
+    Unified storage interface for the full Hex application.
+    Uses SQLite as backend.
+    """
+
+
+STORAGE_BACKENDS = {
+    "tinydb": (HexStorage, "db_path"),
+    "sqlite": (SQLiteHexStorage, "sqlite_db_path"),
+}
+
+
+def load_storage(config: Dict[str, Any]) -> HexStorageMixin:
+    """
+    Open the storage selected by `storage_backend` in config.yaml.
+    Defaults to TinyDB on `db_path`.
+    """
+    backend = config.get("storage_backend", "tinydb")
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Storage backend '{backend}' not found in registry.")
+
+    storage_cls, path_key = STORAGE_BACKENDS[backend]
+    return storage_cls(
+        config.get(path_key),
+        artifact_mode=config.get("artifact_mode", "files"),
+        artifact_compression=config.get("artifact_compression", "gzip")
+    )
+
+
+_SHARED_STORAGES: SharedRegistry[HexStorageMixin] = SharedRegistry()
+
+
+def get_storage(config: Dict[str, Any]) -> HexStorageMixin:
+    """
+    Return the process-wide storage for the database selected in config,
+    opening it on first use. Steps share it instead of re-opening and
+    re-parsing the database.
+    """
+    backend = config.get("storage_backend", "tinydb")
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Storage backend '{backend}' not found in registry.")
+
+    path_key = STORAGE_BACKENDS[backend][1]
+    key = (
+        backend,
+        os.path.abspath(config.get(path_key)),
+        config.get("artifact_mode", "files"),
+        config.get("artifact_compression", "gzip"),
+    )
+    return _SHARED_STORAGES.get(key, lambda: load_storage(config))
+
+
+def clear_storage_registry():
+    """ Drop the storages, so the next get_storage re-opens the databases. """
+    _SHARED_STORAGES.clear()
@@ -0,0 +1,302 @@
+""" Secondary indexes for TinyDB tables. """
+import bisect
+import math
+import re
+from collections import defaultdict
+from typing import (
+    Any, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+)
+
+from tinydb.table import Document, Table
+
+
+FIELD_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def equality_terms(query) -> List[Tuple[str, Any]]:
+    """
+    Extract top-level `field == value` terms from a TinyDB query.
+    Terms can be used to pre-filter candidates; the full query is still
+    evaluated on the candidates, so missing terms only cost speed.
+    """
+    hashval = getattr(query, "_hash", None)
+    if not isinstance(hashval, tuple) or not hashval:
+        return []
+    return _terms_from_hash(hashval)
+
+
+def _terms_from_hash(hashval) -> List[Tuple[str, Any]]:
+    op = hashval[0]
+    if op == "==" and len(hashval) == 3:
+        path, value = hashval[1], hashval[2]
+        if (isinstance(path, tuple) and len(path) == 1
+                and isinstance(path[0], str) and FIELD_NAME_RE.match(path[0])
+                and isinstance(value, (str, int, float))):
+            return [(path[0], value)]
+    elif op == "and":
+        terms = []
+        for sub in hashval[1]:
+            if isinstance(sub, tuple) and sub:
+                terms.extend(_terms_from_hash(sub))
+        return terms
+    return []
+
+
+def _copy_nested(value: Any) -> Any:
+    """Copy the dicts and lists of a JSON value; scalars are immutable."""
+    if isinstance(value, dict):
+        return {key: _copy_nested(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_nested(item) for item in value]
+    return value
+
+
+class IsolatedDocument(Document):
+    """
+    Document owning its nested values. Tables read from the storage's
+    parsed-file cache, and a shallow copy would share nested dicts and
+    lists with it: unsaved changes to them would reach the file with the
+    next write to any table.
+    """
+
+    def __init__(self, value: Dict[str, Any], doc_id: int):
+        super().__init__(_copy_nested(value), doc_id)
+
+
+class _CopyOnAccess(dict):
+    """ Dict handing out (and keeping) a copy of a document on access. """
+
+    def __getitem__(self, key):
+        doc = dict(super().__getitem__(key))
+        self[key] = doc
+        return doc
+
+
+class IndexedTable(Table):
+    """
+    TinyDB table counting its own writes, so indexes can tell whether
+    they have seen every change made to it. Reloads of a file changed by
+    another process are counted as well.
+    """
+    document_class = IsolatedDocument
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.write_count = 0
+
+    def _update_table(self, updater):
+        """
+        TinyDB's table update, except that documents are copied before
+        the updater changes them: the previous versions stay intact in
+        the storage's parsed-file cache and transaction savepoints.
+        """
+        tables = self._storage.read()
+        if tables is None:
+            tables = {}
+        raw_table = tables.get(self.name, {})
+        table = _CopyOnAccess(
+            (self.document_id_class(doc_id), doc)
+            for doc_id, doc in raw_table.items()
+        )
+        updater(table)
+        tables[self.name] = {str(doc_id): doc for doc_id, doc in table.items()}
+        self._storage.write(tables)
+        self.clear_cache()
+        self.write_count += 1
+
+    @property
+    def version(self) -> Tuple[int, int]:
+        return self.write_count, getattr(self._storage, "parse_count", 0)
+
+    def iter_projected(self, fields: Optional[Iterable[str]] = None,
+                       cond=None) -> Iterator[Document]:
+        """
+        Yield documents one at a time, keeping only `fields` when given.
+        Unlike iterating the table, unrequested fields are never copied.
+        """
+        raw_table = self._read_table()
+        for doc_id in list(raw_table):
+            raw_doc = raw_table.get(doc_id)
+            if raw_doc is None or (cond is not None and not cond(raw_doc)):
+                continue
+            if fields is not None:
+                raw_doc = {
+                    field: raw_doc[field] for field in fields if field in raw_doc
+                }
+            yield self.document_class(raw_doc, self.document_id_class(doc_id))
+
+    def last_doc_id(self) -> int:
+        """Highest doc_id in the table (0 when empty)."""
+        return max(map(int, self._read_table()), default=0)
+
+    def get_range(self, after_id: int = 0,
+                  upper_id: Optional[int] = None) -> List[Document]:
+        """
+        Documents with after_id < doc_id <= upper_id, ordered by doc_id.
+        Looks ids up directly, scanning the keys only for sparse ranges.
+        """
+        raw_table = self._read_table()
+        if upper_id is None:
+            upper_id = self.last_doc_id()
+        if upper_id - after_id > len(raw_table):
+            doc_ids = (
+                int(doc_id) for doc_id in raw_table
+                if after_id < int(doc_id) <= upper_id
+            )
+        else:
+            doc_ids = range(after_id + 1, upper_id + 1)
+        return self.get_many(doc_ids)
+
+    def get_many(self, doc_ids: Iterable[int]) -> List[Document]:
+        """Fetch documents by id without scanning the table."""
+        raw_table = self._read_table()
+        docs = []
+        for doc_id in sorted(doc_ids):
+            raw_doc = raw_table.get(str(doc_id))
+            if raw_doc is not None:
+                docs.append(
+                    self.document_class(raw_doc, self.document_id_class(doc_id))
+                )
+        return docs
+
+
+class BaseIndex:
+    """
+    Index over one field of a table, kept in sync with the table's writes.
+    Records whose value is missing or unhashable are left out, which is
+    safe for lookups on str/int/float values.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self.table: Optional[IndexedTable] = None
+        self.version: Optional[Tuple[int, int]] = None
+        self._values: Dict[int, Hashable] = {}
+
+    def is_synced(self, table: IndexedTable) -> bool:
+        return self.table is table and self.version == table.version
+
+    def invalidate(self) -> None:
+        self.version = None
+
+    def build(self, table: IndexedTable) -> None:
+        self.clear()
+        for doc in table:
+            self.set(doc.doc_id, doc)
+        self.table = table
+        self.version = table.version
+
+    def _value_of(self, record: dict) -> Optional[Hashable]:
+        value = record.get(self.field)
+        if value is None or not isinstance(value, Hashable):
+            return None
+        return value
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def set(self, doc_id: int, record: dict) -> None:
+        raise NotImplementedError
+
+    def discard(self, doc_id: int) -> None:
+        raise NotImplementedError
+
+    def lookup(self, value: Any) -> Optional[Set[int]]:
+        """doc_ids holding `value`, or None if the index cannot tell."""
+        raise NotImplementedError
+
+
+class HashIndex(BaseIndex):
+    """Hash index mapping the values of one field to their doc_ids."""
+
+    def __init__(self, field: str):
+        super().__init__(field)
+        self.clear()
+
+    def clear(self) -> None:
+        self._buckets: Dict[Hashable, Set[int]] = defaultdict(set)
+        self._values = {}
+
+    def set(self, doc_id: int, record: dict) -> None:
+        """Index (or re-index) a record under its current value."""
+        self.discard(doc_id)
+        value = self._value_of(record)
+        if value is None:
+            return
+        self._buckets[value].add(doc_id)
+        self._values[doc_id] = value
+
+    def discard(self, doc_id: int) -> None:
+        if doc_id not in self._values:
+            return
+        value = self._values.pop(doc_id)
+        bucket = self._buckets[value]
+        bucket.discard(doc_id)
+        if not bucket:
+            del self._buckets[value]
+
+    def lookup(self, value: Any) -> Optional[Set[int]]:
+        return set(self._buckets.get(value, ()))
+
+
+class SortedIndex(BaseIndex):
+    """
+    Sorted (value, doc_id) index on a numeric field, answering range
+    queries with a binary search plus a slice.
+    """
+
+    def __init__(self, field: str):
+        super().__init__(field)
+        self.clear()
+
+    def clear(self) -> None:
+        self._entries: List[Tuple[float, int]] = []
+        self._values = {}
+
+    def _value_of(self, record: dict) -> Optional[float]:
+        value = record.get(self.field)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+        return value
+
+    def build(self, table: IndexedTable) -> None:
+        self.clear()
+        for doc in table:
+            value = self._value_of(doc)
+            if value is not None:
+                self._values[doc.doc_id] = value
+        self._entries = sorted(
+            (value, doc_id) for doc_id, value in self._values.items()
+        )
+        self.table = table
+        self.version = table.version
+
+    def set(self, doc_id: int, record: dict) -> None:
+        self.discard(doc_id)
+        value = self._value_of(record)
+        if value is None:
+            return
+        bisect.insort(self._entries, (value, doc_id))
+        self._values[doc_id] = value
+
+    def discard(self, doc_id: int) -> None:
+        if doc_id not in self._values:
+            return
+        entry = (self._values.pop(doc_id), doc_id)
+        position = bisect.bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+
+    def lookup(self, value: Any) -> Optional[Set[int]]:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+        return self.range(value, value)
+
+    def range(self, lower: Optional[float] = None,
+              upper: Optional[float] = None) -> Set[int]:
+        """doc_ids whose value is within [lower, upper] (bounds optional)."""
+        start = 0 if lower is None else \
+            bisect.bisect_left(self._entries, (lower, -math.inf))
+        end = len(self._entries) if upper is None else \
+            bisect.bisect_right(self._entries, (upper, math.inf))
+        return {doc_id for _, doc_id in self._entries[start:end]}
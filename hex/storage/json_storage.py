@@ -0,0 +1,135 @@
+""" TinyDB JSON storage with atomic writes and buffered transactions. """
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from tinydb.storages import Storage, touch
+
+from hex.utils.files import atomic_write
+
+
+class TransactionalJSONStorage(Storage):
+    """
+    JSON file storage for TinyDB.
+
+    Every flush goes to a temporary file in the same directory which then
+    replaces the database with os.replace, so a crash never leaves a
+    half-written file behind.
+    Between begin() and commit() writes are only kept in memory, so any
+    number of mutations costs a single file write. Nested begin() calls
+    open savepoints: rollback() undoes the writes of the innermost level
+    only, and only the outermost commit() writes the file.
+    The parsed file is cached and reused until the file changes on disk,
+    so repeated reads do not parse the JSON again.
+    """
+
+    def __init__(self, path: str, create_dirs: bool = False,
+                 encoding: Optional[str] = None, **kwargs):
+        super().__init__()
+        self._path = path
+        self._encoding = encoding
+        self.kwargs = kwargs
+        # (pending, dirty) when each open transaction level began
+        self._savepoints: List[Tuple[Optional[Dict[str, Any]], bool]] = []
+        self._pending: Optional[Dict[str, Any]] = None
+        self._dirty = False
+        self._cache: Optional[Dict[str, Any]] = None
+        self._cache_signature = None
+        self.parse_count = 0
+        self.parse_seconds = 0.0
+        self.cache_hits = 0
+        touch(path, create_dirs=create_dirs)
+
+    @property
+    def in_transaction(self) -> bool:
+        return bool(self._savepoints)
+
+    def _signature(self):
+        stat = os.stat(self._path)
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def invalidate_cache(self) -> None:
+        self._cache = None
+        self._cache_signature = None
+
+    def read(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        if self._pending is not None:
+            return self._pending
+
+        signature = self._signature()
+        if self._cache is not None and signature == self._cache_signature:
+            self.cache_hits += 1
+            data = self._cache
+        else:
+            start = time.perf_counter()
+            with open(self._path, encoding=self._encoding) as handle:
+                content = handle.read()
+            if not content:
+                return None
+            data = json.loads(content)
+            self.parse_seconds += time.perf_counter() - start
+            self.parse_count += 1
+            self._cache, self._cache_signature = data, signature
+        if self.in_transaction:
+            # Tables replace their entry: keep the cached file intact
+            self._pending = dict(data)
+            return self._pending
+        return data
+
+    def write(self, data: Dict[str, Dict[str, Any]]) -> None:
+        if self.in_transaction:
+            self._pending = data
+            self._dirty = True
+            return
+        self._flush(data)
+
+    def _flush(self, data: Dict[str, Dict[str, Any]]) -> None:
+        try:
+            atomic_write(self._path, json.dumps(data, **self.kwargs),
+                         encoding=self._encoding)
+        except BaseException:
+            self.invalidate_cache()
+            raise
+        self._cache, self._cache_signature = data, self._signature()
+
+    def begin(self) -> None:
+        """
+        Open a transaction level. Tables write a new dict per table and
+        never change stored documents in place (IndexedTable), so a
+        shallow copy of the pending data is a savepoint.
+        """
+        pending = dict(self._pending) if self._pending is not None else None
+        self._savepoints.append((pending, self._dirty))
+
+    def commit(self) -> None:
+        """ Close a level; the outermost one writes the file if needed. """
+        if not self._savepoints:
+            return
+        self._savepoints.pop()
+        if self._savepoints:
+            return
+        pending, dirty = self._pending, self._dirty
+        self._pending, self._dirty = None, False
+        if dirty:
+            self._flush(pending)
+
+    def rollback(self) -> None:
+        """ Undo the writes of the innermost level and close it. """
+        if not self._savepoints:
+            return
+        self._pending, self._dirty = self._savepoints.pop()
+        if not self._savepoints:
+            self._pending, self._dirty = None, False
+            # The cached tables may hold the rolled back mutations
+            self.invalidate_cache()
+
+    def cache_stats(self) -> Dict[str, float]:
+        """Parse counts and the parse time saved by cache hits."""
+        avg_parse = self.parse_seconds / self.parse_count if self.parse_count else 0
+        return {
+            "parses": self.parse_count,
+            "parse_time": self.parse_seconds,
+            "cache_hits": self.cache_hits,
+            "saved_parse_time": self.cache_hits * avg_parse,
+        }
@@ -0,0 +1,359 @@
+""" SQLite database exposing the subset of the TinyDB API used by Hex. """
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+from tinydb.table import Document
+
+from .index import FIELD_NAME_RE, equality_terms
+
+
+# Fields the flows filter on, indexed on every table.
+INDEXED_FIELDS = (
+    "published_date", "published_ts", "original_doc_id", "name", "url_domain"
+)
+
+
+def _quote(identifier: str) -> str:
+    """Quote an SQL identifier (table or index name)."""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _json_path(field: str) -> str:
+    """SQL expression extracting a top-level JSON field from a row."""
+    if not FIELD_NAME_RE.match(field):
+        raise ValueError(f"Unsupported field name for SQL: '{field}'")
+    return f"json_extract(data, '$.{field}')"
+
+
+class SQLiteTable:
+    """
+    A table stored as (doc_id, JSON data) rows in SQLite.
+    Mirrors the tinydb.table.Table methods used across the repo and yields
+    tinydb Document objects, so callers can rely on `record.doc_id`.
+    """
+
+    def __init__(self, db: "SQLiteDB", name: str):
+        self._db = db
+        self._name = name
+        self._create()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def _create(self):
+        table = _quote(self._name)
+        with self._db.transaction():
+            row = self._db.conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (self._name,)
+            ).fetchone()
+            if row is not None and "AUTOINCREMENT" not in row[0].upper():
+                self._add_autoincrement()
+            # AUTOINCREMENT never reuses the doc_id of a deleted last row,
+            # like TinyDB, so references and change-feed cursors stay valid
+            self._db.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                "(doc_id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)"
+            )
+            for field in INDEXED_FIELDS:
+                self.create_index(field)
+
+    def _add_autoincrement(self):
+        """Rebuild a table created without AUTOINCREMENT, keeping its rows."""
+        table = _quote(self._name)
+        old_table = _quote(f"{self._name}__old")
+        self._db.conn.execute(f"ALTER TABLE {table} RENAME TO {old_table}")
+        self._db.conn.execute(
+            f"CREATE TABLE {table} "
+            "(doc_id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)"
+        )
+        self._db.conn.execute(
+            f"INSERT INTO {table} (doc_id, data) SELECT doc_id, data FROM {old_table}"
+        )
+        self._db.conn.execute(f"DROP TABLE {old_table}")
+
+    def create_index(self, field: str):
+        """Create an expression index on a top-level JSON field."""
+        index = _quote(f"{self._name}__{field}")
+        with self._db.transaction():
+            self._db.conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {index} "
+                f"ON {_quote(self._name)} ({_json_path(field)})"
+            )
+
+    def _select(self, where: str = "", params: tuple = ()) -> Iterator[Document]:
+        sql = f"SELECT doc_id, data FROM {_quote(self._name)} {where} ORDER BY doc_id"
+        with self._db.lock:
+            rows = self._db.conn.execute(sql, params).fetchall()
+        for doc_id, data in rows:
+            yield Document(json.loads(data), doc_id=doc_id)
+
+    def _candidates(self, cond) -> Iterator[Document]:
+        terms = equality_terms(cond)
+        if not terms:
+            return self._select()
+        where = "WHERE " + " AND ".join(f"{_json_path(f)} = ?" for f, _ in terms)
+        return self._select(where, tuple(v for _, v in terms))
+
+    def iter_projected(self, fields: Optional[Iterable[str]] = None, cond=None,
+                       batch_size: int = 500) -> Iterator[Document]:
+        """
+        Yield documents page by page (keyset pagination on doc_id), keeping
+        only `fields` when given. Without a condition the projection runs
+        in SQLite, so unrequested fields are never decoded.
+        """
+        if cond is None and fields is not None:
+            fields = list(fields)
+            for field in fields:
+                _json_path(field)
+            marks = ", ".join("?" for _ in fields)
+            # json_each gives booleans as 1/0: restore them from their type
+            column = (
+                "(SELECT json_group_object(key, CASE type "
+                "WHEN 'true' THEN json('true') WHEN 'false' THEN json('false') "
+                f"ELSE value END) FROM json_each(data) WHERE key IN ({marks}))"
+            )
+            column_params = tuple(fields)
+        else:
+            column, column_params = "data", ()
+
+        terms = equality_terms(cond) if cond is not None else []
+        where = "".join(f" AND {_json_path(f)} = ?" for f, _ in terms)
+        term_params = tuple(v for _, v in terms)
+        sql = (
+            f"SELECT doc_id, {column} FROM {_quote(self._name)} "
+            f"WHERE doc_id > ?{where} ORDER BY doc_id LIMIT ?"
+        )
+
+        last_id = 0
+        while True:
+            with self._db.lock:
+                rows = self._db.conn.execute(
+                    sql, column_params + (last_id,) + term_params + (batch_size,)
+                ).fetchall()
+            for doc_id, data in rows:
+                record = json.loads(data)
+                if cond is not None:
+                    if not cond(record):
+                        continue
+                    if fields is not None:
+                        record = {
+                            field: record[field] for field in fields
+                            if field in record
+                        }
+                yield Document(record, doc_id=doc_id)
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    def get_many(self, doc_ids: Iterable[int]) -> List[Document]:
+        """Fetch documents by id through the primary key."""
+        ids = sorted(int(doc_id) for doc_id in doc_ids)
+        docs = []
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            marks = ", ".join("?" for _ in chunk)
+            docs.extend(self._select(f"WHERE doc_id IN ({marks})", tuple(chunk)))
+        return docs
+
+    def last_doc_id(self) -> int:
+        """Highest doc_id in the table (0 when empty)."""
+        with self._db.lock:
+            row = self._db.conn.execute(
+                f"SELECT MAX(doc_id) FROM {_quote(self._name)}"
+            ).fetchone()
+        return row[0] or 0
+
+    def get_range(self, after_id: int = 0,
+                  upper_id: Optional[int] = None) -> List[Document]:
+        """
+        Documents with after_id < doc_id <= upper_id, ordered by doc_id,
+        read through the primary key.
+        """
+        if upper_id is None:
+            return list(self._select("WHERE doc_id > ?", (int(after_id),)))
+        return list(self._select(
+            "WHERE doc_id > ? AND doc_id <= ?", (int(after_id), int(upper_id))
+        ))
+
+    def range_search(self, field: str, lower=None,
+                     upper=None) -> List[Document]:
+        """Documents whose numeric `field` is within [lower, upper]."""
+        path = _json_path(field)
+        clauses = [f"json_type(data, '$.{field}') IN ('integer', 'real')"]
+        params = []
+        if lower is not None:
+            clauses.append(f"{path} >= ?")
+            params.append(lower)
+        if upper is not None:
+            clauses.append(f"{path} <= ?")
+            params.append(upper)
+        return list(self._select("WHERE " + " AND ".join(clauses), tuple(params)))
+
+    def insert(self, document: dict) -> int:
+        return self.insert_multiple([document])[0]
+
+    def insert_multiple(self, documents: List[dict]) -> List[int]:
+        sql = f"INSERT INTO {_quote(self._name)} (doc_id, data) VALUES (?, ?)"
+        doc_ids = []
+        with self._db.transaction():
+            for document in documents:
+                if not isinstance(document, dict):
+                    raise ValueError("Document is not a dictionary")
+                doc_id = document.doc_id if isinstance(document, Document) else None
+                cursor = self._db.conn.execute(
+                    sql, (doc_id, json.dumps(dict(document), ensure_ascii=False))
+                )
+                doc_ids.append(cursor.lastrowid)
+        return doc_ids
+
+    def all(self) -> List[Document]:
+        return list(self)
+
+    def search(self, cond) -> List[Document]:
+        return [doc for doc in self._candidates(cond) if cond(doc)]
+
+    def get(self, cond=None, doc_id=None) -> Optional[Document]:
+        if doc_id is not None:
+            docs = self._select("WHERE doc_id = ?", (int(doc_id),))
+            return next(docs, None)
+        if cond is not None:
+            return next((doc for doc in self._candidates(cond) if cond(doc)), None)
+        raise RuntimeError("You have to pass either cond or doc_id")
+
+    def contains(self, cond=None, doc_id=None) -> bool:
+        return self.get(cond=cond, doc_id=doc_id) is not None
+
+    def _matching(self, cond, doc_ids) -> List[Document]:
+        if doc_ids is not None:
+            ids = [int(doc_id) for doc_id in doc_ids]
+            if not ids:
+                return []
+            marks = ", ".join("?" for _ in ids)
+            return list(self._select(f"WHERE doc_id IN ({marks})", tuple(ids)))
+        if cond is not None:
+            return self.search(cond)
+        return self.all()
+
+    def update(self, fields, cond=None, doc_ids=None) -> List[int]:
+        """Update matching documents with a dict or a callable(doc)."""
+        if callable(fields):
+            perform_update: Callable[[dict], Any] = fields
+        else:
+            def perform_update(doc):
+                doc.update(fields)
+
+        sql = f"UPDATE {_quote(self._name)} SET data = ? WHERE doc_id = ?"
+        updated = []
+        with self._db.transaction():
+            for doc in self._matching(cond, doc_ids):
+                perform_update(doc)
+                self._db.conn.execute(
+                    sql, (json.dumps(dict(doc), ensure_ascii=False), doc.doc_id)
+                )
+                updated.append(doc.doc_id)
+        return updated
+
+    def remove(self, cond=None, doc_ids=None) -> List[int]:
+        if cond is None and doc_ids is None:
+            raise RuntimeError("Use truncate() to remove all documents")
+        removed = [doc.doc_id for doc in self._matching(cond, doc_ids)]
+        if removed:
+            marks = ", ".join("?" for _ in removed)
+            with self._db.transaction():
+                self._db.conn.execute(
+                    f"DELETE FROM {_quote(self._name)} WHERE doc_id IN ({marks})",
+                    tuple(removed)
+                )
+        return removed
+
+    def truncate(self) -> None:
+        with self._db.transaction():
+            self._db.conn.execute(f"DELETE FROM {_quote(self._name)}")
+
+    def __len__(self) -> int:
+        with self._db.lock:
+            row = self._db.conn.execute(
+                f"SELECT COUNT(*) FROM {_quote(self._name)}"
+            ).fetchone()
+        return row[0]
+
+    def __iter__(self) -> Iterator[Document]:
+        return self._select()
+
+
+class SQLiteDB:
+    """
+    SQLite database in WAL mode with a TinyDB-like `table`/`drop_table` API.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._tables = {}
+        self._depth = 0
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group writes in one SQLite transaction, which commits on success
+        and rolls back on error. Nested blocks are savepoints: an error
+        undoes the writes of the failed block only, like the TinyDB
+        storage.
+        """
+        with self.lock:
+            self._depth += 1
+            savepoint = f"level_{self._depth}"
+            try:
+                if self._depth == 1:
+                    if not self.conn.in_transaction:
+                        self.conn.execute("BEGIN")
+                else:
+                    self.conn.execute(f"SAVEPOINT {savepoint}")
+                try:
+                    yield
+                except BaseException:
+                    if self._depth == 1:
+                        self.conn.rollback()
+                    else:
+                        self.conn.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                        self.conn.execute(f"RELEASE SAVEPOINT {savepoint}")
+                    raise
+                if self._depth == 1:
+                    self.conn.commit()
+                else:
+                    self.conn.execute(f"RELEASE SAVEPOINT {savepoint}")
+            finally:
+                self._depth -= 1
+
+    def table(self, name: str) -> SQLiteTable:
+        if name not in self._tables:
+            self._tables[name] = SQLiteTable(self, name)
+        return self._tables[name]
+
+    def tables(self) -> set:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def drop_table(self, name: str) -> None:
+        self._tables.pop(name, None)
+        with self.transaction():
+            self.conn.execute(f"DROP TABLE IF EXISTS {_quote(name)}")
+
+    def drop_tables(self) -> None:
+        for name in self.tables():
+            self.drop_table(name)
+
+    def close(self) -> None:
+        self.conn.close()
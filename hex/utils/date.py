@@ -1,5 +1,6 @@
 """Date utilities."""
 from datetime import timezone
+from typing import Optional
 from dateutil.parser import parse as parse_date
 
 def to_aware_utc(dt):
@@ -8,4 +9,15 @@ def to_aware_utc(dt):
     parsed = parse_date(dt) if isinstance(dt, str) else dt
     if parsed.tzinfo is None:
         return parsed.replace(tzinfo=timezone.utc)
-    return parsed.astimezone(timezone.utc)
\ No newline at end of file
+    return parsed.astimezone(timezone.utc)
+
+
+def to_epoch(dt) -> Optional[int]:
+    """Convert a date (string or datetime) to UTC epoch seconds.
+    Returns None if the date is missing or cannot be parsed."""
+    if not dt:
+        return None
+    try:
+        return int(to_aware_utc(dt).timestamp())
+    except (ValueError, OverflowError, TypeError):
+        return None
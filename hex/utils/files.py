@@ -0,0 +1,40 @@
+"""File utilities."""
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Optional, Union
+
+
+@contextmanager
+def atomic_open(path: Union[str, Path], mode: str = "w",
+                encoding: Optional[str] = "utf-8", fsync: bool = True
+                ) -> Iterator[IO]:
+    """
+    Open a temporary file next to `path` for writing; on a clean exit it
+    replaces `path` (os.replace), else it is removed. Readers see the old
+    or the new content, never a partial write. With `fsync`, the content
+    is on disk before the replace.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, mode, encoding=None if "b" in mode else encoding) as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write(path: Union[str, Path], data: Union[str, bytes],
+                 encoding: str = "utf-8", fsync: bool = True) -> None:
+    """ Replace the content of `path` with `data` (see atomic_open). """
+    mode = "wb" if isinstance(data, bytes) else "w"
+    with atomic_open(path, mode, encoding=encoding, fsync=fsync) as f:
+        f.write(data)
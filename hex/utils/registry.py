@@ -0,0 +1,41 @@
+"""Process-wide registries of shared instances."""
+import threading
+from typing import Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SharedRegistry(Generic[T]):
+    """
+    The instances shared by a process, one per key (e.g. an absolute
+    path), created on first use. All methods are thread-safe.
+    """
+
+    def __init__(self):
+        self._items: Dict[Hashable, T] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, create: Callable[[], T],
+            reuse: Optional[Callable[[T], bool]] = None) -> T:
+        """
+        Return the instance of `key`, calling `create` on first use, or
+        when `reuse` rejects the current one.
+        """
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or (reuse is not None and not reuse(item)):
+                item = create()
+                self._items[key] = item
+            return item
+
+    def values(self) -> List[T]:
+        with self._lock:
+            return list(self._items.values())
+
+    def clear(self, close: Optional[Callable[[T], None]] = None) -> None:
+        """ Forget the instances, closing each with `close` if given. """
+        with self._lock:
+            if close is not None:
+                for item in self._items.values():
+                    close(item)
+            self._items.clear()
@@ -0,0 +1,208 @@
+"""
+Throughput of clean_markdown against the chain of re.sub calls it replaced.
+
+The corpus is the markdown extracted from the HTML of stored articles, or
+synthetic markdown when no database is given. Every document is also
+cleaned by the legacy implementation and the outputs are compared.
+
+Usage:
+    python -m tests.benchmarks.bench_clean_markdown --config hex/config.yaml \
+        --limit 500 --output clean_markdown_bench.json
+"""
+import argparse
+import json
+import platform
+import random
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from hex.ingestion.parser import clean_markdown
+
+
+WORDS = ["ai", "model", "agents", "data", "robotics", "vision", "language",
+         "training", "inference", "chips", "policy", "research"]
+
+
+def legacy_clean_markdown(text):
+    """ clean_markdown before the patterns were compiled and merged. """
+
+    # Remove urls
+    text = re.sub(r'(https?:\/\/|www\.)([\w\.\/-]+)', r'', text)
+
+    # Remove images but preserve alt text if present
+    text = re.sub(r'!\[([^\]]*?)\]\(.*?\)', r'\1', text, flags=re.DOTALL)
+
+    # Remove remaining links but keep the link text
+    text = re.sub(r'\[([^\]]*?)\]\(.*?\)', r'\1', text, flags=re.DOTALL)
+
+    # Fix dashes separated by line breaks (e.g., "-\nword" → "-word")
+    text = re.sub(r'(-)\n(\w)', r'\1\2', text)
+
+    # Merge broken lines that are not paragraph breaks
+    text = re.sub(r'(\S)\n(?=\S)', r'\1 ', text)
+
+    # Fix markdown bullet lists
+    text = re.sub(r'\s*\*\s*', r'\n* ', text)
+
+    # Fix markdown numbered lists
+    text = re.sub(r' +(\d+\.) +', r'\n\1 ', text)
+
+    # Remove HTML tags
+    text = re.sub(r'<[^>]+>', '', text)
+
+    # Remove Non-breaking space
+    text = re.sub(r'&nbsp;', '', text)
+
+    # Remove lines full of [ \*#\n]
+    text = re.sub(r'\n[ \*#\n]*', r'\n', text, flags=re.DOTALL)
+
+    # Normalize whitespace and line breaks
+    text = re.sub(r'\n{2,}', '\n', text)         # Collapse multiple newlines
+    text = re.sub(r'[ \t]+', ' ', text)          # Collapse multiple spaces/tabs
+
+    return text.strip()
+
+
+def make_markdown(rng: random.Random, paragraphs: int = 20) -> str:
+    """ Markdown shaped like the output of MainContentExtractor. """
+    def words(count):
+        return " ".join(rng.choices(WORDS, k=count))
+
+    def wrap(text, width=78):
+        lines, line = [], ""
+        for word in text.split(" "):
+            if line and len(line) + len(word) >= width:
+                lines.append(line)
+                line = word
+            else:
+                line = f"{line} {word}" if line else word
+        return "\n".join(lines + [line])
+
+    blocks = []
+    for i in range(paragraphs):
+        kind = rng.random()
+        if kind < 0.1:
+            blocks.append("\n".join(
+                f"  * {words(3)} _{rng.choice(WORDS)}_" for _ in range(5)
+            ))
+        elif kind < 0.15:
+            blocks.append(
+                f"![{rng.choice(WORDS)}](https://cdn.site.com/i/{i}.png)"
+            )
+        elif kind < 0.2:
+            blocks.append(f"## {words(2)}")
+        else:
+            parts = []
+            for _ in range(rng.randint(20, 60)):
+                token = rng.random()
+                if token < 0.05:
+                    parts.append(f"[{words(2)}](https://site{i}.com/a/{i})")
+                elif token < 0.06:
+                    parts.append(f"<b>{rng.choice(WORDS)}</b>&nbsp;")
+                elif token < 0.07:
+                    parts.append(f"{rng.randint(1, 99)}.")
+                elif token < 0.08:
+                    parts.append(f"www.site{i}.com\tself-")
+                else:
+                    parts.append(rng.choice(WORDS))
+            blocks.append(wrap(" ".join(parts)))
+    return "\n\n".join(blocks)
+
+
+def synthetic_corpus(size: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [make_markdown(rng) for _ in range(size)]
+
+
+def stored_corpus(config: Dict[str, Any], table: str = "articles",
+                  limit: Optional[int] = None) -> List[str]:
+    """ Markdown extracted from the HTML of the articles stored in `table`. """
+    from main_content_extractor import MainContentExtractor
+    from hex.storage.hex_storage import load_storage
+
+    storage = load_storage(config)
+    corpus = []
+    for record in storage.iter(table):
+        html = storage.lazy_load(record)[0].get("html_content")
+        if not html:
+            continue
+        corpus.append(MainContentExtractor.extract(html, output_format="markdown"))
+        if limit and len(corpus) >= limit:
+            break
+    return corpus
+
+
+def mismatches(corpus: List[str]) -> List[int]:
+    """ Indexes of the documents cleaned differently by the two versions. """
+    return [
+        i for i, text in enumerate(corpus)
+        if clean_markdown(text) != legacy_clean_markdown(text)
+    ]
+
+
+def throughput(clean, corpus: List[str], repeat: int) -> float:
+    """ Best MB/s of `clean` over the corpus in `repeat` runs. """
+    megabytes = sum(len(text.encode("utf-8")) for text in corpus) / 1e6
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            clean(text)
+        best = min(best, time.perf_counter() - start)
+    return megabytes / best if best else 0.0
+
+
+def run_benchmark(corpus: List[str], repeat: int = 5) -> Dict[str, Any]:
+    legacy = throughput(legacy_clean_markdown, corpus, repeat)
+    current = throughput(clean_markdown, corpus, repeat)
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "documents": len(corpus),
+        "megabytes": sum(len(text.encode("utf-8")) for text in corpus) / 1e6,
+        "legacy_mb_per_s": legacy,
+        "clean_markdown_mb_per_s": current,
+        "speedup": current / legacy if legacy else 0.0,
+        "mismatches": mismatches(corpus),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark clean_markdown.")
+    parser.add_argument("--config", help="config.yaml of the database to read "
+                        "articles from (synthetic markdown when omitted)")
+    parser.add_argument("--table", default="articles")
+    parser.add_argument("--limit", type=int, default=500,
+                        help="Maximum number of stored articles")
+    parser.add_argument("--synthetic", type=int, default=200,
+                        help="Number of synthetic documents without --config")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="clean_markdown_bench.json",
+                        help="Where to write the JSON results")
+    args = parser.parse_args(argv)
+    if args.config:
+        from hex.utils.config import load_config
+        corpus = stored_corpus(load_config(args.config), args.table, args.limit)
+    else:
+        corpus = synthetic_corpus(args.synthetic, args.seed)
+    report = run_benchmark(corpus, args.repeat)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(
+        f"{report['documents']} documents, {report['megabytes']:.1f} MB: "
+        f"legacy {report['legacy_mb_per_s']:.1f} MB/s, "
+        f"clean_markdown {report['clean_markdown_mb_per_s']:.1f} MB/s "
+        f"(x{report['speedup']:.1f}), {len(report['mismatches'])} mismatches"
+    )
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Ingestion throughput replayed from the HTTP cache.
+
+Runs the RSS scrapers on recorded feeds and pages with the cache in replay
+mode, into a fresh database, so the run is deterministic and measures the
+crawl and extraction pipeline without the network. Each run happens in its
+own process (Scrapy's reactor cannot be restarted).
+
+Record a run first with `http_cache_mode: record` in config.yaml, then:
+
+Usage:
+    python -m tests.benchmarks.bench_ingestion --cache-dir ./data/http_cache \
+        --feeds ./data/rss_feeds.txt --stealth-feeds ./data/rss_feeds_stealth.txt \
+        --runs 3 --output ingestion_bench.json
+"""
+import argparse
+import json
+import platform
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from tests.benchmarks.bench_storage import git_commit, peak_rss_mb
+
+
+def read_feeds(path: Optional[str]) -> List[str]:
+    if not path:
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def run_replay(cache_dir: str, feeds: List[str], stealth_feeds: List[str],
+               articles_limit: Optional[int] = None,
+               extraction_workers: Optional[int] = None) -> Dict[str, Any]:
+    """ Replay one ingestion into a temporary database. """
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.settings import Settings
+
+    from hex.ingestion.extraction_pool import ExtractionPool
+    from hex.ingestion.feed_poller import get_feed_poller
+    from hex.ingestion.http_cache import get_response_cache, http_cache_settings
+    from hex.ingestion.rss_article import RSSArticleScraper, StealthRSSArticleScraper
+    from hex.storage.hex_storage import load_storage
+
+    stored = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = {
+            "db_path": str(Path(tmp_dir) / "hex_tinydb.json"),
+            "http_cache_mode": "replay",
+            "http_cache_dir": cache_dir,
+        }
+        storage = load_storage(config)
+        cache = get_response_cache(config)
+        get_feed_poller(storage, parse=cache.parse_feed)
+        extraction_pool = ExtractionPool(extraction_workers)
+
+        class ReplayRSSArticleScraper(RSSArticleScraper):
+            def __init__(self, *args, **kwargs):
+                super().__init__(
+                    feeds, storage, articles_limit=articles_limit,
+                    extraction_pool=extraction_pool, *args, **kwargs
+                )
+
+            def closed(self, reason):
+                stored["rss"] = self.stored_count
+
+        class ReplayStealthRSSArticleScraper(StealthRSSArticleScraper):
+            def __init__(self, *args, **kwargs):
+                super().__init__(
+                    stealth_feeds, storage, articles_limit=articles_limit,
+                    extraction_pool=extraction_pool, response_cache=cache,
+                    *args, **kwargs
+                )
+
+            def closed(self, reason):
+                stored["stealth"] = self.stored_count
+
+        settings = Settings()
+        settings.setdict({"LOG_LEVEL": "WARNING", **http_cache_settings(config)})
+        process = CrawlerProcess(settings)
+        start = time.perf_counter()
+        try:
+            if feeds:
+                process.crawl(ReplayRSSArticleScraper)
+            if stealth_feeds:
+                process.crawl(ReplayStealthRSSArticleScraper)
+            process.start()
+        finally:
+            extraction_pool.shutdown()
+        elapsed = time.perf_counter() - start
+        failed = sum(
+            1 for article in storage.get_all("articles")
+            if (article.get("metadata") or {}).get("error")
+        )
+
+    articles = sum(stored.values())
+    cache_stats = cache.stats()
+    return {
+        "elapsed_s": elapsed,
+        "articles": articles,
+        "failed_articles": failed,
+        "articles_per_s": articles / elapsed if elapsed else 0.0,
+        "mb_per_s": cache_stats["bytes_served"] / 1e6 / elapsed if elapsed else 0.0,
+        "extraction": extraction_pool.stats(),
+        "http_cache": cache_stats,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_benchmark(cache_dir: str, feeds: List[str], stealth_feeds: List[str],
+                  runs: int = 3, articles_limit: Optional[int] = None,
+                  extraction_workers: Optional[int] = None) -> Dict[str, Any]:
+    """ Replay `runs` times, each in a fresh process, and return the report. """
+    results = []
+    for _ in range(runs):
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=get_context("spawn")
+        ) as executor:
+            results.append(executor.submit(
+                run_replay, cache_dir, feeds, stealth_feeds,
+                articles_limit, extraction_workers
+            ).result())
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "feeds": len(feeds),
+            "stealth_feeds": len(stealth_feeds),
+            "articles_limit": articles_limit,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark a replayed ingestion.")
+    parser.add_argument("--cache-dir", required=True,
+                        help="http_cache_dir of a recorded ingestion")
+    parser.add_argument("--feeds", help="File of RSS feed URLs (one per line)")
+    parser.add_argument("--stealth-feeds", help="File of stealth RSS feed URLs")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--articles-limit", type=int)
+    parser.add_argument("--extraction-workers", type=int)
+    parser.add_argument("--output", default="ingestion_bench.json",
+                        help="Where to write the JSON results")
+    args = parser.parse_args(argv)
+    report = run_benchmark(
+        args.cache_dir, read_feeds(args.feeds), read_feeds(args.stealth_feeds),
+        runs=args.runs, articles_limit=args.articles_limit,
+        extraction_workers=args.extraction_workers
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    for result in report["results"]:
+        print(
+            f"{result['articles']:>6} articles in {result['elapsed_s']:.2f}s: "
+            f"{result['articles_per_s']:.1f} articles/s, "
+            f"{result['mb_per_s']:.1f} MB/s, "
+            f"{result['http_cache']['misses']} cache misses"
+        )
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Storage micro-benchmarks for HexStorage and ArtifactManager.
+
+Generates synthetic articles/tags/tag_clusters tables and times the main
+storage operations for every backend and artifact mode. Each case runs in
+its own process so peak RSS is measured per case.
+
+Usage:
+    python -m tests.benchmarks.bench_storage --sizes 1000 10000 100000 \
+        --output storage_bench.json
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from tinydb import Query
+
+from hex.storage.hex_storage import STORAGE_BACKENDS, load_storage
+from hex.storage.artifact_manager import ARTIFACT_MODES
+
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DOMAINS = [f"site{i}.com" for i in range(50)]
+WORDS = ["ai", "model", "agents", "data", "robotics", "vision", "language",
+         "training", "inference", "chips", "policy", "research"]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the current process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def make_article(i: int, rng: random.Random, large_every: int) -> Dict[str, Any]:
+    published = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i)
+    article = {
+        "title": f"Article {i} about " + " ".join(rng.sample(WORDS, 3)),
+        "url": f"https://{DOMAINS[i % len(DOMAINS)]}/articles/{i}",
+        "url_domain": DOMAINS[i % len(DOMAINS)],
+        "published_date": published.isoformat(),
+        "summary": " ".join(rng.choices(WORDS, k=60)),
+        "tags": rng.sample(WORDS, 4),
+        "metadata": {"error": None},
+    }
+    if large_every and i % large_every == 0:
+        # Above ArtifactManager.max_inline_bytes, so offloaded to artifacts
+        article["html_content"] = f"<html><!-- {i} -->" + \
+            "<p>" + " ".join(rng.choices(WORDS, k=2500)) + "</p></html>"
+    return article
+
+
+def make_tag(i: int) -> Dict[str, Any]:
+    return {"name": f"tag {i}", "tag_cluster_id": str(i // 10 + 1)}
+
+
+def make_cluster(i: int) -> Dict[str, Any]:
+    return {"name": f"cluster {i}", "synonyms": [f"tag {i * 10 + j}" for j in range(10)]}
+
+
+def time_operation(operation: str, calls: List[Callable[[], Any]],
+                   items_per_call: int = 1) -> Dict[str, Any]:
+    """Run calls one by one, returning throughput and latency percentiles."""
+    latencies = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    total = sum(latencies)
+    items = len(calls) * items_per_call
+    return {
+        "operation": operation,
+        "calls": len(calls),
+        "items": items,
+        "total_s": total,
+        "throughput_per_s": items / total if total else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def populate(storage, size: int, rng: random.Random, large_every: int,
+             batch_size: int) -> List[Dict[str, Any]]:
+    """Fill articles/tags/tag_clusters, timing the batched saves."""
+    def batches(factory, count):
+        return [
+            [factory(i) for i in range(start, min(start + batch_size, count))]
+            for start in range(0, count, batch_size)
+        ]
+
+    results = []
+    for table_name, factory, count in [
+        ("articles", lambda i: make_article(i, rng, large_every), size),
+        ("tags", make_tag, size),
+        ("tag_clusters", make_cluster, max(1, size // 10)),
+    ]:
+        calls = [
+            (lambda batch=batch: storage.save_many(table_name, batch))
+            for batch in batches(factory, count)
+        ]
+        result = time_operation(f"save_many[{table_name}]", calls)
+        result["items"] = count
+        result["throughput_per_s"] = count / result["total_s"] if result["total_s"] else 0.0
+        results.append(result)
+    return results
+
+
+def run_case(backend: str, artifact_mode: str, size: int, ops: int,
+             large_every: int, batch_size: int, seed: int) -> Dict[str, Any]:
+    """Benchmark one (backend, artifact mode, size) case in a fresh directory."""
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = {
+            "storage_backend": backend,
+            "db_path": str(Path(tmp_dir) / "hex_tinydb.json"),
+            "sqlite_db_path": str(Path(tmp_dir) / "hex.sqlite3"),
+            "artifact_mode": artifact_mode,
+        }
+        storage = load_storage(config)
+        results = populate(storage, size, rng, large_every, batch_size)
+
+        Article, Tag = Query(), Query()
+        doc_ids = [rng.randint(1, size) for _ in range(ops)]
+        results.append(time_operation("save", [
+            (lambda i=i: storage.save("articles", make_article(size + i, rng, large_every)))
+            for i in range(ops)
+        ]))
+        results.append(time_operation("update", [
+            (lambda doc_id=doc_id: storage.update(
+                "articles", {"doc_id": str(doc_id), "title": f"Updated {doc_id}"}
+            ))
+            for doc_id in doc_ids
+        ]))
+        results.append(time_operation("search[tags.name indexed]", [
+            (lambda doc_id=doc_id: storage.search("tags", Tag.name == f"tag {doc_id}"))
+            for doc_id in doc_ids
+        ]))
+        results.append(time_operation("search[articles.url_domain]", [
+            (lambda doc_id=doc_id: storage.search(
+                "articles", Article.url_domain == DOMAINS[doc_id % len(DOMAINS)]
+            ))
+            for doc_id in doc_ids[:max(1, ops // 10)]
+        ]))
+        results.append(time_operation("get_all[articles]", [
+            (lambda: storage.get_all("articles")) for _ in range(3)
+        ], items_per_call=size))
+
+        sample = [
+            article for article in storage.get_all("articles")
+            if "html_content_artifact" in article
+        ][:ops] or storage.get_all("articles")[:ops]
+        lazy = storage.lazy_load(sample)
+        results.append(time_operation("lazy_load", [
+            (lambda record=record: storage.lazy_load(record)) for record in sample
+        ]))
+        results.append(time_operation("resolve_lazy_record", [
+            (lambda record=record: storage.artifacts.resolve_lazy_record(record))
+            for record in lazy
+        ]))
+
+    peak = peak_rss_mb()
+    for result in results:
+        result.update({
+            "backend": backend,
+            "artifact_mode": artifact_mode,
+            "size": size,
+            "peak_rss_mb": peak,
+        })
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmarks(sizes: List[int], backends: List[str], artifact_modes: List[str],
+                   ops: int = 200, large_every: int = 10, batch_size: int = 1000,
+                   seed: int = 0, isolate: bool = True) -> Dict[str, Any]:
+    """Run every case and return the JSON report."""
+    results = []
+    for size in sizes:
+        for backend in backends:
+            for artifact_mode in artifact_modes:
+                args = (backend, artifact_mode, size, ops, large_every, batch_size, seed)
+                if isolate:
+                    with ProcessPoolExecutor(
+                        max_workers=1, mp_context=get_context("spawn")
+                    ) as executor:
+                        results.extend(executor.submit(run_case, *args).result())
+                else:
+                    results.extend(run_case(*args))
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "ops": ops,
+            "large_every": large_every,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Hex storage backends.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Table sizes to generate")
+    parser.add_argument("--backends", nargs="+", default=list(STORAGE_BACKENDS),
+                        choices=list(STORAGE_BACKENDS))
+    parser.add_argument("--artifact-modes", nargs="+", default=list(ARTIFACT_MODES),
+                        choices=list(ARTIFACT_MODES))
+    parser.add_argument("--ops", type=int, default=200,
+                        help="Timed calls per single-record operation")
+    parser.add_argument("--large-every", type=int, default=10,
+                        help="One article in N gets a field offloaded to artifacts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="storage_bench.json",
+                        help="Where to write the JSON results")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        args.sizes, args.backends, args.artifact_modes,
+        ops=args.ops, large_every=args.large_every, seed=args.seed
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for result in report["results"]:
+        print(
+            f"{result['backend']:>7} {result['artifact_mode']:>5} {result['size']:>7} "
+            f"{result['operation']:<30} {result['throughput_per_s']:>12.1f}/s "
+            f"p50={result['p50_ms']:.2f}ms p99={result['p99_ms']:.2f}ms "
+            f"rss={result['peak_rss_mb']:.0f}MB"
+        )
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
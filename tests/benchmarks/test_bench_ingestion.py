@@ -0,0 +1,45 @@
+import json
+
+from hex.ingestion.http_cache import VIA_FEED, ResponseCache
+from tests.benchmarks.bench_ingestion import main
+
+
+FEED_URL = "https://site.com/rss"
+ARTICLE = (
+    "<html><body><article><h1>Title</h1>"
+    + "<p>A long enough paragraph about machine learning research.</p>" * 20
+    + "</article></body></html>"
+)
+
+
+def record(cache_dir, count):
+    cache = ResponseCache(str(cache_dir), "record")
+    items = "".join(
+        f"<item><guid>{i}</guid><title>Post {i}</title>"
+        f"<link>https://site.com/post-{i}</link>"
+        f"<description>Summary {i}</description></item>"
+        for i in range(count)
+    )
+    feed = f"<rss version='2.0'><channel><title>Site</title>{items}</channel></rss>"
+    cache.store(FEED_URL, 200, {"Content-Type": ["application/rss+xml"]},
+                feed.encode(), via=VIA_FEED)
+    for i in range(count):
+        cache.store(f"https://site.com/post-{i}", 200,
+                    {"Content-Type": ["text/html; charset=utf-8"]},
+                    ARTICLE.replace("Title", f"Title {i}").encode())
+
+
+def test_replays_a_recorded_ingestion(tmp_path):
+    record(tmp_path / "http_cache", 3)
+    feeds = tmp_path / "feeds.txt"
+    feeds.write_text(FEED_URL + "\n")
+    output = tmp_path / "bench.json"
+    main(["--cache-dir", str(tmp_path / "http_cache"), "--feeds", str(feeds),
+          "--runs", "1", "--extraction-workers", "1", "--output", str(output)])
+
+    result, = json.loads(output.read_text())["results"]
+    assert result["articles"] == 3
+    assert result["failed_articles"] == 0
+    assert result["http_cache"]["hits"] == 4  # the feed and its 3 pages
+    assert result["http_cache"]["misses"] == 0
+    assert result["articles_per_s"] > 0
@@ -0,0 +1,35 @@
+import json
+
+from tests.benchmarks.bench_storage import main, percentile, run_benchmarks
+
+
+def test_percentile():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+
+def test_run_benchmarks_covers_every_case():
+    report = run_benchmarks(
+        [30], ["tinydb", "sqlite"], ["files", "cas"], ops=5, large_every=3,
+        batch_size=10, isolate=False
+    )
+    cases = {(r["backend"], r["artifact_mode"]) for r in report["results"]}
+    assert cases == {("tinydb", "files"), ("tinydb", "cas"),
+                     ("sqlite", "files"), ("sqlite", "cas")}
+    operations = {r["operation"] for r in report["results"]}
+    assert {"save", "update", "get_all[articles]", "lazy_load",
+            "resolve_lazy_record"} <= operations
+    for result in report["results"]:
+        assert result["p50_ms"] <= result["p99_ms"]
+        assert result["peak_rss_mb"] > 0
+
+
+def test_main_writes_json(tmp_path):
+    output = tmp_path / "bench.json"
+    main(["--sizes", "20", "--backends", "sqlite", "--artifact-modes", "cas",
+          "--ops", "3", "--output", str(output)])
+    report = json.loads(output.read_text())
+    assert report["meta"]["sizes"] == [20]
+    assert all(r["size"] == 20 for r in report["results"])
@@ -0,0 +1,12 @@
+import pytest
+
+from hex.storage.hex_storage import HexStorage, SQLiteHexStorage
+
+
+@pytest.fixture(params=["tinydb", "sqlite"])
+def storage(request, tmp_path):
+    """ An empty HexStorage of each backend. """
+    if request.param == "tinydb":
+        yield HexStorage(str(tmp_path / "hex_tinydb.json"))
+    else:
+        yield SQLiteHexStorage(str(tmp_path / "hex.sqlite3"))
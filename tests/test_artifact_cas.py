@@ -0,0 +1,119 @@
+import gzip
+import pytest
+
+from hex.storage.artifact_manager import ArtifactManager, zstandard
+from hex.storage.hex_storage import HexStorage, SQLiteHexStorage
+from hex.utils.hash import sha256_key
+
+
+BIG_HTML = "<p>" + "hex machina " * 2000 + "</p>"
+
+
+@pytest.fixture(params=["tinydb", "sqlite"])
+def storage(request, tmp_path):
+    if request.param == "tinydb":
+        yield HexStorage(str(tmp_path / "hex_tinydb.json"), artifact_mode="cas")
+    else:
+        yield SQLiteHexStorage(str(tmp_path / "hex.sqlite3"), artifact_mode="cas")
+
+
+def blob_files(storage):
+    return sorted(p for p in storage.artifacts.blob_dir.glob("*/*"))
+
+
+def ref_count(storage, key):
+    refs = {ref["sha256"]: ref["count"] for ref in storage.get_all("artifact_refs")}
+    return refs.get(key, 0)
+
+
+def test_identical_payloads_are_stored_once(storage):
+    storage.save("articles", {"title": "a", "html_content": BIG_HTML})
+    storage.save("replicated_articles", {"title": "b", "html_content": BIG_HTML})
+
+    files = blob_files(storage)
+    assert len(files) == 1
+    assert files[0].name == sha256_key(BIG_HTML) + ".gz"
+    assert gzip.decompress(files[0].read_bytes()).decode("utf-8") == BIG_HTML
+    assert ref_count(storage, sha256_key(BIG_HTML)) == 2
+
+
+def test_lazy_load_reads_blobs(storage):
+    payload = {"items": ["x" * 100] * 200}
+    storage.save("articles", {"html_content": BIG_HTML, "metadata": payload})
+    record = storage.lazy_load(storage.get_all("articles"))[0]
+    assert record["html_content"] == BIG_HTML
+    assert record["metadata"] == payload
+    assert "html_content" not in storage.get_all("articles")[0]
+
+
+def test_update_moves_references(storage):
+    doc_id = storage.save("articles", {"html_content": BIG_HTML})[0]
+    new_html = BIG_HTML + "<p>edited</p>"
+    storage.update("articles", {"doc_id": doc_id, "html_content": new_html})
+
+    assert ref_count(storage, sha256_key(BIG_HTML)) == 0
+    assert ref_count(storage, sha256_key(new_html)) == 1
+
+    assert storage.collect_artifacts() == 1
+    assert [p.name for p in blob_files(storage)] == [sha256_key(new_html) + ".gz"]
+    assert storage.get_all("artifact_refs")[0]["sha256"] == sha256_key(new_html)
+
+
+def test_repeated_doc_id_in_one_update_counts_the_last_version(storage):
+    doc_id = storage.save("articles", {"html_content": BIG_HTML})[0]
+    edits = [BIG_HTML + f"<p>edit {i}</p>" for i in range(2)]
+    storage.update("articles", [
+        {"doc_id": doc_id, "html_content": html} for html in edits
+    ])
+
+    assert ref_count(storage, sha256_key(BIG_HTML)) == 0
+    assert ref_count(storage, sha256_key(edits[0])) == 0
+    assert ref_count(storage, sha256_key(edits[1])) == 1
+    assert storage.collect_artifacts() == 2
+    assert [p.name for p in blob_files(storage)] == [sha256_key(edits[1]) + ".gz"]
+
+
+def test_remove_releases_references(storage):
+    first = storage.save("articles", {"html_content": BIG_HTML})[0]
+    storage.save("articles", {"html_content": BIG_HTML})
+    storage.remove("articles", [int(first)])
+    assert storage.collect_artifacts() == 0
+    assert ref_count(storage, sha256_key(BIG_HTML)) == 1
+
+
+def test_drop_table_releases_references(storage):
+    storage.save("articles", {"html_content": BIG_HTML})
+    storage.save("replicated_articles", [{"html_content": BIG_HTML},
+                                         {"html_content": BIG_HTML + "<p/>"}])
+    storage.drop_table("replicated_articles")
+
+    assert storage.count_records("replicated_articles") == 0
+    assert ref_count(storage, sha256_key(BIG_HTML)) == 1
+    assert storage.collect_artifacts() == 1
+    assert [p.name for p in blob_files(storage)] == [sha256_key(BIG_HTML) + ".gz"]
+
+
+def test_collect_sweeps_orphan_blobs(storage):
+    key = storage.artifacts.write_blob(BIG_HTML)
+    assert storage.collect_artifacts() == 1
+    assert not storage.artifacts.delete_blob(key)
+
+
+def test_files_mode_is_default(tmp_path):
+    storage = HexStorage(str(tmp_path / "hex_tinydb.json"))
+    storage.save("articles", {"html_content": BIG_HTML})
+    info = storage.get_all("articles")[0]["html_content_artifact"]
+    assert "path" in info
+    assert storage.get_all("artifact_refs") == []
+
+
+def test_unknown_mode_raises(tmp_path):
+    with pytest.raises(ValueError):
+        ArtifactManager(str(tmp_path), mode="s3")
+
+
+@pytest.mark.skipif(zstandard is None, reason="zstandard not installed")
+def test_zstd_round_trip(tmp_path):
+    manager = ArtifactManager(str(tmp_path), mode="cas", compression="zstd")
+    key = manager.write_blob(BIG_HTML)
+    assert manager.read_blob(key, "zstd") == BIG_HTML
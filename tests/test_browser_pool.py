@@ -0,0 +1,133 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from feedparser import FeedParserDict
+
+from hex.ingestion.browser_pool import StealthBrowserPool
+from hex.ingestion.rss_article import StealthRSSArticleScraper
+from hex.ingestion.seen_index import clear_seen_indexes
+from hex.storage.hex_storage import HexStorage
+
+
+PAGE = (
+    "<html><body><article><h1>{url}</h1>"
+    + "<p>A long enough paragraph about machine learning research.</p>" * 5
+    + "</article></body></html>"
+)
+
+
+class FakeBrowser:
+    """ Records the fetches made by each browser instance. """
+
+    instances = []
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+    fetch_log = []
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.fetched = []
+        self.closed = False
+        with FakeBrowser.lock:
+            FakeBrowser.instances.append(self)
+
+    def fetch(self, url):
+        with FakeBrowser.lock:
+            FakeBrowser.active += 1
+            FakeBrowser.max_active = max(FakeBrowser.max_active, FakeBrowser.active)
+            FakeBrowser.fetch_log.append((url, time.monotonic()))
+        time.sleep(self.delay)
+        with FakeBrowser.lock:
+            FakeBrowser.active -= 1
+        self.fetched.append(url)
+        if "broken" in url:
+            raise RuntimeError(f"Page.goto: net::ERR_CONNECTION_RESET at {url}")
+        return PAGE.format(url=url)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def reset_fake_browser():
+    FakeBrowser.instances = []
+    FakeBrowser.active = 0
+    FakeBrowser.max_active = 0
+    FakeBrowser.fetch_log = []
+    clear_seen_indexes()
+    yield
+    clear_seen_indexes()
+
+
+def test_pool_reuses_warm_browsers_and_fetches_concurrently():
+    urls = [f"https://site{i}.com/article" for i in range(8)]
+    with StealthBrowserPool(4, domain_delay=0, browser_factory=FakeBrowser) as pool:
+        futures = [pool.submit(url) for url in urls]
+        pages = [future.result() for future in futures]
+
+    assert pages == [PAGE.format(url=url) for url in urls]
+    assert len(FakeBrowser.instances) <= 4
+    assert sum(len(b.fetched) for b in FakeBrowser.instances) == len(urls)
+    assert all(b.closed for b in FakeBrowser.instances)
+    assert FakeBrowser.max_active > 1
+
+
+def test_pool_is_polite_per_domain():
+    urls = [f"https://example.com/article-{i}" for i in range(3)]
+    with StealthBrowserPool(3, domain_delay=0.1,
+                            browser_factory=lambda: FakeBrowser(0.01)) as pool:
+        for future in [pool.submit(url) for url in urls]:
+            future.result()
+
+    assert FakeBrowser.max_active == 1
+    times = [fetched_at for _, fetched_at in FakeBrowser.fetch_log]
+    # Each fetch starts at least domain_delay after the previous one ended
+    assert all(b - a >= 0.1 for a, b in zip(times, times[1:]))
+
+
+def test_pool_reports_errors_and_stats():
+    pool = StealthBrowserPool(2, domain_delay=0, browser_factory=FakeBrowser)
+    ok = pool.submit("https://a.com/fine")
+    broken = pool.submit("https://b.com/broken")
+    assert ok.result().startswith("<html>")
+    with pytest.raises(RuntimeError):
+        broken.result()
+    pool.close()
+
+    stats = pool.stats()
+    assert stats["size"] == 2
+    assert stats["fetches"] == 2
+    assert stats["errors"] == 1
+    assert 0 < stats["utilization"] <= 1
+    assert stats["p95_latency"] >= stats["p50_latency"] > 0
+    with pytest.raises(RuntimeError):
+        pool.submit("https://a.com/late")
+
+
+def test_stealth_scraper_fetches_through_the_pool(tmp_path):
+    storage = HexStorage(str(tmp_path / "hex_tinydb.json"))
+    entries = [
+        {"title": f"Article {i}", "link": f"https://site{i % 2}.com/a{i}",
+         "summary": "Summary"}
+        for i in range(4)
+    ]
+    pool = StealthBrowserPool(2, domain_delay=0, browser_factory=FakeBrowser)
+    scraper = StealthRSSArticleScraper(
+        ["https://feed.example.com/rss"], storage, articles_limit=3,
+        browser_pool=pool
+    )
+    with patch("hex.ingestion.feed_poller.feedparser.parse",
+               return_value=FeedParserDict(entries=entries)):
+        list(scraper.start_requests())
+    pool.close()
+
+    articles = storage.get_all("articles")
+    assert [article["title"] for article in articles] == [
+        "Article 0", "Article 1", "Article 2"
+    ]
+    assert all(article["metadata"]["error"] is None for article in articles)
+    assert scraper.stored_count == 3
+    assert scraper.browser_pool_stats["fetches"] == 3
@@ -0,0 +1,53 @@
+import json
+import os
+import random
+
+import pytest
+
+from hex.ingestion.parser import clean_markdown
+from tests.benchmarks.bench_clean_markdown import (
+    legacy_clean_markdown, main, mismatches, stored_corpus, synthetic_corpus
+)
+
+
+# Fragments that trigger every substitution and their interactions
+FRAGMENTS = list("ab1-_ \t\n\r*#<>[]()!.:/é  \x85") + [
+    "http://", "https://x.com/a", "www.", "&nbsp;", "](", "![", " 12. ", "\n\n",
+    "  ", "-\n", "*\n", "<b>", "[a](b)", "![c](d)", "\n  * ",
+]
+
+
+def test_matches_legacy_on_random_fragments():
+    rng = random.Random(0)
+    for _ in range(20000):
+        text = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 30)))
+        assert clean_markdown(text) == legacy_clean_markdown(text), repr(text)
+
+
+def test_matches_legacy_on_synthetic_articles():
+    assert mismatches(synthetic_corpus(50)) == []
+
+
+def test_cleans_markdown():
+    text = ("![logo](https://a.com/l.png) Read [the post](https://a.com/p)"
+            " on www.a.com.\nwell-\nknown  items:\n\n  * one\n  * two\n\n##\n"
+            " 1. first &nbsp;<i>x</i>")
+    assert clean_markdown(text) == \
+        "logo Read the post on \nwell-known items:\none\ntwo\n1. first x"
+
+
+@pytest.mark.skipif(not os.environ.get("HEX_CONFIG"),
+                    reason="HEX_CONFIG points to the config of stored articles")
+def test_matches_legacy_on_stored_articles():
+    from hex.utils.config import load_config
+    corpus = stored_corpus(load_config(os.environ["HEX_CONFIG"]), limit=1000)
+    assert mismatches(corpus) == []
+
+
+def test_benchmark_writes_json(tmp_path):
+    output = tmp_path / "bench.json"
+    main(["--synthetic", "5", "--repeat", "1", "--output", str(output)])
+    report = json.loads(output.read_text())
+    assert report["documents"] == 5
+    assert report["clean_markdown_mb_per_s"] > 0
+    assert report["mismatches"] == []
@@ -0,0 +1,61 @@
+import numpy as np
+from tinydb.table import Document
+
+from hex.flows.article_enrichment.steps.update_clusters import ClusterIndex
+
+VECTORS = {
+    "robotics": [1.0, 0.0, 0.0],
+    "robots": [0.9, 0.1, 0.0],
+    "humanoid robots": [0.72, 0.70, 0.0],
+    "humanoids": [0.0, 1.0, 0.0],
+    "speech": [0.0, 0.0, 2.0],
+    "": [0.0, 0.0, 0.0],
+}
+
+
+class FakeEmbeddingModel:
+    def __init__(self):
+        self.calls = []
+
+    def predict_many(self, texts):
+        self.calls.append(list(texts))
+        return [{"output": VECTORS[text], "metadata": {}} for text in texts]
+
+
+def clusters(*synonyms):
+    return [
+        Document({"name": names[0], "tag_synonyms": dict(enumerate(names))}, doc_id=i + 1)
+        for i, names in enumerate(synonyms)
+    ]
+
+
+def test_nearest_cluster_above_threshold():
+    model = FakeEmbeddingModel()
+    index = ClusterIndex(clusters(["humanoids"], ["robotics"]), model)
+    index.build(["robots", "speech"])
+    # Existing synonyms and new tags are embedded in one call
+    assert model.calls == [["humanoids", "robotics", "robots", "speech"]]
+
+    assert index.nearest("robots") == "2"
+    # Similar to both clusters: the most similar one wins, not the first
+    assert index.nearest("humanoid robots ai") == "2"
+    assert index.nearest("speech") is None
+    assert index.nearest("") is None
+
+
+def test_synonyms_are_indexed_incrementally():
+    model = FakeEmbeddingModel()
+    index = ClusterIndex(clusters(["humanoids"]), model)
+    assert index.nearest("robots") is None
+    index.add(2, ["robotics"])
+    assert index.nearest("robots") == "2"
+    index.add("1", ["humanoid robots"] * 100)
+    assert len(index.cluster_ids) == 102
+    assert index._matrix.dtype == np.float32
+    assert index.nearest("humanoid robots") == "1"
+
+
+def test_empty_index_assigns_nothing():
+    index = ClusterIndex([], FakeEmbeddingModel())
+    index.build()
+    assert index.nearest("robots") is None
@@ -0,0 +1,134 @@
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+from hex.flows.predict import _predict_one
+from hex.models.base_spec import PromptTemplateSpec
+from hex.models.configs.open_router_config import OpenRouterConfig
+from hex.models.providers import openai_model
+from hex.models.providers.openai_model import (
+    CompletionCache, OpenAIModel, clear_completion_caches, completion_cache_stats
+)
+from hex.models.rate_limiter import RateLimiter
+from hex.utils.config import PathResolver
+
+
+class TitleInput(BaseModel):
+    title: str
+
+
+class TextOutput(BaseModel):
+    output: str
+
+
+PROMPT = PromptTemplateSpec(
+    name="shout_prompt", version="v1", template="Shout {title}",
+    input_schema=TitleInput, output_schema=TextOutput
+)
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.prompts = []
+
+    def create(self, model, messages, **params):
+        prompt = messages[0]["content"]
+        self.prompts.append(prompt)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=prompt.upper()))],
+            usage=SimpleNamespace(prompt_tokens=3, completion_tokens=2, total_tokens=5),
+        )
+
+
+def make_model(cache_dir, spec_version="v1", **config):
+    model = OpenAIModel(OpenRouterConfig(
+        prompt_spec=PROMPT, api_key="test", completion_cache_dir=str(cache_dir),
+        **config
+    ), "shout_spec", spec_version)
+    model.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    return model
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    clear_completion_caches()
+    yield
+    clear_completion_caches()
+
+
+def test_identical_prompts_are_served_from_disk(tmp_path):
+    model = make_model(tmp_path)
+    first = model.predict({"title": "hello"})
+    assert first["output"] == "SHOUT HELLO"
+    assert "cached" not in first["metadata"]
+
+    # A new run: new model, new process-wide cache, same directory
+    clear_completion_caches()
+    model = make_model(tmp_path)
+    second = model.predict({"title": "hello"})
+    assert second["output"] == "SHOUT HELLO"
+    assert second["metadata"]["cached"] and second["metadata"]["total_tokens"] == 5
+    assert model.client.chat.completions.prompts == []
+    stats = completion_cache_stats("shout_spec")
+    assert (stats["hits"], stats["misses"]) == (1, 0)
+
+
+def test_key_covers_spec_version_and_sampling_params(tmp_path):
+    make_model(tmp_path).predict({"title": "hello"})
+    for model in (make_model(tmp_path, spec_version="v2"),
+                  make_model(tmp_path, temperature=0.7),
+                  make_model(tmp_path, model_name="openai/gpt-4.1")):
+        assert model.cached_prediction({"title": "hello"}) is None
+        model.predict({"title": "hello"})
+        assert model.client.chat.completions.prompts == ["Shout hello"]
+    stats = completion_cache_stats("shout_spec")
+    assert (stats["hits"], stats["misses"], stats["stored"]) == (0, 4, 4)
+
+
+def test_relative_cache_dir_is_under_the_data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(openai_model, "load_path_resolver",
+                        lambda: PathResolver(str(tmp_path)))
+    model = make_model("models/completions")
+    assert model.cache.path == tmp_path / "models" / "completions"
+
+
+def test_predict_path_looks_the_cache_up_once(tmp_path):
+    model = make_model(tmp_path)
+    lookups = []
+    get = model.cache.get
+    model.cache.get = lambda *args: lookups.append(args) or get(*args)
+
+    spec = SimpleNamespace(_loaded_model=model)
+    pred = _predict_one(spec, RateLimiter(), {"title": "hello"})
+    assert pred["output"] == "SHOUT HELLO"
+    assert len(lookups) == 1
+    assert _predict_one(spec, RateLimiter(), {"title": "hello"})["metadata"]["cached"]
+    assert len(lookups) == 2
+    stats = completion_cache_stats("shout_spec")
+    assert (stats["hits"], stats["misses"], stats["stored"]) == (1, 1, 1)
+
+
+def test_non_deterministic_specs_opt_out(tmp_path):
+    model = make_model(tmp_path, cache_completions=False)
+    assert model.cache is None
+    model.predict({"title": "hello"})
+    model.predict({"title": "hello"})
+    assert len(model.client.chat.completions.prompts) == 2
+
+
+def test_least_recently_used_completions_are_evicted(tmp_path):
+    cache = CompletionCache(str(tmp_path), max_bytes=300)
+    response = {"output": "x" * 50, "metadata": {}}
+    for key in ("a", "b", "c"):
+        cache.store(key, "spec", response)
+    cache.get("a", "spec")  # "b" is now the least recently used
+    cache.store("d", "spec", response)
+    cache.store("e", "spec", response)
+
+    assert cache.get("b", "spec") is None
+    assert cache.get("a", "spec") is not None
+    assert cache.stats()["evicted"] >= 1
+    assert cache.stats()["bytes"] <= 300
+    cache.close()
+    assert CompletionCache(str(tmp_path), max_bytes=300).total_bytes <= 300
@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+import pytest
+from scrapy.http import HtmlResponse, Request
+
+from hex.ingestion.extraction_pool import ExtractionPool, extract_fields
+from hex.ingestion.fetch_strategy import clear_fetch_strategies
+from hex.ingestion.rss_article import RSSArticleScraper, extract_article
+from hex.ingestion.sloan_review_scraper import SloanReviewScraper
+from hex.ingestion.seen_index import clear_seen_indexes
+from hex.storage.hex_storage import HexStorage
+
+
+ARTICLE = (
+    "<html><body><article><h1>Title</h1>"
+    + "<p>A long enough paragraph about machine learning research.</p>" * 20
+    + "</article></body></html>"
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_registries():
+    clear_fetch_strategies()
+    clear_seen_indexes()
+    yield
+    clear_fetch_strategies()
+    clear_seen_indexes()
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with ExtractionPool(max_workers=2, max_pending=2) as pool:
+        yield pool
+
+
+def test_pool_matches_inline_extraction(pool):
+    fields = pool.extract(ARTICLE, "**Summary**")
+    expected = extract_fields(ARTICLE, "**Summary**")
+    assert fields["text_content"] == expected["text_content"]
+    assert fields["summary"] == expected["summary"]
+
+
+def test_queue_is_bounded_and_stats_are_counted(pool):
+    futures = [pool.submit(ARTICLE, "Summary") for _ in range(6)]
+    assert all(future.result()["text_content"] for future in futures)
+    stats = pool.stats()
+    assert stats["workers"] == 2
+    assert stats["max_queue_depth"] <= 2
+    assert stats["extractions"] >= 6
+    assert stats["failed"] == 0
+    assert stats["extraction_time"] > 0
+
+
+def test_full_queue_does_not_block_the_event_loop():
+    ticks = []
+
+    async def ticker(done):
+        while not done.is_set():
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.005)
+
+    async def run(pool):
+        done = asyncio.Event()
+        ticking = asyncio.ensure_future(ticker(done))
+        # Cancelled while waiting for a slot: its wake-up is passed on
+        cancelled = asyncio.ensure_future(pool.extract_async(ARTICLE, "Summary"))
+        extractions = [pool.extract_async(ARTICLE, "Summary") for _ in range(4)]
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        results = await asyncio.gather(*extractions)
+        done.set()
+        await ticking
+        return results
+
+    with ExtractionPool(max_workers=1, max_pending=1) as pool:
+        results = asyncio.run(run(pool))
+        stats = pool.stats()
+    assert all(result["text_content"] for result in results)
+    assert stats["max_queue_depth"] == 1
+    assert stats["blocked_time"] > 0
+    # The loop kept running while extractions waited for the single slot
+    assert len(ticks) > 4
+
+
+def test_site_scrapers_extract_in_the_pool(tmp_path, pool):
+    storage = HexStorage(str(tmp_path / "hex_tinydb.json"))
+    scraper = SloanReviewScraper(None, storage, extraction_pool=pool)
+    url = "https://sloanreview.mit.edu/article/post"
+    body = ARTICLE.replace("<article>", '<div class="article-content">') \
+        .replace("</article>", "</div>")
+    response = HtmlResponse(url, body=body, encoding="utf-8")
+    extractions = pool.stats()["extractions"]
+
+    text_content = asyncio.run(scraper.extract_text_content(response))
+    assert text_content == scraper.get_text_content(response)
+    assert "machine learning" in text_content
+    assert pool.stats()["extractions"] == extractions + 1
+
+
+def test_failed_extractions_release_their_slot():
+    with ExtractionPool(max_workers=1, max_pending=1) as pool:
+        with pytest.raises(Exception):
+            pool.extract(None, "Summary")
+        assert pool.extract(ARTICLE, "Summary")["text_content"]
+        assert pool.stats()["failed"] == 1
+
+
+def test_rss_scraper_extracts_in_the_pool(tmp_path, pool):
+    storage = HexStorage(str(tmp_path / "hex_tinydb.json"))
+    scraper = RSSArticleScraper([], storage, extraction_pool=pool)
+    url = "https://static.com/post"
+    rss_data = {"title": "Post", "url": url, "url_domain": "static.com",
+                "summary": "Summary"}
+    meta = {"rss_data": rss_data, "start_time": time.time(),
+            "feed_entry": ("https://static.com/rss", {"link": url})}
+    request = Request(url, meta=meta)
+    response = HtmlResponse(url, body=ARTICLE, encoding="utf-8", request=request)
+
+    async def collect():
+        return [output async for output in scraper.parse(response)]
+
+    assert asyncio.run(collect()) == []
+    stored = storage.get_all("articles")[0]
+    inline = extract_article(None, dict(rss_data, html_content=ARTICLE))
+    assert stored["text_content"] == inline["text_content"]
+    assert stored["summary_text_ratio"] == inline["summary_text_ratio"]
@@ -0,0 +1,225 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from feedparser import FeedParserDict
+from scrapy.http import Response
+from scrapy.spidermiddlewares.httperror import HttpError
+from twisted.internet.error import DNSLookupError
+from twisted.python.failure import Failure
+
+from hex.ingestion.feed_poller import FeedPoller, entry_guid
+from hex.ingestion.rss_article import RSSArticleScraper, iter_new_entries
+from hex.ingestion.seen_index import clear_seen_indexes
+from hex.storage.hex_storage import HexStorage
+
+
+class FakeFeeds:
+    """ Serves feeds like a server honouring conditional requests. """
+
+    def __init__(self, feeds, delay=0.0):
+        self.feeds = feeds
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def __call__(self, url, etag=None, modified=None):
+        with self.lock:
+            self.calls.append((url, etag, modified))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        if url not in self.feeds:
+            return FeedParserDict(bozo=1, bozo_exception="connection refused",
+                                  entries=[])
+        entries, version = self.feeds[url]
+        if etag == version:
+            return FeedParserDict(status=304, entries=[])
+        return FeedParserDict(status=200, etag=version, entries=entries)
+
+
+def _entries(*ids):
+    return [{"id": i, "title": f"Title {i}", "link": f"https://site.com/{i}"}
+            for i in ids]
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    clear_seen_indexes()
+    yield
+    clear_seen_indexes()
+
+
+def test_entry_guid_falls_back_to_link():
+    assert entry_guid({"id": "a", "link": "b"}) == "a"
+    assert entry_guid({"link": "b", "title": "c"}) == "b"
+    assert entry_guid({}) == ""
+
+
+def test_feeds_are_polled_concurrently_in_order(tmp_path):
+    feeds = FakeFeeds({
+        f"https://feed{i}.com/rss": (_entries(f"{i}-a"), "v1") for i in range(4)
+    }, delay=0.05)
+    poller = FeedPoller(str(tmp_path / "feed_state.json"), parse=feeds)
+    results = poller.poll([f"https://feed{i}.com/rss" for i in range(4)])
+    assert [url for url, _ in results] == [f"https://feed{i}.com/rss" for i in range(4)]
+    assert feeds.max_active > 1
+
+
+def test_unchanged_feeds_are_skipped_with_conditional_get(tmp_path):
+    path = str(tmp_path / "feed_state.json")
+    feeds = FakeFeeds({"https://a.com/rss": (_entries("1", "2"), "v1"),
+                       "https://b.com/rss": (_entries("3"), "v1")})
+    poller = FeedPoller(path, parse=feeds)
+    for feed_url, entries in poller.poll(["https://a.com/rss", "https://b.com/rss"]):
+        for entry in entries:
+            poller.mark_seen(feed_url, entry)
+        poller.complete(feed_url)
+    poller.persist()
+
+    # b.com changed and gained one entry; a.com did not change
+    feeds.feeds["https://b.com/rss"] = (_entries("4", "3"), "v2")
+    poller = FeedPoller(path, parse=feeds)
+    results = poller.poll(["https://a.com/rss", "https://b.com/rss"])
+    assert [(url, [e["id"] for e in entries]) for url, entries in results] == [
+        ("https://b.com/rss", ["4"])
+    ]
+    assert feeds.calls[-2:] == [
+        ("https://a.com/rss", "v1", None), ("https://b.com/rss", "v1", None)
+    ]
+    assert poller.stats() == {"polled": 2, "not_modified": 1, "failed": 0,
+                              "entries": 2, "new_entries": 1}
+
+
+def test_incomplete_feeds_keep_their_old_validators(tmp_path):
+    feeds = FakeFeeds({"https://a.com/rss": (_entries("1", "2"), "v1")})
+    poller = FeedPoller(str(tmp_path / "feed_state.json"), parse=feeds)
+    (feed_url, entries), = poller.poll(["https://a.com/rss"])
+    poller.mark_seen(feed_url, entries[0])
+
+    # Not completed: the feed is downloaded again and only "2" is new
+    (_, entries), = poller.poll(["https://a.com/rss"])
+    assert feeds.calls[-1] == ("https://a.com/rss", None, None)
+    assert [entry["id"] for entry in entries] == ["2"]
+
+
+def test_failed_feeds_are_counted_and_skipped(tmp_path):
+    poller = FeedPoller(str(tmp_path / "feed_state.json"), parse=FakeFeeds({}))
+    assert poller.poll(["https://down.com/rss"]) == []
+    assert poller.stats()["failed"] == 1
+
+
+def test_rss_scraper_schedules_only_new_entries(tmp_path):
+    storage = HexStorage(str(tmp_path / "hex_tinydb.json"))
+    feeds = FakeFeeds({"https://a.com/rss": (_entries("1", "2", "3"), "v1")})
+    poller = FeedPoller(str(tmp_path / "feed_state.json"), parse=feeds)
+    scraper = RSSArticleScraper(
+        ["https://a.com/rss"], storage, articles_limit=2, feed_poller=poller
+    )
+
+    urls = []
+    for feed_url, entry, normalized in iter_new_entries(scraper):
+        urls.append(normalized["url"])
+        scraper.stored_count += 1
+        poller.mark_seen(feed_url, entry)
+    assert urls == ["https://site.com/1", "https://site.com/2"]
+
+    # The limit cut the feed short: it is fetched again, without "1" and "2"
+    scraper.stored_count = 0
+    assert [r.url for r in _start(scraper)] == ["https://site.com/3"]
+    assert feeds.calls[-1] == ("https://a.com/rss", None, None)
+    assert [r.url for r in _start(scraper)] == []
+    assert feeds.calls[-1] == ("https://a.com/rss", "v1", None)
+
+
+def test_failures_are_stored_with_their_own_entry(tmp_path):
+    storage = HexStorage(str(tmp_path / "hex_tinydb.json"))
+    feeds = FakeFeeds({"https://a.com/rss": (_entries("1", "2"), "v1")})
+    poller = FeedPoller(str(tmp_path / "feed_state.json"), parse=feeds)
+    scraper = RSSArticleScraper(["https://a.com/rss"], storage, feed_poller=poller)
+    first, second = _start(scraper)
+
+    # The first request fails without any response, after the second was scheduled
+    failure = Failure(DNSLookupError("no such host"))
+    failure.request = first
+    scraper.handle_error(failure)
+    stored, = storage.get_table("articles").all()
+    assert stored["url"] == "https://site.com/1"
+    assert stored["metadata"]["error"] == {
+        "status": "DNSLookupError",
+        "message": "DNS lookup failed: no such host.",
+        "url": "https://site.com/1",
+    }
+
+    failure = Failure(HttpError(Response("https://site.com/2", status=500,
+                                         request=second)))
+    failure.request = second
+    scraper.handle_error(failure)
+    assert storage.get_table("articles").get(doc_id=2)["metadata"]["error"] == {
+        "status": 500, "url": "https://site.com/2"
+    }
+
+
+def test_failed_fetches_are_polled_again(tmp_path):
+    storage = HexStorage(str(tmp_path / "hex_tinydb.json"))
+    feeds = FakeFeeds({"https://a.com/rss": (_entries("1", "2"), "v1")})
+    poller = FeedPoller(str(tmp_path / "feed_state.json"), parse=feeds)
+    scraper = RSSArticleScraper(["https://a.com/rss"], storage, feed_poller=poller)
+    first, second = _start(scraper)
+
+    failure = Failure(DNSLookupError("no such host"))
+    failure.request = first
+    scraper.handle_error(failure)
+    response = Response("https://site.com/2", status=503, request=second)
+    assert asyncio.run(_collect(scraper.parse(response))) == []
+    assert storage.count_records("articles") == 2
+
+    # Nothing was fetched: both entries come back and the feed is not a 304
+    (_, entries), = poller.poll(["https://a.com/rss"])
+    assert feeds.calls[-1] == ("https://a.com/rss", None, None)
+    assert [entry["id"] for entry in entries] == ["1", "2"]
+
+
+def test_feeds_are_yielded_as_they_arrive_without_blocking_the_loop(tmp_path):
+    fast = FakeFeeds({"https://fast.com/rss": (_entries("2"), "v1")})
+    slow = FakeFeeds({"https://slow.com/rss": (_entries("1"), "v1")}, delay=0.3)
+
+    def parse(url, **validators):
+        return (slow if "slow" in url else fast)(url, **validators)
+
+    storage = HexStorage(str(tmp_path / "hex_tinydb.json"))
+    poller = FeedPoller(str(tmp_path / "feed_state.json"), parse=parse)
+    scraper = RSSArticleScraper(
+        ["https://slow.com/rss", "https://fast.com/rss"], storage, feed_poller=poller
+    )
+
+    async def crawl():
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.ensure_future(tick())
+        urls = [request.url async for request in scraper.start()]
+        ticker.cancel()
+        return urls, ticks
+
+    urls, ticks = asyncio.run(crawl())
+    assert urls == ["https://site.com/2", "https://site.com/1"]
+    # The event loop kept running while the slow feed downloaded
+    assert len(ticks) > 10
+
+
+def _start(scraper):
+    return asyncio.run(_collect(scraper.start()))
+
+
+async def _collect(generator):
+    return [item async for item in generator]
@@ -0,0 +1,120 @@
+import asyncio
+import time
+
+import pytest
+from scrapy.http import HtmlResponse, Request
+
+from hex.ingestion.fetch_strategy import (
+    BROWSER, HTTP, FetchStrategy, clear_fetch_strategies, get_fetch_strategy
+)
+from hex.ingestion.rss_article import RSSArticleScraper
+from hex.ingestion.seen_index import clear_seen_indexes
+from hex.storage.hex_storage import HexStorage
+
+
+ARTICLE = (
+    "<html><body><article><h1>Title</h1>"
+    + "<p>A long enough paragraph about machine learning research.</p>" * 20
+    + "</article></body></html>"
+)
+JS_SHELL = "<html><body><div id='root'></div><script>render()</script></body></html>"
+
+
+@pytest.fixture(autouse=True)
+def empty_registries():
+    clear_fetch_strategies()
+    clear_seen_indexes()
+    yield
+    clear_fetch_strategies()
+    clear_seen_indexes()
+
+
+@pytest.fixture
+def strategy(tmp_path):
+    return FetchStrategy(str(tmp_path / "fetch_strategy.json"), min_text_length=100)
+
+
+def test_http_first_then_learns_browser_domains(strategy):
+    url = "https://www.spa.com/post"
+    assert strategy.mode(url) == HTTP
+    assert "playwright" not in strategy.request_meta(url, {"rss_data": {}})
+
+    assert not strategy.accepts(url, "too short", from_browser=False)
+    assert strategy.mode(url) == BROWSER
+    meta = strategy.request_meta(url, {"rss_data": {}})
+    assert meta["playwright"] and "rss_data" in meta
+
+    assert strategy.accepts(url, "", from_browser=True)
+    assert strategy.accepts("https://static.com/a", "x" * 100, from_browser=False)
+    assert strategy.stats() == {
+        "http": 2, "browser": 1, "escalated": 1, "browser_domains": ["spa.com"]
+    }
+
+
+def test_decisions_are_persisted_and_expire(strategy, tmp_path):
+    strategy.accepts("https://spa.com/post", None, from_browser=False)
+    strategy.persist()
+
+    reloaded = FetchStrategy(str(tmp_path / "fetch_strategy.json"))
+    assert reloaded.mode("https://spa.com/other") == BROWSER
+    reloaded.domains["spa.com"]["updated_at"] = time.time() - 31 * 86400
+    # Sites that became server-rendered get another chance over HTTP
+    assert reloaded.mode("https://spa.com/other") == HTTP
+
+
+def test_js_only_domains_always_use_the_browser(tmp_path):
+    strategy = FetchStrategy(
+        str(tmp_path / "fetch_strategy.json"), js_only_domains=["spa.com"]
+    )
+    assert strategy.mode("https://www.spa.com/post") == BROWSER
+    assert strategy.mode("https://static.com/post") == HTTP
+
+
+def test_get_fetch_strategy_is_shared(tmp_path):
+    storage = HexStorage(str(tmp_path / "hex_tinydb.json"))
+    assert get_fetch_strategy(storage) is get_fetch_strategy(storage)
+    assert get_fetch_strategy(storage).path == tmp_path / "fetch_strategy.json"
+
+
+def _response(url, body, meta):
+    request = Request(url, meta=meta)
+    return HtmlResponse(url, body=body, encoding="utf-8", request=request)
+
+
+def _parse(scraper, response):
+    async def collect():
+        return [output async for output in scraper.parse(response)]
+    return asyncio.run(collect())
+
+
+def test_rss_scraper_escalates_thin_pages_to_the_browser(tmp_path):
+    storage = HexStorage(str(tmp_path / "hex_tinydb.json"))
+    scraper = RSSArticleScraper([], storage)
+    url = "https://spa.com/post"
+    rss_data = {"title": "Post", "url": url, "url_domain": "spa.com",
+                "summary": "Summary"}
+
+    meta = {"rss_data": rss_data, "start_time": time.time(),
+            "feed_entry": ("https://spa.com/rss", {"link": url})}
+    retried = _parse(scraper, _response(url, JS_SHELL, meta))
+    assert len(retried) == 1
+    assert retried[0].meta["playwright"] and retried[0].dont_filter
+    assert storage.count_records("articles") == 0
+
+    assert _parse(scraper, _response(url, ARTICLE, retried[0].meta)) == []
+    assert storage.get_all("articles")[0]["text_content"]
+    assert scraper.fetch_strategy.mode("https://spa.com/next") == BROWSER
+
+
+def test_rss_scraper_keeps_server_rendered_pages(tmp_path):
+    storage = HexStorage(str(tmp_path / "hex_tinydb.json"))
+    scraper = RSSArticleScraper([], storage)
+    url = "https://static.com/post"
+    rss_data = {"title": "Post", "url": url, "url_domain": "static.com",
+                "summary": "Summary"}
+
+    meta = {"rss_data": rss_data, "start_time": time.time(),
+            "feed_entry": ("https://static.com/rss", {"link": url})}
+    assert _parse(scraper, _response(url, ARTICLE, meta)) == []
+    assert storage.count_records("articles") == 1
+    assert scraper.fetch_strategy.stats()["http"] == 1
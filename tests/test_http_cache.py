@@ -0,0 +1,120 @@
+import time
+from concurrent.futures import Future
+
+import pytest
+from scrapy import Request
+from scrapy.http import HtmlResponse
+
+from hex.ingestion.http_cache import (
+    VIA_FEED, CacheMiss, ResponseCache, ResponseCacheMiddleware,
+    clear_response_caches, get_response_cache
+)
+
+
+PAGE = b"<html><body><p>Cached page</p></body></html>"
+HEADERS = {"Content-Type": ["text/html; charset=utf-8"]}
+FEED = (b"<rss version='2.0'><channel><title>Site</title><item><guid>1</guid>"
+        b"<link>https://site.com/1</link></item></channel></rss>")
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    clear_response_caches()
+    yield
+    clear_response_caches()
+
+
+def test_bodies_are_stored_once_by_content(tmp_path):
+    cache = ResponseCache(str(tmp_path), "record")
+    cache.store("https://a.com/1", 200, HEADERS, PAGE)
+    cache.store("https://a.com/2", 200, HEADERS, PAGE)
+    assert len(list((tmp_path / "blobs").rglob("*.gz"))) == 1
+    assert len(list((tmp_path / "entries").rglob("*.json"))) == 2
+    assert cache.stats()["bytes_stored"] == len(PAGE)
+
+    entry = cache.get(ResponseCache.request_key("https://a.com/2"))
+    assert (entry["status"], entry["body"]) == (200, PAGE)
+    # Record mode always fetches live
+    assert cache.lookup("https://a.com/1") is None
+
+
+def test_replay_serves_from_disk_and_fails_on_misses(tmp_path):
+    ResponseCache(str(tmp_path), "record").store("https://a.com/1", 200, HEADERS, PAGE)
+    cache = ResponseCache(str(tmp_path), "replay")
+    assert cache.lookup("https://a.com/1")["body"] == PAGE
+    with pytest.raises(CacheMiss):
+        cache.lookup("https://a.com/1", via="browser")
+    cache.store("https://a.com/3", 200, HEADERS, PAGE)
+    with pytest.raises(CacheMiss):
+        cache.lookup("https://a.com/3")
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_refresh_refetches_old_responses(tmp_path):
+    cache = ResponseCache(str(tmp_path), "refresh", max_age=60)
+    assert cache.lookup("https://a.com/1") is None
+    cache.store("https://a.com/1", 200, HEADERS, PAGE)
+    assert cache.lookup("https://a.com/1")["body"] == PAGE
+
+    cache.max_age = 0
+    time.sleep(0.01)
+    assert cache.lookup("https://a.com/1") is None
+    assert cache.stats()["stale"] == 1
+
+
+def test_middleware_records_then_replays(tmp_path):
+    middleware = ResponseCacheMiddleware(ResponseCache(str(tmp_path), "record"))
+    request = Request("https://a.com/1")
+    assert middleware.process_request(request) is None
+    live = HtmlResponse("https://a.com/1", body=PAGE, headers={
+        "Content-Type": "text/html; charset=utf-8"
+    }, request=request)
+    assert middleware.process_response(request, live) is live
+
+    middleware = ResponseCacheMiddleware(ResponseCache(str(tmp_path), "replay"))
+    replayed = middleware.process_request(Request("https://a.com/1"))
+    assert isinstance(replayed, HtmlResponse)
+    assert "cached" in replayed.flags
+    assert replayed.css("p::text").get() == "Cached page"
+
+    rendered = Request("https://a.com/1", meta={"playwright": True})
+    missing = middleware.process_request(rendered)
+    assert missing.status == 504 and rendered.meta["dont_retry"]
+    assert middleware.process_response(rendered, missing) is missing
+
+
+def test_stealth_fetches_go_through_the_cache(tmp_path):
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        future = Future()
+        future.set_result("<html>stealth</html>")
+        return future
+
+    cache = ResponseCache(str(tmp_path), "record")
+    assert cache.submit("https://a.com/1", fetch).result() == "<html>stealth</html>"
+    cache = ResponseCache(str(tmp_path), "replay")
+    assert cache.submit("https://a.com/1", fetch).result() == "<html>stealth</html>"
+    with pytest.raises(CacheMiss):
+        cache.submit("https://a.com/2", fetch).result()
+    assert fetched == ["https://a.com/1"]
+
+
+def test_replayed_feeds_are_parsed_in_full(tmp_path):
+    ResponseCache(str(tmp_path), "record").store(
+        "https://a.com/rss", 200, {"ETag": ['"v1"']}, FEED, via=VIA_FEED
+    )
+    cache = ResponseCache(str(tmp_path), "replay")
+    feed = cache.parse_feed("https://a.com/rss", etag='"v1"')
+    assert feed["status"] == 200 and feed["etag"] == '"v1"'
+    assert [entry["link"] for entry in feed.entries] == ["https://site.com/1"]
+    assert cache.parse_feed("https://b.com/rss")["bozo"]
+
+
+def test_shared_cache_follows_the_config(tmp_path):
+    assert get_response_cache({"http_cache_mode": "off"}) is None
+    config = {"http_cache_mode": "replay", "http_cache_dir": str(tmp_path)}
+    cache = get_response_cache(config)
+    assert get_response_cache(dict(config)) is cache
+    assert get_response_cache({**config, "http_cache_mode": "record"}).mode == "record"
@@ -0,0 +1,115 @@
+from unittest.mock import patch
+
+import pytest
+from feedparser import FeedParserDict
+
+from hex.ingestion.base_article import BaseArticleScraper
+from hex.ingestion.parser import canonicalize_url
+from hex.ingestion.rss_article import RSSArticleScraper
+from hex.ingestion.seen_index import SeenIndex, clear_seen_indexes, get_seen_index
+from hex.storage.hex_storage import HexStorage
+
+
+class DummyScraper(BaseArticleScraper):
+    name = "dummy_scraper"
+
+    def parse(self, response):
+        pass
+
+    def parse_article(self, response):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    clear_seen_indexes()
+    yield
+    clear_seen_indexes()
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = HexStorage(str(tmp_path / "hex_tinydb.json"))
+    storage.save("articles", {
+        "title": "Known article",
+        "url_domain": "example.com",
+        "url": "https://www.example.com/posts/known/?utm_source=rss",
+    })
+    return storage
+
+
+@pytest.mark.parametrize("url,expected", [
+    ("https://www.Example.com/a/b/?utm_source=x&b=2&a=1#frag",
+     "https://example.com/a/b?a=1&b=2"),
+    ("http://example.com:80", "http://example.com/"),
+    ("https://example.com/a?ref=rss&id=3", "https://example.com/a?id=3"),
+    ("", ""),
+])
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+def test_skip_known_article_by_url_and_title(storage):
+    scraper = DummyScraper([], storage)
+    assert scraper.skip_known_article("https://example.com/posts/known")
+    assert scraper.skip_known_article(
+        "https://example.com/other", "Known article", "example.com"
+    )
+    assert not scraper.skip_known_article("https://example.com/new")
+    # The same new URL is only requested once per run, by any spider
+    other = DummyScraper([], storage)
+    assert other.skip_known_article("https://example.com/new#comments")
+    assert scraper.skipped_count == 2 and other.skipped_count == 1
+    assert other.seen_index is scraper.seen_index
+
+
+def test_rss_start_requests_skip_known_entries(storage):
+    feed = FeedParserDict(entries=[
+        {"title": "Known article", "link": "https://example.com/posts/known"},
+        {"title": "New article", "link": "https://example.com/posts/new"},
+    ])
+    scraper = RSSArticleScraper(["https://example.com/feed"], storage)
+    with patch("hex.ingestion.feed_poller.feedparser.parse", return_value=feed):
+        requests = list(scraper.start_requests())
+    assert [request.url for request in requests] == ["https://example.com/posts/new"]
+    assert scraper.skipped_count == 1
+
+
+def test_store_filters_duplicates_across_spiders(storage):
+    first, second = DummyScraper([], storage), DummyScraper([], storage)
+    article = {"title": "Fresh", "url_domain": "example.com",
+               "url": "https://example.com/fresh"}
+    assert first.store([dict(article)])
+    assert second.store([dict(article)]) == []
+    assert second.store([{"title": "Known article", "url_domain": "example.com"}]) == []
+
+
+def test_seen_index_persists_and_catches_up(storage, tmp_path):
+    path = tmp_path / "articles_seen.idx"
+    index = SeenIndex(str(path), storage)
+    assert index.is_known("https://example.com/posts/known")
+    index.add({"title": "Only in index", "url_domain": "a.com"})
+    index.persist()
+    assert path.stat().st_size == 24 + 8 * len(index)
+
+    storage.save("articles", {"title": "Stored later", "url_domain": "b.com",
+                              "url": "https://b.com/later"})
+    reopened = SeenIndex(str(path), storage)
+    assert reopened.is_known(title="Only in index", url_domain="a.com")
+    assert reopened.is_known(title="Known article", url_domain="example.com")
+    assert reopened.is_known("https://b.com/later")
+    assert not reopened.is_known("https://b.com/other")
+
+
+def test_seen_index_rebuilds_when_table_is_dropped(storage, tmp_path):
+    path = tmp_path / "articles_seen.idx"
+    SeenIndex(str(path), storage).persist()
+    storage.db.drop_table("articles")
+    storage.save("articles", {"title": "New", "url_domain": "c.com"})
+    index = SeenIndex(str(path), storage)
+    assert not index.is_known(title="Known article", url_domain="example.com")
+    assert index.is_known(title="New", url_domain="c.com")
+
+
+def test_get_seen_index_is_shared(storage):
+    assert get_seen_index(storage) is get_seen_index(storage)
@@ -0,0 +1,171 @@
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from hex.models.configs.openai_embedding_config import OpenAIEmbeddingConfig
+from hex.models.providers.openai_embedding import (
+    EmbeddingMatrixCache, OpenAIEmbedding, compute_tag_list_similarity
+)
+from hex.utils.hash import sha256_key
+
+
+def vector(text, dim=4):
+    rng = np.random.default_rng(sum(map(ord, text)))
+    return rng.normal(size=dim).tolist()
+
+
+class FakeEmbeddings:
+    """ Embeddings endpoint answering out of order, like the API may. """
+
+    def __init__(self):
+        self.batches = []
+
+    def create(self, input, model, **params):
+        self.batches.append(list(input))
+        data = [
+            SimpleNamespace(index=i, embedding=vector(text), object="embedding")
+            for i, text in enumerate(input)
+        ]
+        return SimpleNamespace(
+            data=data[::-1], model=model, object="list",
+            usage={"prompt_tokens": len(input), "total_tokens": len(input)}
+        )
+
+
+def make_model(cache_dir, batch_size=2):
+    model = OpenAIEmbedding(OpenAIEmbeddingConfig(
+        model_name="text-embedding-3-small", matrix_cache_dir=str(cache_dir),
+        api_key="test", dimensions=4, batch_size=batch_size
+    ))
+    model.client = SimpleNamespace(embeddings=FakeEmbeddings())
+    return model
+
+
+def test_predict_many_batches_misses_and_keeps_order(tmp_path):
+    model = make_model(tmp_path)
+    model.predict("agents")
+    texts = ["robotics", "agents", "llm", "robotics", "vision", "speech"]
+    results = model.predict_many(texts)
+
+    assert [list(r["output"]) for r in results] == [vector(text) for text in texts]
+    # "agents" was cached, "robotics" is embedded once, 2 inputs per request
+    assert model.client.embeddings.batches == [
+        ["agents"], ["robotics", "llm"], ["vision", "speech"]
+    ]
+    assert results[0]["metadata"]["batch_size"] == 2
+
+    # Everything was persisted: a new model makes no request
+    model = make_model(tmp_path)
+    model.predict_many(texts)
+    assert model.client.embeddings.batches == []
+
+
+def test_cache_appends_rows_and_index_lines(tmp_path):
+    cache = EmbeddingMatrixCache(str(tmp_path), embedding_dim=4)
+    cache.add_many([(text, vector(text), {"n": i})
+                    for i, text in enumerate(["a", "b", "a", "c"])])
+    cache.add("d", vector("d"), {"n": 4})
+    cache.add("b", vector("x"), {"n": 5})  # Known key: ignored
+
+    assert cache.vectors_path.stat().st_size == 4 * 4 * 4  # 4 float32 rows
+    assert len(cache.index_path.read_text().splitlines()) == 1 + 4
+    embedding, meta = cache.get_embedding("c")
+    assert embedding.dtype == np.float32
+    assert embedding.tolist() == pytest.approx(vector("c"))
+    assert meta == {"n": 3}
+
+    reloaded = EmbeddingMatrixCache(str(tmp_path), embedding_dim=4)
+    assert isinstance(reloaded.embeddings, np.memmap)
+    assert reloaded.get_embedding("d")[1] == {"n": 4}
+    assert reloaded.get_embedding("e") is None
+    with pytest.raises(ValueError):
+        EmbeddingMatrixCache(str(tmp_path), embedding_dim=8)
+
+
+def test_torn_appends_are_dropped_on_load(tmp_path):
+    cache = EmbeddingMatrixCache(str(tmp_path), embedding_dim=4)
+    cache.add_many([(text, vector(text), {}) for text in ["a", "b"]])
+    # A row written without its line, then a partial line
+    with open(cache.vectors_path, "ab") as f:
+        np.asarray([vector("c")], dtype=np.float32).tofile(f)
+    with open(cache.index_path, "a", encoding="utf-8") as f:
+        f.write('{"key": "trunc')
+
+    cache = EmbeddingMatrixCache(str(tmp_path), embedding_dim=4)
+    assert len(cache.keys) == 2
+    assert cache.vectors_path.stat().st_size == 2 * 4 * 4
+    cache.add("c", vector("c"), {})
+    cache = EmbeddingMatrixCache(str(tmp_path), embedding_dim=4)
+    assert cache.get_embedding("c")[0].tolist() == pytest.approx(vector("c"))
+
+
+def test_dead_rows_are_compacted(tmp_path):
+    cache = EmbeddingMatrixCache(str(tmp_path), embedding_dim=4)
+    cache.add_many([(text, vector(text), {}) for text in ["a", "b", "c"]])
+    # Another run added "a" again meanwhile
+    other = EmbeddingMatrixCache(str(tmp_path), embedding_dim=4)
+    other.index.clear()
+    other.add("a", vector("z"), {"latest": True})
+
+    cache = EmbeddingMatrixCache(str(tmp_path), embedding_dim=4, compact_ratio=0.2)
+    assert cache.vectors_path.name == "vectors-1.f32"
+    assert not (tmp_path / "vectors-0.f32").exists()
+    assert len(cache.keys) == 3
+    embedding, meta = cache.get_embedding("a")
+    assert meta == {"latest": True}
+    assert embedding.tolist() == pytest.approx(vector("z"))
+
+
+def test_instances_sharing_a_cache_append_in_turn(tmp_path):
+    a = EmbeddingMatrixCache(str(tmp_path), embedding_dim=4)
+    b = EmbeddingMatrixCache(str(tmp_path), embedding_dim=4)
+    b.add("y", vector("y"), {"by": "b"})
+    a.add_many([("z", vector("z"), {"by": "a"}), ("y", vector("x"), {"by": "a"})])
+
+    # a read the row of b before appending its own after it
+    assert a.get_embedding("z")[0].tolist() == pytest.approx(vector("z"))
+    assert a.get_embedding("y")[1] == {"by": "b"}
+    assert a.vectors_path.stat().st_size == 2 * 4 * 4
+    b.add("w", vector("w"), {})
+    assert b.get_embedding("z")[0].tolist() == pytest.approx(vector("z"))
+    assert b.get_embedding("w")[0].tolist() == pytest.approx(vector("w"))
+    reloaded = EmbeddingMatrixCache(str(tmp_path), embedding_dim=4)
+    assert reloaded.keys == [sha256_key(text) for text in ["y", "z", "w"]]
+
+
+def test_torn_appends_of_another_instance_are_dropped(tmp_path):
+    a = EmbeddingMatrixCache(str(tmp_path), embedding_dim=4)
+    a.add("a", vector("a"), {})
+    b = EmbeddingMatrixCache(str(tmp_path), embedding_dim=4)
+    # b died between writing its row and its line
+    with open(b.vectors_path, "ab") as f:
+        np.asarray([vector("c")], dtype=np.float32).tofile(f)
+    with open(b.index_path, "a", encoding="utf-8") as f:
+        f.write('{"key": "trunc')
+
+    a.add("d", vector("d"), {})
+    assert a.get_embedding("d")[0].tolist() == pytest.approx(vector("d"))
+    reloaded = EmbeddingMatrixCache(str(tmp_path), embedding_dim=4)
+    assert reloaded.keys == [sha256_key("a"), sha256_key("d")]
+    assert reloaded.get_embedding("d")[0].tolist() == pytest.approx(vector("d"))
+
+
+def test_legacy_cache_is_migrated(tmp_path):
+    np.save(tmp_path / "embeddings.npy", np.array([vector("a"), vector("b")]))
+    (tmp_path / "keys.json").write_text(json.dumps([sha256_key("a"), sha256_key("b")]))
+    (tmp_path / "metadata.jsonl").write_text('{"n": 0}\n{"n": 1}\n')
+
+    cache = EmbeddingMatrixCache(str(tmp_path), embedding_dim=4)
+    assert cache.get_embedding("b")[1] == {"n": 1}
+    assert cache.embeddings.dtype == np.float32
+    assert not (tmp_path / "embeddings.npy").exists()
+    assert EmbeddingMatrixCache(str(tmp_path), embedding_dim=4).get_embedding("a")
+
+
+def test_tag_list_similarity_uses_one_bulk_call(tmp_path):
+    model = make_model(tmp_path, batch_size=100)
+    similarity = compute_tag_list_similarity(["agents", "llm"], ["llm"], model)
+    assert similarity == pytest.approx(1.0)
+    assert model.client.embeddings.batches == [["agents", "llm"]]
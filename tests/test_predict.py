@@ -0,0 +1,152 @@
+import threading
+import time
+
+import pytest
+from pydantic import BaseModel
+
+from hex.flows.predict import predict, predict_selected
+from hex.models.base_spec import ModelSpec, PromptTemplateSpec
+from hex.models.configs.open_router_config import OpenRouterConfig
+from hex.models.loader import MODEL_SPECS
+from hex.models.rate_limiter import (
+    RateLimiter, TokenBucket, clear_rate_limiters, get_rate_limiter
+)
+
+
+class EchoInput(BaseModel):
+    title: str
+
+
+class EchoOutput(BaseModel):
+    output: str
+
+
+class SlowEchoModel:
+    """ Answers after a delay that decreases with the index, tracking overlap. """
+
+    def __init__(self, config):
+        self.prompt = lambda **kwargs: f"Echo {kwargs['title']}"
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def predict(self, input_data):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        index = int(input_data["title"].split()[-1])
+        time.sleep(0.02 * (5 - index % 5))
+        with self.lock:
+            self.active -= 1
+        if "broken" in input_data["title"]:
+            raise RuntimeError("Provider returned error 502")
+        return {
+            "output": input_data["title"].upper(),
+            "metadata": {"total_tokens": 10},
+        }
+
+
+class EchoSpec(ModelSpec):
+    def load_model(self):
+        self._loaded_model = SlowEchoModel(self.config)
+
+
+@pytest.fixture
+def echo_spec(monkeypatch):
+    clear_rate_limiters()
+    spec = EchoSpec(
+        name="echo_spec",
+        version="v1",
+        provider="openai",
+        concurrency=4,
+        config=OpenRouterConfig(
+            prompt_spec=PromptTemplateSpec(
+                name="echo_prompt", version="v1", template="Echo {title}",
+                input_schema=EchoInput, output_schema=EchoOutput
+            ),
+            api_key="test",
+            requests_per_minute=None,
+        ),
+    )
+    monkeypatch.setitem(MODEL_SPECS, "echo_spec", spec)
+    yield spec
+    clear_rate_limiters()
+
+
+def articles(*titles):
+    return [{"doc_id": i, "title": title} for i, title in enumerate(titles)]
+
+
+def test_predictions_run_concurrently_in_input_order(echo_spec):
+    data = articles(*[f"Post {i}" for i in range(10)])
+    inputs, outputs, errors = predict("echo_spec", data)
+
+    assert inputs == [{"article_id": i} for i in range(10)]
+    assert [output["output"] for output in outputs] == [f"POST {i}" for i in range(10)]
+    assert all(output["metadata"]["duration"] > 0 for output in outputs)
+    assert errors == []
+    assert 1 < echo_spec._loaded_model.max_active <= 4
+
+
+def test_failed_items_are_captured_in_place(echo_spec):
+    data = articles("Post 0", "broken 1", "Post 2")
+    inputs, outputs, errors = predict("echo_spec", data, concurrency=1)
+
+    assert echo_spec._loaded_model.max_active == 1
+    assert outputs[0]["output"] == "POST 0" and outputs[2]["output"] == "POST 2"
+    assert outputs[1] is None
+    assert errors == [{"index": 1, "error_message": "Provider returned error 502",
+                       "article_id": 1}]
+
+
+def test_selected_items_stay_aligned(echo_spec):
+    data = articles("Post 0", "skipped 1", "broken 2", "Post 3")
+    inputs, outputs, errors = predict_selected("echo_spec", data, [0, 2, 3])
+
+    assert inputs == [{"article_id": 0}, None, {"article_id": 2}, {"article_id": 3}]
+    assert [output and output["output"] for output in outputs] == \
+        ["POST 0", None, None, "POST 3"]
+    assert [error["index"] for error in errors] == [2]
+    assert predict_selected("echo_spec", data, []) == ([None] * 4, [None] * 4, [])
+
+
+def test_token_bucket_waits_for_refill():
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(60, clock=lambda: now[0], sleep=sleep)
+    assert bucket.acquire(60) == 0
+    assert bucket.acquire(30) == pytest.approx(30)
+    # Larger than the bucket: waits for a full bucket and goes in debt
+    assert bucket.acquire(120) == pytest.approx(60)
+    bucket.adjust(-60)
+    assert bucket.acquire(1) == pytest.approx(1)
+    assert sum(sleeps) == pytest.approx(91)
+
+
+def test_rate_limiter_settles_actual_tokens():
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=6000)
+    limiter.acquire(100)
+    limiter.settle(100, 250)
+    assert limiter.stats()["requests"] == 1
+    assert limiter.stats()["tokens"] == 250
+    assert limiter.tokens._level == pytest.approx(5750, abs=1)
+
+
+def test_rate_limiters_are_shared_per_endpoint():
+    clear_rate_limiters()
+    limiter = get_rate_limiter("openai:https://openrouter.ai/api/v1", 300)
+    assert get_rate_limiter("openai:https://openrouter.ai/api/v1", 300) is limiter
+    # Specs with other limits share it, at the strictest limits
+    assert get_rate_limiter("openai:https://openrouter.ai/api/v1", 60) is limiter
+    assert get_rate_limiter("openai:https://openrouter.ai/api/v1", 600, 1000) \
+        is limiter
+    assert limiter.limits == (60, 1000)
+    assert limiter.requests.capacity == 60 and limiter.tokens.capacity == 1000
+    # No limits: never waits
+    assert get_rate_limiter("openai:other").acquire(10 ** 9) == 0
+    clear_rate_limiters()
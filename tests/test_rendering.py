@@ -0,0 +1,154 @@
+import asyncio
+from types import SimpleNamespace
+
+from playwright.async_api import Error as PlaywrightError
+from scrapy import Request
+from scrapy.http import HtmlResponse
+from scrapy.statscollectors import MemoryStatsCollector
+from scrapy.utils.test import get_crawler
+
+from hex.ingestion.browser_pool import StealthBrowserPool
+from hex.ingestion.rendering import (
+    RenderStats, browser_meta, is_blocked_host, render_summary, rendering_settings,
+    should_abort_request, track_render, wait_until_ready
+)
+
+
+class FakeRequest:
+    def __init__(self, size=1000, failing=False):
+        self.size = size
+        self.failing = failing
+
+    async def sizes(self):
+        if self.failing:
+            raise PlaywrightError("Target closed")
+        return {"responseBodySize": self.size, "responseHeadersSize": 100}
+
+
+class FakePage:
+    """ Async page emitting its finished requests once ready. """
+
+    url = "https://site.com/post"
+
+    def __init__(self, ready=True):
+        self.ready = ready
+        self.handlers = []
+        self.waited = []
+
+    def on(self, event, handler):
+        self.handlers.append(handler)
+
+    async def _wait(self, *args, **kwargs):
+        self.waited.append((args, kwargs))
+        for handler in self.handlers:
+            handler(FakeRequest())
+            handler(FakeRequest(failing=True))
+        if not self.ready:
+            raise PlaywrightError("Timeout 15000ms exceeded.")
+
+    wait_for_selector = _wait
+    wait_for_load_state = _wait
+
+
+def test_blocks_heavy_resources_and_trackers():
+    def request(url, resource_type):
+        return SimpleNamespace(url=url, resource_type=resource_type)
+
+    assert should_abort_request(request("https://site.com/logo.png", "image"))
+    assert should_abort_request(request("https://site.com/app.css", "stylesheet"))
+    assert should_abort_request(
+        request("https://www.googletagmanager.com/gtm.js", "script")
+    )
+    assert not should_abort_request(request("https://site.com/app.js", "script"))
+    assert not should_abort_request(request("https://site.com/api/posts", "fetch"))
+    assert not should_abort_request(request("https://site.com/post", "document"))
+    assert is_blocked_host("https://stats.g.doubleclick.net/x", ["doubleclick.net"])
+    assert not is_blocked_host("https://notdoubleclick.net/x", ["doubleclick.net"])
+
+
+def test_rendering_settings_are_loaded_once():
+    settings = rendering_settings()
+    assert rendering_settings() is settings
+    assert isinstance(settings["blocked_hosts"], frozenset)
+    assert "image" in settings["blocked_resource_types"]
+
+
+def test_browser_meta_waits_for_readiness_instead_of_sleeping():
+    meta = browser_meta("h1.title")
+    assert meta["playwright"]
+    assert "playwright_include_page" not in meta
+    assert meta["playwright_page_goto_kwargs"] == {"wait_until": "domcontentloaded"}
+    wait = meta["playwright_page_methods"][-1]
+    assert wait.method is wait_until_ready
+    assert wait.args == (meta["render_stats"], "h1.title")
+    # Each request measures its own render
+    assert browser_meta()["render_stats"] is not meta["render_stats"]
+
+
+def test_ready_pages_report_render_time_and_bytes():
+    stats = {}
+    page = FakePage()
+    request = Request("https://site.com/post", meta={"render_stats": stats})
+    asyncio.run(track_render(page, request))
+    asyncio.run(wait_until_ready(page, stats, "h1"))
+
+    assert page.waited[0] == (("h1",), {"state": "attached", "timeout": 15000})
+    assert stats["bytes"] == 1100
+    assert stats["requests"] == 2
+    assert stats["render_time"] >= 0
+
+
+def test_pages_not_ready_in_time_are_used_as_they_are():
+    stats = {}
+    page = FakePage(ready=False)
+    asyncio.run(track_render(page, SimpleNamespace(meta={"render_stats": stats})))
+    asyncio.run(wait_until_ready(page, stats))
+    assert page.waited[0] == (("networkidle",), {"timeout": 5000})
+    assert stats["requests"] == 2
+
+
+def test_render_stats_extension_sums_rendered_pages():
+    crawler = get_crawler()
+    crawler.stats = MemoryStatsCollector(crawler)
+    extension = RenderStats.from_crawler(crawler)
+    for render_time, flags in ((1.0, []), (3.0, []), (5.0, ["cached"])):
+        request = Request("https://site.com/post", meta={"render_stats": {
+            "bytes": 2000, "requests": 4, "render_time": render_time
+        }})
+        extension._response_received(
+            HtmlResponse(request.url, request=request, flags=flags), request
+        )
+    plain = Request("https://site.com/feed")
+    extension._response_received(HtmlResponse(plain.url, request=plain), plain)
+    crawler.stats.set_value("playwright/request_count/aborted", 7)
+
+    summary = render_summary(crawler.stats)
+    assert summary["pages"] == 2
+    assert summary["bytes"] == 4000
+    assert summary["requests"] == 8
+    assert summary["aborted_requests"] == 7
+    assert summary["mean_render_time"] == 2.0
+
+
+def test_browser_pool_sums_render_stats():
+    class RenderingBrowser:
+        last_render = None
+
+        def fetch(self, url):
+            self.last_render = {"bytes": 500, "requests": 3,
+                                "aborted_requests": 2, "render_time": 0.5}
+            return "<html></html>"
+
+        def close(self):
+            pass
+
+    with StealthBrowserPool(2, domain_delay=0,
+                            browser_factory=RenderingBrowser) as pool:
+        for future in [pool.submit(f"https://site{i}.com/a") for i in range(3)]:
+            future.result()
+
+    stats = pool.stats()
+    assert stats["render_bytes"] == 1500
+    assert stats["render_requests"] == 9
+    assert stats["aborted_requests"] == 6
+    assert stats["mean_render_time"] == 0.5
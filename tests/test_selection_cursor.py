@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+
+import pytest
+
+from hex.flows.article_selection.steps import end
+from hex.flows.article_selection.steps.select_articles import is_excluded
+from hex.storage.hex_storage import clear_storage_registry, get_storage
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    clear_storage_registry()
+    yield
+    clear_storage_registry()
+
+
+def test_only_selectable_candidates_stay_pending(tmp_path):
+    config = {"db_path": str(tmp_path / "hex_tinydb.json")}
+    storage = get_storage(config)
+    storage.save_many("articles", [
+        {"title": "Robots", "url_domain": "example.com"},
+        {"title": "AI newsletter #12", "url_domain": "example.com"},
+        {"title": "Agents", "url_domain": "example.com"},
+    ])
+    candidates, cursor = storage.changes_since("articles", "selection")
+    flow = SimpleNamespace(
+        config=config, articles_table="articles", articles_consumer="selection",
+        articles_cursor=cursor, candidates=candidates,
+        selected_article_ids=["1"],
+        selectable_article_ids=[
+            article["doc_id"] for article in candidates if not is_excluded(article)
+        ],
+    )
+    end.execute(flow)
+
+    rows, _ = storage.changes_since("articles", "selection")
+    assert [row["title"] for row in rows] == ["Agents"]
@@ -0,0 +1,36 @@
+import pytest
+
+from hex.utils.files import atomic_open, atomic_write
+from hex.utils.registry import SharedRegistry
+
+
+def test_atomic_write_replaces_the_file(tmp_path):
+    path = tmp_path / "state" / "feeds.json"
+    atomic_write(path, "{}")
+    atomic_write(path, b"[]")
+    assert path.read_text() == "[]"
+    assert [p.name for p in path.parent.iterdir()] == ["feeds.json"]
+
+
+def test_failed_write_keeps_the_old_content(tmp_path):
+    path = tmp_path / "feeds.json"
+    atomic_write(path, "{}")
+    with pytest.raises(RuntimeError):
+        with atomic_open(path) as f:
+            f.write("[")
+            raise RuntimeError("crash")
+    assert path.read_text() == "{}"
+    assert [p.name for p in tmp_path.iterdir()] == ["feeds.json"]
+
+
+def test_registry_creates_once_per_key():
+    registry = SharedRegistry()
+    first = registry.get("a", dict)
+    assert registry.get("a", dict) is first
+    assert registry.get("b", dict) is not first
+    assert registry.get("a", dict, reuse=lambda item: False) is not first
+
+    closed = []
+    registry.clear(close=closed.append)
+    assert len(closed) == 2
+    assert registry.values() == []
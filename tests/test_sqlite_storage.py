@@ -0,0 +1,145 @@
+import sqlite3
+
+import pytest
+from pathlib import Path
+from tinydb import Query, TinyDB
+
+from hex.storage.base_storage import SQLiteStorageService
+from hex.storage.hex_storage import SQLiteHexStorage, HexStorage, load_storage
+
+
+@pytest.fixture
+def sqlite_storage(tmp_path):
+    yield SQLiteStorageService(str(tmp_path / "hex.sqlite3"))
+
+
+@pytest.fixture
+def hex_storage(tmp_path):
+    yield SQLiteHexStorage(str(tmp_path / "hex.sqlite3"))
+
+
+def test_insert_and_get_all(sqlite_storage):
+    sqlite_storage.insert("articles", {"id": 1, "title": "Test Article"})
+    all_articles = sqlite_storage.get_all("articles")
+    assert len(all_articles) == 1
+    assert all_articles[0]["title"] == "Test Article"
+    assert all_articles[0].doc_id == 1
+
+
+def test_insert_multiple(sqlite_storage):
+    data = [
+        {"id": 2, "title": "Article A"},
+        {"id": 3, "title": "Article B"},
+    ]
+    assert sqlite_storage.insert("articles", data) == [1, 2]
+    assert sqlite_storage.count_records("articles") == 2
+
+
+def test_update_single_replaces_fields(sqlite_storage):
+    sqlite_storage.insert("models", {"name": "Model A", "stale": True})
+    sqlite_storage.update_single("models", {"doc_id": "1", "name": "Updated"})
+    model = sqlite_storage.get_table("models").get(doc_id=1)
+    assert model == {"name": "Updated"}
+
+
+def test_delete_and_remove(sqlite_storage):
+    sqlite_storage.insert("tags", [{"name": "AI"}, {"name": "ML"}])
+    sqlite_storage.delete("tags", "name", "AI")
+    assert sqlite_storage.count_records("tags") == 1
+    sqlite_storage.remove("tags", [2])
+    assert sqlite_storage.count_records("tags") == 0
+
+
+def test_search_equality_uses_index(sqlite_storage):
+    sqlite_storage.insert("tags", [{"name": "AI"}, {"name": "ML"}])
+    TagWord = Query()
+    result = sqlite_storage.get_table("tags").search(TagWord.name == "ML")
+    assert [doc.doc_id for doc in result] == [2]
+
+    plan = sqlite_storage.db.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT doc_id FROM tags "
+        "WHERE json_extract(data, '$.name') = ?", ("ML",)
+    ).fetchall()
+    assert "tags__name" in str(plan)
+
+
+def test_search_non_pushable_query(sqlite_storage):
+    sqlite_storage.insert("articles", [
+        {"title": "A", "url_domain": "x.com", "score": 1},
+        {"title": "B", "url_domain": "x.com", "score": 5},
+    ])
+    Article = Query()
+    result = sqlite_storage.get_table("articles").search(
+        (Article.url_domain == "x.com") & Article.score.test(lambda s: s > 2)
+    )
+    assert [doc["title"] for doc in result] == ["B"]
+
+
+def test_doc_ids_of_removed_records_are_not_reused(tmp_path):
+    path = str(tmp_path / "hex.sqlite3")
+    # A table created before doc_ids were AUTOINCREMENT is rebuilt
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            'CREATE TABLE "tags" (doc_id INTEGER PRIMARY KEY, data TEXT NOT NULL)'
+        )
+        conn.execute("""INSERT INTO "tags" VALUES (1, '{"name": "AI"}')""")
+    storage = SQLiteStorageService(path)
+    assert storage.insert("tags", {"name": "ML"}) == 2
+    storage.remove("tags", [2])
+    assert storage.insert("tags", {"name": "LLM"}) == 3
+
+    storage = SQLiteStorageService(path)
+    storage.remove("tags", [3])
+    assert storage.insert("tags", {"name": "RAG"}) == 4
+    assert [tag["name"] for tag in storage.get_all("tags")] == ["AI", "RAG"]
+    assert "sqlite_sequence" not in storage.db.tables()
+
+
+def test_drop_table(sqlite_storage):
+    sqlite_storage.insert("tags", {"name": "AI"})
+    sqlite_storage.db.drop_table("tags")
+    assert sqlite_storage.count_records("tags") == 0
+
+
+def test_hex_storage_contract(hex_storage):
+    ids = hex_storage.save("articles", [{"title": "A"}, {"title": "B"}])
+    assert ids == ["1", "2"]
+
+    articles = hex_storage.get_all("articles")
+    assert [a["doc_id"] for a in articles] == ["1", "2"]
+    assert articles[0]["table_name"] == "articles"
+
+    hex_storage.update("articles", {"doc_id": "2", "title": "B2"})
+    Article = Query()
+    found = hex_storage.search("articles", Article.title == "B2")
+    assert found[0]["doc_id"] == "2"
+    assert "last_updated" in found[0]
+
+    assert len(hex_storage.get_obj_in_range("articles", 1, 2)) == 1
+
+
+def test_migrate_from_tinydb(tmp_path, hex_storage):
+    tinydb_path = tmp_path / "hex_tinydb.json"
+    source = TinyDB(str(tinydb_path))
+    source.table("tags").insert_multiple([{"name": "AI"}, {"name": "ML"}])
+    source.table("tags").remove(doc_ids=[1])
+    source.close()
+
+    hex_storage.migrate_from_tinydb(str(tinydb_path))
+    tags = hex_storage.get_all("tags")
+    assert tags == [{"name": "ML", "doc_id": "2"}]
+
+
+def test_load_storage_selects_backend(tmp_path):
+    config = {
+        "db_path": str(tmp_path / "hex_tinydb.json"),
+        "sqlite_db_path": str(tmp_path / "hex.sqlite3"),
+    }
+    assert isinstance(load_storage(config), HexStorage)
+
+    storage = load_storage({**config, "storage_backend": "sqlite"})
+    assert isinstance(storage, SQLiteHexStorage)
+    assert Path(storage.artifacts.base_path) == tmp_path / "artifacts"
+
+    with pytest.raises(ValueError):
+        load_storage({**config, "storage_backend": "unknown"})
@@ -0,0 +1,140 @@
+from tinydb import Query
+from unittest.mock import patch
+
+from hex.storage.hex_storage import HexStorage
+
+
+def titles(rows):
+    return [row["title"] for row in rows]
+
+
+def test_first_read_returns_every_record(storage):
+    storage.save_many("articles", [{"title": "a"}, {"title": "b"}])
+    rows, _ = storage.changes_since("articles", consumer="enrichment")
+    assert titles(rows) == ["a", "b"]
+    assert rows[0]["doc_id"] == "1"
+
+
+def test_only_changes_after_commit(storage):
+    storage.save_many("articles", [{"title": "a"}, {"title": "b"}])
+    _, cursor = storage.changes_since("articles", consumer="enrichment")
+    storage.commit_cursor("articles", "enrichment", cursor)
+
+    storage.save("articles", {"title": "c"})
+    storage.update("articles", {"doc_id": "1", "title": "a2"})
+    storage.save("tags", {"name": "AI"})
+    rows, cursor = storage.changes_since("articles", consumer="enrichment")
+    assert titles(rows) == ["c", "a2"]
+
+    # Nothing is consumed until the cursor is committed
+    rows, _ = storage.changes_since("articles", consumer="enrichment")
+    assert titles(rows) == ["c", "a2"]
+    storage.commit_cursor("articles", "enrichment", cursor)
+    assert storage.changes_since("articles", consumer="enrichment")[0] == []
+
+
+def test_consumers_are_independent(storage):
+    storage.save("articles", {"title": "a"})
+    _, cursor = storage.changes_since("articles", consumer="enrichment")
+    storage.commit_cursor("articles", "enrichment", cursor)
+    rows, _ = storage.changes_since("articles", consumer="selection")
+    assert titles(rows) == ["a"]
+
+
+def test_records_written_before_the_feed_are_bootstrapped(tmp_path):
+    storage = HexStorage(str(tmp_path / "hex_tinydb.json"))
+    storage.insert("articles", [{"title": "old"}])
+    storage.save("articles", {"title": "new"})
+    rows, _ = storage.changes_since("articles", consumer="enrichment")
+    assert sorted(titles(rows)) == ["new", "old"]
+
+
+def test_where_and_limit(storage):
+    storage.save_many("articles", [
+        {"title": str(i), "keep": i % 2 == 0} for i in range(6)
+    ])
+    Article = Query()
+    rows, cursor = storage.changes_since(
+        "articles", consumer="enrichment", where=Article.keep == True, limit=2
+    )
+    assert titles(rows) == ["0", "2"]
+    storage.commit_cursor("articles", "enrichment", cursor)
+
+    rows, cursor = storage.changes_since(
+        "articles", consumer="enrichment", where=Article.keep == True, limit=2
+    )
+    assert titles(rows) == ["4"]
+
+
+def test_fields_projection_and_reset(storage):
+    storage.save("articles", {"title": "a", "summary": "long"})
+    rows, cursor = storage.changes_since("articles", "selection", fields=[])
+    assert rows == [{"doc_id": "1"}]
+    storage.commit_cursor("articles", "selection", cursor)
+    storage.reset_cursor("articles", "selection")
+    assert len(storage.changes_since("articles", "selection")[0]) == 1
+
+
+def test_unhandled_records_stay_pending_and_filtered_ones_are_consumed(storage):
+    storage.save_many("articles", [{"title": str(i), "year": 2020 + i} for i in range(4)])
+    Article = Query()
+    rows, cursor = storage.changes_since(
+        "articles", "selection", where=Article.year >= 2022
+    )
+    assert titles(rows) == ["2", "3"]
+    assert cursor["pending"] == []
+    storage.commit_cursor("articles", "selection", cursor, unhandled=["4"])
+
+    storage.save("articles", {"title": "4", "year": 2024})
+    # Pending records are read back by id, without scanning the table
+    with patch.object(type(storage), "iter_documents") as iter_documents:
+        rows, _ = storage.changes_since("articles", "selection")
+    iter_documents.assert_not_called()
+    assert titles(rows) == ["3", "4"]
+
+
+def test_filtered_history_is_not_read_again(storage):
+    storage.save_many("articles", [{"title": "old", "year": 2000}] * 50)
+    Article = Query()
+    for year in (2024, 2025):
+        storage.save("articles", {"title": str(year), "year": year})
+        rows, cursor = storage.changes_since(
+            "articles", "enrichment", where=Article.year >= 2024
+        )
+        assert titles(rows) == [str(year)]
+        assert cursor["pending"] == []
+        storage.commit_cursor("articles", "enrichment", cursor)
+    with patch.object(type(storage), "get_by_ids",
+                      wraps=storage.get_by_ids) as get_by_ids:
+        storage.changes_since("articles", "enrichment")
+    assert list(get_by_ids.call_args.args[1]) == []
+
+
+def test_feed_is_compacted_behind_the_slowest_consumer(storage):
+    storage.save_many("articles", [{"title": "a"}, {"title": "b"}])
+    storage.save("tags", {"name": "AI"})
+    _, cursor = storage.changes_since("articles", "enrichment")
+    _, slow_cursor = storage.changes_since("articles", "selection")
+    storage.commit_cursor("articles", "selection", slow_cursor)
+
+    storage.save("articles", {"title": "c"})
+    # Compaction reads the consumed id range, not the whole feed
+    with patch.object(type(storage), "get_obj_in_range") as get_obj_in_range:
+        storage.commit_cursor("articles", "enrichment", cursor)
+    get_obj_in_range.assert_not_called()
+    # No consumer reads tags; "c" is not read by any consumer yet
+    assert [entry["record_id"] for entry in storage.get_all("changes")] == [3]
+
+    rows, cursor = storage.changes_since("articles", "enrichment")
+    storage.commit_cursor("articles", "enrichment", cursor)
+    assert titles(rows) == ["c"]
+    assert len(storage.get_all("changes")) == 1
+    rows, cursor = storage.changes_since("articles", "selection")
+    storage.commit_cursor("articles", "selection", cursor)
+    assert titles(rows) == ["c"]
+    # The last entry is kept: change ids keep increasing
+    assert [entry["record_id"] for entry in storage.get_all("changes")] == [3]
+    storage = type(storage)(storage.db_path)
+    storage.save("articles", {"title": "d"})
+    rows, _ = storage.changes_since("articles", "selection")
+    assert titles(rows) == ["d"]
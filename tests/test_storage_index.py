@@ -0,0 +1,121 @@
+import pytest
+from tinydb import Query
+from unittest.mock import patch
+
+from hex.storage.hex_storage import HexStorage
+from hex.storage.index import HashIndex, equality_terms
+
+
+@pytest.fixture
+def storage(tmp_path):
+    yield HexStorage(str(tmp_path / "hex_tinydb.json"))
+
+
+def test_equality_terms():
+    q = Query()
+    assert equality_terms(q.name == "AI") == [("name", "AI")]
+    assert sorted(equality_terms((q.name == "AI") & (q.kind == 1))) == \
+        [("kind", 1), ("name", "AI")]
+    assert equality_terms((q.name == "AI") | (q.name == "ML")) == []
+    assert equality_terms(q.name.test(lambda v: True)) == []
+    assert equality_terms(q.meta.name == "AI") == []
+
+
+def test_hash_index_set_and_discard():
+    index = HashIndex("name")
+    index.set(1, {"name": "AI"})
+    index.set(2, {"name": "AI"})
+    index.set(3, {"tags": ["unhashable"]})
+    assert index.lookup("AI") == {1, 2}
+
+    index.set(1, {"name": "ML"})
+    assert index.lookup("AI") == {2}
+    assert index.lookup("ML") == {1}
+
+    index.discard(2)
+    assert index.lookup("AI") == set()
+
+
+def test_search_uses_index(storage):
+    storage.save("tags", [{"name": f"tag{i}"} for i in range(50)])
+    TagWord = Query()
+    storage.search("tags", TagWord.name == "tag3")
+
+    with patch("hex.storage.base_storage.HashIndex.build") as build:
+        result = storage.search("tags", TagWord.name == "tag7")
+    build.assert_not_called()
+    assert [tag["doc_id"] for tag in result] == ["8"]
+
+
+def test_index_follows_save_update_remove(storage):
+    TagWord = Query()
+    ids = storage.save("tags", [{"name": "AI"}, {"name": "ML"}])
+    assert len(storage.search("tags", TagWord.name == "AI")) == 1
+
+    storage.save("tags", {"name": "AI"})
+    assert len(storage.search("tags", TagWord.name == "AI")) == 2
+
+    storage.update("tags", {"doc_id": ids[0], "name": "LLM"})
+    assert [t["doc_id"] for t in storage.search("tags", TagWord.name == "AI")] \
+        == ["3"]
+    assert [t["doc_id"] for t in storage.search("tags", TagWord.name == "LLM")] \
+        == [ids[0]]
+
+    storage.remove("tags", [3])
+    assert storage.search("tags", TagWord.name == "AI") == []
+
+
+def test_index_rebuilt_after_direct_writes(storage):
+    TagWord = Query()
+    storage.save("tags", {"name": "AI"})
+    assert len(storage.search("tags", TagWord.name == "AI")) == 1
+
+    storage.get_table("tags").insert({"name": "AI"})
+    assert len(storage.search("tags", TagWord.name == "AI")) == 2
+
+    storage.db.drop_table("tags")
+    assert storage.search("tags", TagWord.name == "AI") == []
+
+
+def test_index_consistent_after_rollback(storage):
+    TagWord = Query()
+    storage.save("tags", {"name": "AI"})
+    with pytest.raises(RuntimeError):
+        with storage.transaction():
+            storage.save("tags", {"name": "AI"})
+            assert len(storage.search("tags", TagWord.name == "AI")) == 2
+            raise RuntimeError("crash mid-step")
+    assert len(storage.search("tags", TagWord.name == "AI")) == 1
+
+
+def test_create_index_on_custom_field(storage):
+    storage.create_index("articles", "url_domain")
+    storage.save("articles", [
+        {"title": "A", "url_domain": "x.com"},
+        {"title": "B", "url_domain": "y.com"},
+    ])
+    Article = Query()
+    result = storage.search(
+        "articles", (Article.url_domain == "y.com") & (Article.title == "B")
+    )
+    assert [a["title"] for a in result] == ["B"]
+
+
+def test_insert_multiple_updates_every_index(storage):
+    storage.create_index("articles", "url_domain")
+    storage.create_index("articles", "author")
+    Article = Query()
+    storage.save("articles", {"url_domain": "x.com", "author": "Ann"})
+    storage.search("articles", Article.url_domain == "x.com")
+    storage.search("articles", Article.author == "Ann")
+
+    storage.save("articles", [
+        {"url_domain": "y.com", "author": "Bob"},
+        {"url_domain": "z.com", "author": "Bob"},
+    ])
+    with patch("hex.storage.base_storage.HashIndex.build") as build:
+        by_domain = storage.search("articles", Article.url_domain == "y.com")
+        by_author = storage.search("articles", Article.author == "Bob")
+    build.assert_not_called()
+    assert [a["doc_id"] for a in by_domain] == ["2"]
+    assert [a["doc_id"] for a in by_author] == ["2", "3"]
@@ -0,0 +1,90 @@
+import pytest
+from tinydb import Query
+
+from hex.storage.hex_storage import SQLiteHexStorage
+
+
+@pytest.fixture
+def articles(storage):
+    storage.save_many("articles", [
+        {"title": f"title {i}", "url_domain": "a.com" if i % 2 else "b.com",
+         "summary": {"text": "x" * i}}
+        for i in range(1, 8)
+    ])
+    return storage
+
+
+def test_iter_is_lazy(articles):
+    rows = articles.iter("articles")
+    assert not isinstance(rows, list)
+    assert next(rows)["title"] == "title 1"
+
+
+def test_iter_projects_fields(articles):
+    rows = list(articles.iter("articles", fields=["title", "missing"]))
+    assert rows[0] == {"title": "title 1", "doc_id": "1"}
+    assert [row["doc_id"] for row in rows] == [str(i) for i in range(1, 8)]
+
+
+def test_iter_doc_ids_only(articles):
+    rows = list(articles.iter("articles", fields=[]))
+    assert rows[-1] == {"doc_id": "7"}
+
+
+def test_iter_where(articles):
+    Article = Query()
+    rows = list(articles.iter(
+        "articles", fields=["summary"], where=Article.url_domain == "a.com"
+    ))
+    assert [row["doc_id"] for row in rows] == ["1", "3", "5", "7"]
+    assert rows[1] == {"summary": {"text": "xxx"}, "doc_id": "3"}
+
+
+def test_iter_paginates(tmp_path):
+    storage = SQLiteHexStorage(str(tmp_path / "hex.sqlite3"))
+    storage.save_many("tags", [{"name": str(i)} for i in range(12)])
+    docs = list(storage.get_table("tags").iter_projected(["name"], batch_size=5))
+    assert [doc["name"] for doc in docs] == [str(i) for i in range(12)]
+
+
+def test_get_obj_in_range(articles):
+    rows = articles.get_obj_in_range("articles", 2, 4)
+    assert [row["doc_id"] for row in rows] == ["3", "4"]
+    assert len(articles.get_obj_in_range("articles", 5)) == 2
+
+
+def test_get_obj_in_range_with_gaps(articles):
+    articles.remove("articles", [3, 4])
+    rows = articles.get_obj_in_range("articles", 1, 6)
+    assert [row["doc_id"] for row in rows] == ["2", "5", "6"]
+    assert articles.get_obj_in_range("articles", 1, 1000)[-1]["doc_id"] == "7"
+    assert articles.last_doc_id("articles") == 7
+    assert articles.last_doc_id("empty") == 0
+
+
+def test_read_since(articles):
+    articles.remove("articles", [3, 4, 5])
+    rows, cursor = articles.read_since("articles", 0, limit=2)
+    assert [row["doc_id"] for row in rows] == ["1", "2"]
+    rows, cursor = articles.read_since("articles", cursor, limit=2)
+    assert [row["doc_id"] for row in rows] == ["6"]
+    rows, cursor = articles.read_since("articles", cursor)
+    assert [row["doc_id"] for row in rows] == ["7"]
+    rows, cursor = articles.read_since("articles", cursor)
+    assert rows == [] and cursor == 7
+
+    articles.save("articles", {"title": "new"})
+    rows, cursor = articles.read_since("articles", cursor)
+    assert [row["title"] for row in rows] == ["new"] and cursor == 8
+
+
+def test_iter_projection_keeps_json_types(storage):
+    record = {"flag": True, "off": False, "empty": None, "count": 3, "ratio": 0.5,
+              "meta": {"error": None, "seen": [True, {"ok": False}]}}
+    storage.save("articles", dict(record))
+    fields = list(record) + ["missing"]
+    row = next(storage.iter("articles", fields=fields))
+    full = storage.get_table("articles").get(doc_id=1)
+    assert row == {**record, "doc_id": "1"}
+    assert {key: full[key] for key in record} == record
+    assert row["flag"] is True and row["off"] is False
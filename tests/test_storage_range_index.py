@@ -0,0 +1,86 @@
+from tinydb import Query
+
+from hex.storage.index import SortedIndex
+from hex.utils.date import to_epoch
+
+
+def test_to_epoch():
+    assert to_epoch("Thu, 03 Apr 2025 18:00:00 +0000") == 1743703200
+    assert to_epoch("Thu, 03 Apr 2025 20:00:00 +0200") == 1743703200
+    assert to_epoch("not a date") is None
+    assert to_epoch("") is None
+    assert to_epoch(None) is None
+
+
+def test_sorted_index_range():
+    index = SortedIndex("published_ts")
+    for doc_id, ts in [(1, 30), (2, 10), (3, 20), (4, 20)]:
+        index.set(doc_id, {"published_ts": ts})
+    index.set(5, {"published_ts": None})
+
+    assert index.range(20) == {1, 3, 4}
+    assert index.range(None, 19) == {2}
+    assert index.range(20, 20) == {3, 4}
+    assert index.lookup("20") is None
+
+    index.set(3, {"published_ts": 5})
+    index.discard(4)
+    assert index.range(20) == {1}
+    assert index.range(None, 10) == {2, 3}
+
+
+def test_save_adds_published_ts(storage):
+    storage.save("articles", {
+        "title": "A", "published_date": "Thu, 03 Apr 2025 18:00:00 +0000"
+    })
+    article = storage.get_all("articles")[0]
+    assert article["published_ts"] == 1743703200
+
+    article["published_date"] = "Fri, 04 Apr 2025 18:00:00 +0000"
+    storage.update("articles", article)
+    assert storage.get_all("articles")[0]["published_ts"] == 1743789600
+
+
+def test_search_range(storage):
+    dates = [
+        "Mon, 31 Mar 2025 10:00:00 +0000",
+        "Thu, 03 Apr 2025 18:00:00 +0000",
+        "Sat, 05 Apr 2025 08:00:00 +0000",
+        "not a date",
+    ]
+    storage.save("articles", [
+        {"title": f"A{i}", "published_date": date, "keep": i != 2}
+        for i, date in enumerate(dates)
+    ])
+    threshold = to_epoch("Thu, 03 Apr 2025 18:00:00 +0000")
+
+    articles = storage.search_range("articles", "published_ts", lower=threshold)
+    assert [a["title"] for a in articles] == ["A1", "A2"]
+    assert [a["doc_id"] for a in articles] == ["2", "3"]
+
+    Article = Query()
+    articles = storage.search_range(
+        "articles", "published_ts", lower=threshold, query=Article.keep == True
+    )
+    assert [a["title"] for a in articles] == ["A1"]
+
+    storage.save("articles", {
+        "title": "A4", "published_date": "Sun, 06 Apr 2025 08:00:00 +0000"
+    })
+    articles = storage.search_range("articles", "published_ts", lower=threshold)
+    assert [a["title"] for a in articles] == ["A1", "A2", "A4"]
+
+
+def test_backfill_published_ts_runs_once(storage):
+    storage.insert("articles", [
+        {"title": "legacy", "published_date": "Thu, 03 Apr 2025 18:00:00 +0000"},
+        {"title": "no date"},
+    ])
+    assert storage.backfill_published_ts("articles") == 1
+    articles = storage.get_all("articles")
+    assert articles[0]["published_ts"] == 1743703200
+    assert "published_ts" not in articles[1]
+
+    storage.insert("articles", {"title": "late", "published_date": "2025-04-03"})
+    assert storage.backfill_published_ts("articles") == 0
+    assert len(storage.search_range("articles", "published_ts", lower=0)) == 1
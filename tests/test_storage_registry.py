@@ -0,0 +1,79 @@
+import json
+import pytest
+from tinydb import Query
+
+from hex.storage.hex_storage import (
+    HexStorage, clear_storage_registry, get_storage
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    clear_storage_registry()
+    yield
+    clear_storage_registry()
+
+
+def test_get_storage_is_shared_per_db_path(tmp_path):
+    config = {"db_path": str(tmp_path / "hex_tinydb.json")}
+    storage = get_storage(config)
+    assert get_storage(dict(config)) is storage
+    other = get_storage({"db_path": str(tmp_path / "other.json")})
+    assert other is not storage
+
+
+def test_get_storage_unknown_backend(tmp_path):
+    with pytest.raises(ValueError):
+        get_storage({"storage_backend": "csv", "db_path": str(tmp_path / "x")})
+
+
+def test_reads_reuse_parsed_file(tmp_path):
+    storage = HexStorage(str(tmp_path / "hex_tinydb.json"))
+    storage.save("tags", [{"name": "AI"}, {"name": "ML"}])
+    parses = storage.cache_stats()["parses"]
+    for _ in range(5):
+        assert len(storage.get_all("tags")) == 2
+    stats = storage.cache_stats()
+    assert stats["parses"] == parses
+    assert stats["cache_hits"] >= 5
+
+
+def test_cache_sees_writes_from_other_instances(tmp_path):
+    path = str(tmp_path / "hex_tinydb.json")
+    storage = HexStorage(path)
+    storage.save("tags", {"name": "AI"})
+    assert len(storage.get_all("tags")) == 1
+
+    HexStorage(path).save("tags", {"name": "ML"})
+    names = [tag["name"] for tag in storage.search("tags", Query().name == "ML")]
+    assert names == ["ML"]
+    assert len(storage.get_all("tags")) == 2
+
+
+def test_rollback_drops_cached_mutations(tmp_path):
+    path = tmp_path / "hex_tinydb.json"
+    storage = HexStorage(str(path))
+    storage.save("tags", {"name": "AI"})
+    with pytest.raises(RuntimeError):
+        with storage.transaction():
+            storage.save("tags", {"name": "ML"})
+            raise RuntimeError("crash")
+    assert [tag["name"] for tag in storage.get_all("tags")] == ["AI"]
+    with open(path, encoding="utf-8") as f:
+        assert len(json.load(f)["tags"]) == 1
+
+
+def test_unsaved_changes_to_read_documents_stay_off_disk(tmp_path):
+    path = tmp_path / "hex_tinydb.json"
+    storage = HexStorage(str(path))
+    storage.save("clusters", {"name": "AI", "tag_synonyms": {"1": "AI"}})
+    on_disk = path.read_text(encoding="utf-8")
+
+    cluster = storage.get_table("clusters").get(doc_id=1)
+    cluster["tag_synonyms"]["2"] = "Artificial Intelligence"
+    storage.get_all("clusters")[0]["tag_synonyms"]["3"] = "A.I."
+    storage.save("tags", {"name": "ML"})
+
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["clusters"] == json.loads(on_disk)["clusters"]
+    assert storage.get_all("clusters")[0]["tag_synonyms"] == {"1": "AI"}
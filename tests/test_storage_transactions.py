@@ -0,0 +1,101 @@
+import json
+import pytest
+from unittest.mock import patch
+
+from hex.storage.hex_storage import HexStorage
+from hex.storage.json_storage import TransactionalJSONStorage
+
+
+def test_update_many_writes_once(tmp_path):
+    storage = HexStorage(str(tmp_path / "hex_tinydb.json"))
+    ids = storage.save("tags", [{"name": f"tag{i}"} for i in range(5)])
+
+    with patch.object(TransactionalJSONStorage, "_flush",
+                      autospec=True,
+                      side_effect=TransactionalJSONStorage._flush) as flush:
+        storage.update_many("tags", [
+            {"doc_id": doc_id, "name": f"renamed{doc_id}"} for doc_id in ids
+        ])
+    assert flush.call_count == 1
+
+    with open(tmp_path / "hex_tinydb.json", encoding="utf-8") as f:
+        names = [doc["name"] for doc in json.load(f)["tags"].values()]
+    assert names == [f"renamed{i}" for i in ids]
+
+
+def test_save_many(storage):
+    ids = storage.save_many("tags", [{"name": "AI"}, {"name": "ML"}])
+    assert ids == ["1", "2"]
+    assert storage.count_records("tags") == 2
+
+
+def test_transaction_reads_its_own_writes(storage):
+    with storage.transaction():
+        storage.save("tags", {"name": "AI"})
+        assert storage.get_all("tags")[0]["name"] == "AI"
+    assert storage.count_records("tags") == 1
+
+
+def test_transaction_rollback_on_error(storage):
+    storage.save("tags", {"name": "AI"})
+    with pytest.raises(RuntimeError):
+        with storage.transaction():
+            storage.save("tags", {"name": "ML"})
+            storage.update("tags", {"doc_id": "1", "name": "Changed"})
+            raise RuntimeError("crash mid-step")
+
+    tags = storage.get_all("tags")
+    assert [tag["name"] for tag in tags] == ["AI"]
+
+
+def test_nested_transactions_commit_once(storage):
+    with storage.transaction():
+        with storage.transaction():
+            storage.save("tags", {"name": "AI"})
+        storage.save("tags", {"name": "ML"})
+    assert storage.count_records("tags") == 2
+
+
+def test_failed_nested_block_is_undone_alone(storage):
+    with storage.transaction():
+        storage.save("tags", {"name": "a", "value": 1})
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                storage.save("tags", {"name": "b", "value": 2})
+                storage.update("tags", {"doc_id": "1", "name": "a", "value": 9})
+                raise RuntimeError("item failed")
+        storage.save("tags", {"name": "c", "value": 3})
+    assert [(tag["name"], tag["value"]) for tag in storage.get_all("tags")] == [
+        ("a", 1), ("c", 3)
+    ]
+
+    # The storage is out of the transaction and still atomic
+    with pytest.raises(RuntimeError):
+        with storage.transaction():
+            storage.save("tags", {"name": "d", "value": 4})
+            raise RuntimeError("crash")
+    assert storage.count_records("tags") == 2
+
+
+def test_nested_failure_keeps_the_tinydb_storage_buffered(tmp_path):
+    storage = HexStorage(str(tmp_path / "hex_tinydb.json"))
+    json_storage = storage.db.storage
+    with storage.transaction():
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                raise RuntimeError("item failed")
+        assert json_storage.in_transaction
+        storage.save("tags", {"name": "a"})
+        assert json.loads((tmp_path / "hex_tinydb.json").read_text() or "{}") \
+            .get("tags") is None
+    assert not json_storage.in_transaction
+    json_storage.commit()  # Unbalanced: ignored
+    with storage.transaction():
+        assert json_storage.in_transaction
+
+
+def test_atomic_flush_leaves_no_temp_files(tmp_path):
+    storage = HexStorage(str(tmp_path / "hex_tinydb.json"))
+    storage.save("tags", {"name": "AI"})
+    leftovers = [p.name for p in tmp_path.iterdir() if p.name.startswith(".tmp-")]
+    assert leftovers == []
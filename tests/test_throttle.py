@@ -0,0 +1,140 @@
+from types import SimpleNamespace
+
+import pytest
+from scrapy import Request
+from scrapy.core.downloader import Slot
+from scrapy.http import Response
+from scrapy.settings import Settings
+from scrapy.signalmanager import SignalManager
+from scrapy.statscollectors import MemoryStatsCollector
+
+from hex.ingestion.hbr_scraper import HBRScraper
+from hex.ingestion.rss_article import RSSArticleScraper
+from hex.ingestion.throttle import (
+    DomainThrottle, crawl_settings, domain_limits, source_settings
+)
+
+
+SETTINGS = """
+defaults:
+  global_concurrency: 16
+  domain_concurrency: 4
+  domain_delay: 2.0
+  min_delay: 0.5
+  max_delay: 30.0
+  download_timeout: 30
+  retry_times: 5
+  retry_http_codes: [503]
+  navigation_timeout: 1000
+  headers: {User-Agent: hex, Accept: text/html}
+sources:
+  slow_scraper:
+    download_timeout: 60
+    headers: {Origin: https://slow.com}
+domains:
+  slow.com: {domain_concurrency: 1, domain_delay: 5.0, min_delay: 5.0}
+"""
+
+
+@pytest.fixture
+def settings_path(tmp_path):
+    path = tmp_path / "crawl_settings.yaml"
+    path.write_text(SETTINGS)
+    return str(path)
+
+
+def test_source_overrides_defaults(settings_path):
+    settings = source_settings("slow_scraper", settings_path)
+    assert settings["download_timeout"] == 60
+    assert settings["retry_times"] == 5
+    assert settings["headers"] == {
+        "User-Agent": "hex", "Accept": "text/html", "Origin": "https://slow.com"
+    }
+    custom = crawl_settings("slow_scraper", settings_path)
+    assert custom["CONCURRENT_REQUESTS"] == 16
+    assert custom["CONCURRENT_REQUESTS_PER_DOMAIN"] == 4
+    assert custom["EXTENSIONS"] == {
+        "hex.ingestion.throttle.DomainThrottle": 500,
+        "hex.ingestion.rendering.RenderStats": 510,
+    }
+    assert "https" in custom["DOWNLOAD_HANDLERS"]
+
+
+def test_domain_limits_match_subdomains(settings_path):
+    defaults = source_settings("any_scraper", settings_path)
+    assert domain_limits("www.slow.com", defaults, settings_path)["domain_delay"] == 5.0
+    assert domain_limits("fast.com", defaults, settings_path)["domain_concurrency"] == 4
+
+
+def test_scrapers_read_the_shared_settings_file():
+    assert RSSArticleScraper.custom_settings["CONCURRENT_REQUESTS"] > 1
+    assert HBRScraper.custom_settings["DEFAULT_REQUEST_HEADERS"]["Origin"] == \
+        "https://hbr.org"
+    assert HBRScraper.custom_settings["DOWNLOAD_TIMEOUT"] == 60
+    assert "PLAYWRIGHT_ABORT_REQUEST" in HBRScraper.custom_settings
+
+
+def _throttle(settings_path, source="any_scraper"):
+    crawler = SimpleNamespace(
+        settings=Settings(crawl_settings(source, settings_path)),
+        signals=SignalManager(),
+        engine=SimpleNamespace(downloader=SimpleNamespace(slots={})),
+    )
+    crawler.stats = MemoryStatsCollector(crawler)
+    return DomainThrottle(crawler), crawler
+
+
+def _request(throttle, crawler, domain):
+    slots = crawler.engine.downloader.slots
+    slots.setdefault(domain, Slot(4, 2.0, 0.5))
+    request = Request(f"https://{domain}/a", meta={"download_slot": domain})
+    throttle._request_reached_downloader(request)
+    return request, slots[domain]
+
+
+def _respond(throttle, request, status, latency=0.1, headers=None):
+    request.meta["download_latency"] = latency
+    response = Response(request.url, status=status, headers=headers or {})
+    throttle._response_downloaded(response, request)
+
+
+def test_slots_start_with_their_domain_limits(settings_path):
+    throttle, crawler = _throttle(settings_path)
+    _, slot = _request(throttle, crawler, "www.slow.com")
+    assert (slot.concurrency, slot.delay) == (1, 5.0)
+    _, slot = _request(throttle, crawler, "fast.com")
+    assert (slot.concurrency, slot.delay) == (4, 2.0)
+
+
+def test_backs_off_on_429_and_recovers(settings_path):
+    throttle, crawler = _throttle(settings_path)
+    request, slot = _request(throttle, crawler, "fast.com")
+
+    _respond(throttle, request, 429)
+    assert (slot.concurrency, slot.delay) == (2, 4.0)
+    _respond(throttle, request, 503, headers={"Retry-After": "20"})
+    assert (slot.concurrency, slot.delay) == (1, 20.0)
+    _respond(throttle, request, 429, headers={"Retry-After": "120"})
+    assert slot.delay == 30.0  # max_delay
+
+    for _ in range(DomainThrottle.recover_after):
+        _respond(throttle, request, 200, latency=0.1)
+    assert slot.concurrency == 2
+    for _ in range(10 * DomainThrottle.recover_after):
+        _respond(throttle, request, 200, latency=0.1)
+    assert slot.concurrency == 4  # configured maximum
+    assert slot.delay == 0.5  # min_delay
+
+
+def test_garbage_collected_slots_keep_learned_limits(settings_path):
+    throttle, crawler = _throttle(settings_path)
+    request, slot = _request(throttle, crawler, "fast.com")
+    _respond(throttle, request, 429)
+
+    del crawler.engine.downloader.slots["fast.com"]
+    _, new_slot = _request(throttle, crawler, "fast.com")
+    assert (new_slot.concurrency, new_slot.delay) == (2, 4.0)
+
+    throttle._spider_closed(spider=None)
+    assert crawler.stats.get_value("throttle/backoffs") == 1
+    assert throttle.stats()["fast.com"]["responses"] == 1